@@ -0,0 +1,219 @@
+"""Non-interactive batch mode of the bookmark manager.
+Commands are read from a file or stdin, one command per line, and run against a ModelJSON tree
+within one transaction, so the tree is saved once at the end. A command is a line of words,
+quoted as in a shell, or a JSON object with the "cmd" key and the named arguments:
+
+    add NAME PARENT [URL [ICON [KEYWORDS]]]     {"cmd": "add", "name": "...", "parent": "...", "url": "..."}
+    modify NAME FIELD=VALUE ...                 {"cmd": "modify", "name": "...", "fields": {"url": "..."}}
+    delete NAME                                 {"cmd": "delete", "name": "..."}
+    move NAME PARENT                            {"cmd": "move", "name": "...", "parent": "..."}
+    import chrome|mozilla FILENAME              {"cmd": "import", "format": "chrome", "filename": "..."}
+    export chrome|netscape FILENAME             {"cmd": "export", "format": "netscape", "filename": "..."}
+    print [DEPTH]                               {"cmd": "print", "depth": 1}
+
+A node without an url is a folder. Empty lines and lines starting with # are skipped.
+The result of every command is a JSON line: {"line": N, "ok": true[, "result": ...]}
+or {"line": N, "ok": false, "error": "message"}. A failed command does not stop the batch.
+Run a batch against a database:
+
+    python batch.py DATABASE [COMMANDS_FILE]
+
+"""
+import sys
+import re
+import json
+import shlex
+import typing as t
+
+import exceptions
+from model_json import ModelJSON
+from common import URL_FIELDS, FOLDER_FIELDS
+
+COMMANDS = {
+    'add': (('name', 'parent'), ('url', 'icon', 'keywords')),
+    'modify': (('name', 'fields'), ()),
+    'delete': (('name', ), ()),
+    'move': (('name', 'parent'), ()),
+    'import': (('format', 'filename'), ()),
+    'export': (('format', 'filename'), ()),
+    'print': ((), ('depth', )),
+}  #: command: (required arguments, optional arguments)
+ARG_TYPES = {'fields': dict, 'depth': (int, str)}  #: types of the arguments which are not strings
+QUOTES = re.compile(r'["\'\\]')  #: characters which need the shell-like splitting
+
+
+def parse_line(line: str) -> tuple[str, dict]:
+    """Parse a command line, a JSON object or words quoted as in a shell.
+
+    :raises ValueError: if the command is unknown or its arguments are wrong, of the wrong types too
+
+    :param line: the command line without comments
+    :return: (command, {argument: value})
+    """
+    if line.startswith('{'):
+        args = json.loads(line)  # json.JSONDecodeError is a ValueError
+        if not isinstance(args, dict):
+            raise ValueError('A command must be a JSON object')
+        command = args.pop('cmd', '')
+    else:
+        # shlex is slow, a line without quotes and escapes is split by the spaces
+        words = shlex.split(line) if QUOTES.search(line) else line.split()
+        command = words.pop(0) if words else ''
+        if command == 'modify':
+            # modify NAME FIELD=VALUE ...
+            wrong = [word for word in words[1:] if '=' not in word]
+            if wrong:
+                raise ValueError(f'Fields {wrong} of the command "modify" must be FIELD=VALUE')
+            fields = dict(word.partition('=')[::2] for word in words[1:])
+            args = {'name': words[0], 'fields': fields} if words else {}
+        else:
+            required, optional = COMMANDS.get(command, ((), ()))
+            args = dict(zip(required + optional, words))
+            if command in COMMANDS and len(words) > len(required + optional):
+                raise ValueError(f'Too many arguments of the command "{command}"')
+    if command not in COMMANDS:
+        raise ValueError(f'Unknown command "{command}", expected one of {tuple(COMMANDS)}')
+    required, optional = COMMANDS[command]
+    missing = [x for x in required if x not in args]
+    unknown = [x for x in args if x not in required + optional]
+    if missing or unknown:
+        raise ValueError(f'Wrong arguments of the command "{command}", missing {missing}, unknown {unknown}')
+    # a JSON command may have any types, a wrong one would fail the model with TypeError
+    wrong = [x for x, value in args.items() if not isinstance(value, ARG_TYPES.get(x, str)) or isinstance(value, bool)]
+    if 'fields' in args and 'fields' not in wrong and not all(isinstance(x, str) for x in args['fields'].values()):
+        wrong.append('fields')
+    if wrong:
+        raise ValueError(f'Wrong types of the arguments {wrong} of the command "{command}", '
+                         f'strings are expected, an object of strings for the fields')
+    return command, args
+
+
+class Batch:
+    """Runner of the batch commands against a JSON model.
+
+    """
+    def __init__(self, model: ModelJSON):
+        """Constructor method.
+
+        :param model: the model with an opened tree
+        """
+        self.model = model
+        self.IMPORTS = {'chrome': model.convert_chrome, 'mozilla': model.convert_mozilla}  #: importers by format
+        self.EXPORTS = {'chrome': model.export_chrome, 'netscape': model.export_netscape}  #: exporters by format
+
+    # ---- commands section, a command returns its result or None, an error is raised ----
+    def add(self, name: str, parent: str, url: str | None = None, icon: str = '', keywords: str = ''):
+        """Add a folder, or an url if the url is given."""
+        attr_dict = {'name': name, 'parent_name': parent}
+        if url is not None:
+            attr_dict |= {'url': url, 'icon': icon, 'keywords': keywords}
+        self.model.add_nodes((attr_dict, ))  # the parent and the name are checked
+
+    def modify(self, name: str, fields: dict):
+        """Modify the editable fields of a node, URL_FIELDS for an url and FOLDER_FIELDS for a folder."""
+        if name == 'roots':
+            raise ValueError('Node <roots> can not be modified')
+        attr_dict = self.model.get_node(name)  # or NodeNotExists
+        editable = FOLDER_FIELDS if 'children' in attr_dict else URL_FIELDS
+        if not isinstance(fields, dict):
+            raise ValueError(f'Fields of the node <{name}> must be an object, not {fields!r}')
+        wrong = [x for x in fields if x not in editable]
+        if wrong:
+            raise ValueError(f'Fields {wrong} of the node <{name}> can not be modified, expected {editable}')
+        filtered_attrs = {key: attr_dict[key] for key in editable} | fields
+        new_name = filtered_attrs['name']
+        if new_name != name:
+            try:
+                self.model.get_children(new_name)
+            except exceptions.NodeNotExists:
+                pass  # ok, the new name is unique
+            else:
+                raise exceptions.NodeExists(new_name)
+        self.model.update_node(name, filtered_attrs)
+
+    def delete(self, name: str):
+        """Delete an url or an empty folder."""
+        if name == 'roots':
+            raise ValueError('Folder <roots> can not be deleted')
+        self.model.delete_node(name)
+
+    def move(self, name: str, parent: str):
+        """Move a node with its subtree to the end of the folder."""
+        self.model.move_node(name, parent)
+
+    def import_file(self, format: str, filename: str):
+        """Import a browser bookmark file to <roots>."""
+        self._convert(self.IMPORTS, format, filename)
+
+    def export_file(self, format: str, filename: str):
+        """Export the tree to a browser bookmark file."""
+        self._convert(self.EXPORTS, format, filename)
+
+    @staticmethod
+    def _convert(converters: dict, format: str, filename: str):
+        """Call the converter of the format, raise ValueError with its error message."""
+        if format not in converters:
+            raise ValueError(f'Unknown format "{format}", expected one of {tuple(converters)}')
+        result, message = converters[format](filename)
+        if not result:
+            raise ValueError(message)
+
+    def print(self, depth: int | str | None = None) -> list[tuple[int, str, bool]]:
+        """Get the records (depth, name, is_folder) of the tree in the depth-first order."""
+        max_depth = None if depth is None else int(depth)  # ValueError for a wrong depth
+        return list(self.model.iter_tree(max_depth=max_depth))
+
+    # ---- end of the commands section ----
+
+    def run(self, lines: t.Iterable[str], output: t.TextIO) -> tuple[int, int]:
+        """Run the commands within one transaction and write their results as JSON lines.
+
+        :param lines: command lines
+        :param output: text stream for the results
+        :return: (number of the commands, number of the failed commands)
+        """
+        calls = {'add': self.add, 'modify': self.modify, 'delete': self.delete, 'move': self.move,
+                 'import': self.import_file, 'export': self.export_file, 'print': self.print}
+        done = failed = 0
+        with self.model.transaction():  # one save at the end
+            for line_no, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue  # empty line or a comment
+                done += 1
+                try:
+                    command, args = parse_line(line)
+                    result = calls[command](**args)
+                except (exceptions.MyProjectError, ValueError) as e:
+                    failed += 1
+                    record = {'line': line_no, 'ok': False, 'error': str(e).strip()}
+                else:
+                    record = {'line': line_no, 'ok': True}
+                    if result is not None:
+                        record['result'] = result
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return done, failed
+
+
+def main():
+    """Run the batch file or stdin against the database, see the module description.
+    The exit status is 1 if a command failed.
+
+    :return: nothing
+    """
+    if len(sys.argv) not in (2, 3):
+        print(f'Usage: python {sys.argv[0]} DATABASE [COMMANDS_FILE]', file=sys.stderr)
+        sys.exit(2)
+    model = ModelJSON()
+    model.open_database(sys.argv[1])
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], encoding='utf-8') as f:
+            done, failed = Batch(model).run(f, sys.stdout)
+    else:
+        done, failed = Batch(model).run(sys.stdin, sys.stdout)
+    model.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,950 @@
+"""Benchmarks of the bookmark manager.
+Generate big bookmark trees and measure the memory footprint and speed of the Model part.
+Run all benchmarks or the named ones:
+
+    python benchmark.py [name ...] [--nodes N]
+
+"""
+import io
+import os
+import sys
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+import subprocess
+import uuid
+import contextlib
+import tracemalloc
+import typing as t
+from unittest import mock
+
+from my_nodes import RootBookmarks
+from my_nodes import Folder
+from my_nodes import Url
+from batch import Batch
+from client import BookmarkClient
+from model_json import ModelJSON
+from model_json import image_to_tree
+from model_json import tree_to_image
+from model_json import iter_tree_json
+from model_async import ExecutorModel, BlockingModel
+from model_lazy import ModelLazyJSON
+from model_sqlite import ModelSQLite
+from model_sqlite import migrate_json
+from server import BookmarkServer
+from view_cli import ViewCLI
+
+DATE = '2023-03-04T20:09:49'  #: date of the generated nodes
+FANOUT = 100  #: number of children of the generated folders
+FOLDER_RATE = 10  #: every N-th generated node is a folder
+
+
+def generate_tree(n: int) -> RootBookmarks:
+    """Generate a tree of n nodes, every FOLDER_RATE-th node is a folder of FANOUT children.
+    Guids are deterministic, so the same n always gives the same tree.
+
+    :param n: number of nodes except the root
+    :return: the root of the tree with filled nodes_dict and guid_dict
+    """
+    root = RootBookmarks()
+    root.nodes_dict['roots'] = root
+    folders: list = [root]  # folders to fill, in the creating order
+    for i in range(1, n + 1):
+        parent = folders[(i - 1) // FANOUT]
+        guid = str(uuid.UUID(int=i))
+        if i % FOLDER_RATE == 0:
+            node = Folder(guid=guid, parent_guid=parent.guid, name=f'folder {i}', id_no=i,
+                          date_added=DATE, date_modified=DATE)
+            folders.append(node)
+        else:
+            node = Url(guid=guid, parent_guid=parent.guid, name=f'url {i}', id_no=i, date_added=DATE,
+                       url=f'https://www.example.com/page/{i}', icon='', keywords=f'page {i % 1000}')
+        parent.children.append(node)
+        root.nodes_dict[node.name] = node
+        root.guid_dict[guid] = node
+    return root
+
+
+def _measure(func) -> tuple[float, int]:
+    """Call the function and measure the time and memory it takes.
+
+    :param func: function without arguments
+    :return: (seconds, bytes allocated and kept by the result)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, size
+
+
+def bench_memory(n: int):
+    """Compare bytes per node of the slotted nodes with the same fields kept in an instance __dict__.
+    Field values are created beforehand, so only the node objects and children lists are measured.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    class DictNode:
+        """A node with the instance __dict__, layout of the nodes before slotting"""
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    values = [(str(uuid.UUID(int=i)), f'url {i}', f'https://www.example.com/page/{i}') for i in range(n)]
+
+    def _slotted():
+        return [Url(guid=g, parent_guid=g, name=name, id_no=i, date_added=DATE, url=url, icon='', keywords='')
+                for i, (g, name, url) in enumerate(values)]
+
+    def _dict_based():
+        return [DictNode(url=url, icon='', keywords='', id_no=i, date_added=DATE, guid=g, parent_guid=g, name=name)
+                for i, (g, name, url) in enumerate(values)]
+
+    slotted_time, slotted_size = _measure(_slotted)
+    dict_time, dict_size = _measure(_dict_based)
+    print(f'memory, {n} url nodes:')
+    print(f'    __dict__ nodes: {dict_size / n:8.1f} bytes/node')
+    print(f'    slotted nodes:  {slotted_size / n:8.1f} bytes/node, '
+          f'{100 * (1 - slotted_size / dict_size):.0f}% less')
+
+
+def _write_tree(n: int, filename: str) -> ModelJSON:
+    """Generate a tree of n nodes and save it to the database file.
+
+    :param n: number of nodes
+    :param filename: name of the database file
+    :return: the model with the generated tree
+    """
+    model = ModelJSON()
+    model.root = generate_tree(n)
+    model.tree_name = filename
+    model._save_tree()
+    return model
+
+
+def _recursive_load(tree_image: dict) -> RootBookmarks:
+    """Reference loader: the recursive decoding with the kwargs constructors, as it was before.
+
+    :param tree_image: dictionary of the root decoded from json
+    :return: the root of the new tree
+    """
+    root = RootBookmarks()
+    root.nodes_dict['roots'] = root
+    root.update_root(**tree_image)
+
+    def _dict_into_object(dct: dict):
+        for i, x in enumerate(dct['children']):
+            if 'children' in x:
+                _dict_into_object(x)
+                node = Folder(**x)
+            else:
+                node = Url(**x)
+            dct['children'][i] = node
+            root.nodes_dict[node.name] = node
+            root.guid_dict[node.guid] = node
+
+    _dict_into_object({'children': root.children})
+    return root
+
+
+def bench_load(n: int):
+    """Compare the iterative loader with the recursive one on n/100, n/10 and n node files.
+    Decoding of json is measured separately, it is common for both loaders.
+
+    :param n: the biggest number of nodes
+    :return: nothing
+    """
+    filename = 'bench_load.json'
+    print('loading, seconds (json decoding + tree building):')
+    for size in (n // 100, n // 10, n):
+        _write_tree(size, filename)
+        results = []
+        for loader in (_recursive_load, image_to_tree):
+            with open(filename) as f:
+                start = time.perf_counter()
+                tree_image = json.load(f)
+                decoded = time.perf_counter()
+                loader(tree_image)
+                results.append((decoded - start, time.perf_counter() - decoded))
+        (json_old, old), (json_new, new) = results
+        print(f'    {size:>9} nodes: recursive {json_old:6.2f} + {old:6.2f}, '
+              f'iterative {json_new:6.2f} + {new:6.2f}, tree building x{old / new:.1f} faster')
+    os.remove(filename)
+
+
+def bench_save(n: int):
+    """Compare the save throughput of the encoder with the default hook called for every node,
+    the serializer to plain dicts with the C encoder and the encoder by pieces of the saving.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    filename = 'bench_save.json'
+    root = generate_tree(n)
+
+    def _default_hook():
+        with open(filename, 'w') as f:
+            json.dump(root, f, default=lambda obj: obj.to_dict())
+
+    def _serializer():
+        with open(filename, 'w') as f:
+            f.write(json.dumps(tree_to_image(root)))
+
+    def _pieces():
+        with open(filename, 'w') as f:
+            f.writelines(iter_tree_json(root))
+
+    print(f'saving, {n} nodes:')
+    for title, func in (('default hook', _default_hook), ('serializer', _serializer), ('pieces', _pieces)):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(filename) / 1_048_576
+        print(f'    {title:>12}: {seconds:6.2f} s, {n / seconds:10.0f} nodes/s, {size / seconds:6.1f} MB/s')
+    os.remove(filename)
+
+
+def bench_lazy(n: int):
+    """Compare the full opening with the lazy one: the first opening builds the index, the next one reads it.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    filename = 'bench_lazy.json'
+    _write_tree(n, filename)
+    print(f'lazy opening, {n} nodes, seconds to open and get a node:')
+    for title, model in (('full', ModelJSON()), ('lazy, cold', ModelLazyJSON()), ('lazy, warm', ModelLazyJSON())):
+        start = time.perf_counter()
+        model.open_database(filename)
+        model.get_node(f'url {n - 1}')
+        print(f'    {title:>10}: {time.perf_counter() - start:6.2f}')
+        model.close()
+    ModelLazyJSON().delete_database(filename)
+
+
+def bench_snapshot(n: int):
+    """Compare the opening without the snapshot cache, the cold opening (json decoding and the snapshot writing)
+    and the warm one (the snapshot is read).
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    filename = 'bench_snapshot.json'
+    _write_tree(n, filename)
+    print(f'snapshot cache, {n} nodes, seconds to open:')
+    results = []
+    for title, snapshot in (('json', False), ('cold', True), ('warm', True)):
+        model = ModelJSON(snapshot=snapshot)
+        start = time.perf_counter()
+        model.open_database(filename)
+        results.append(time.perf_counter() - start)
+        print(f'    {title:>4}: {results[-1]:6.2f}')
+    print(f'    warm opening x{results[0] / results[2]:.1f} faster than json')
+    model.delete_database(filename)
+
+
+def bench_search(n: int):
+    """Measure the building of the search index and the latency of queries with rare and common words.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    root = generate_tree(n)
+    start = time.perf_counter()
+    root.search('', 1)  # build the index
+    print(f'search, {n} nodes, index built in {time.perf_counter() - start:6.2f} s, milliseconds per query:')
+    for query in (f'url {n - 1}', 'folder 1', 'page 12', 'example page', 'exam', 'page'):
+        start = time.perf_counter()
+        found = root.search(query, 20)
+        print(f'    {query:>16}: {1000 * (time.perf_counter() - start):8.2f}, {len(found)} results')
+
+
+def bench_iter_tree(n: int):
+    """Compare the recursive walk by get_children() with iter_tree() of every Model: time, throughput
+    and the peak memory of the walk, which does not depend on the tree size.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    filename = 'bench_iter_tree.json'
+    sqlite_name = 'bench_iter_tree.sqlite'
+    json_model = _write_tree(n, filename)
+    if os.path.isfile(sqlite_name):
+        os.remove(sqlite_name)
+    migrate_json(filename, sqlite_name)
+    lazy_model = ModelLazyJSON()
+    lazy_model.open_database(filename)
+    sqlite_model = ModelSQLite()
+    sqlite_model.open_database(sqlite_name)
+
+    def _recursive_walk(model, name: str = 'roots') -> int:
+        is_folder, children = model.get_children(name)
+        return 1 + sum(_recursive_walk(model, child) for child in children)
+
+    def _iter_walk(model, order: str) -> int:
+        count = 0
+        for _ in model.iter_tree(order=order):
+            count += 1
+        return count
+
+    print(f'traversal, {n} nodes:')
+    for title, model in (('json', json_model), ('lazy', lazy_model), ('sqlite', sqlite_model)):
+        for walk_title, walk in (('get_children', _recursive_walk), ('iter_tree dfs', lambda x: _iter_walk(x, 'dfs')),
+                                 ('iter_tree bfs', lambda x: _iter_walk(x, 'bfs'))):
+            start = time.perf_counter()
+            count = walk(model)
+            seconds = time.perf_counter() - start
+            tracemalloc.start()
+            walk(model)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'    {title:>6}, {walk_title:>13}: {seconds:6.2f} s, {count / seconds:9.0f} nodes/s, '
+                  f'peak {peak // 1024:7} KB')
+    sqlite_model.delete_database(sqlite_name)
+    lazy_model.delete_database(filename)
+
+
+def bench_print_tree(n: int):
+    """Compare the tree printing by a print() call per node with the buffered output of ViewCLI,
+    the output is redirected to a file.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    filename = 'bench_print_tree.txt'
+    model = ModelJSON()
+    model.root = generate_tree(n)
+    cli = ViewCLI()
+
+    def _per_node():
+        folders = []
+        for depth, name, is_folder in model.iter_tree():
+            while len(folders) > depth:
+                cli.output_header(f'Folder <{folders.pop()}> END', 8 * len(folders))
+            if is_folder:
+                cli.output_header(f'Folder <{name}> BEGIN', 8 * depth)
+                folders.append(name)
+            else:
+                print(' ' * 8 * depth + name)
+        while folders:
+            cli.output_header(f'Folder <{folders.pop()}> END', 8 * len(folders))
+
+    print(f'tree printing to a file, {n} nodes, seconds:')
+    for title, func in (('per node', _per_node), ('buffered', lambda: cli.output_tree(model.iter_tree())),
+                        ('subtree', lambda: cli.output_tree(model.get_subtree().items())),
+                        ('depth 1', lambda: cli.output_tree(model.iter_tree(max_depth=1), 1))):
+        with open(filename, 'w') as f, contextlib.redirect_stdout(f):
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+        print(f'    {title:>8}: {seconds:6.2f}, {os.path.getsize(filename) // 1024} KB')
+    os.remove(filename)
+
+
+def bench_startup(n: int):
+    """Measure the time to the first output line of the command-line subcommands and the menus
+    with the interpreter start as a baseline, and the import time of the modules reported by python -X importtime.
+
+    :param n: number of nodes of the database
+    :return: nothing
+    """
+    filename = 'bench_startup.json'
+    _write_tree(n, filename)
+    ModelLazyJSON().open_database(filename)  # build the index of the lazy opening
+    runs = 15  # the median of the runs is reported
+
+    def _first_output(command: list[str]) -> float:
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            process = subprocess.Popen([sys.executable, *command], stdin=subprocess.DEVNULL,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            process.stdout.readline()
+            times.append(time.perf_counter() - start)
+            process.communicate()
+        return sorted(times)[runs // 2] * 1000
+
+    def _imports(command: list[str]) -> dict[str, int]:
+        stderr = subprocess.run([sys.executable, '-X', 'importtime', *command], stdin=subprocess.DEVNULL,
+                                capture_output=True, text=True).stderr
+        imports = {}  # {top level module: cumulative microseconds}
+        for line in stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[1].strip().isdigit() and not fields[2].startswith('  '):
+                imports[fields[2].strip()] = int(fields[1])
+        return imports
+
+    started = _imports(['-c', 'print()'])  # modules imported by the interpreter start
+
+    def _import_time(command: list[str]) -> float:
+        return sum(value for key, value in _imports(command).items() if key not in started) / 1000
+
+    print(f'startup, {n} nodes, milliseconds to the first output line, imports:')
+    for title, command in (('python', ['-c', 'print()']),
+                           ('bm print', ['bm.py', 'print', filename, '--depth', '1']),
+                           ('bm search', ['bm.py', 'search', filename, 'page']),
+                           ('menus', ['presenter.py'])):
+        print(f'    {title:>9}: {_first_output(command):6.1f}, {_import_time(command):6.1f}')
+    ModelLazyJSON().delete_database(filename)
+
+
+def _write_chrome(n: int, filename: str):
+    """Write a Chrome bookmark file of n entries with the layout of the generated trees.
+
+    :param n: number of entries
+    :param filename: name of the Chrome bookmark file
+    :return: nothing
+    """
+    stamp = 13323000000000000  # a Chrome timestamp, the entries are added a second apart
+
+    def _entry(node) -> dict:
+        date = str(stamp + node.id_no * 1_000_000)
+        if isinstance(node, Folder):
+            return {'children': [_entry(x) for x in node.children], 'date_added': date, 'date_modified': date,
+                    'guid': node.guid, 'id': str(node.id_no), 'name': node.name, 'type': 'folder'}
+        return {'date_added': date, 'guid': node.guid, 'id': str(node.id_no), 'name': node.name, 'type': 'url',
+                'url': node.url}
+
+    root = generate_tree(n)
+    bar = {'children': [_entry(x) for x in root.children], 'date_added': str(stamp), 'date_modified': str(stamp),
+           'guid': '0bc5d13f-2cba-5d74-951f-3f233fe6c908', 'id': '1', 'name': 'Bookmarks bar', 'type': 'folder'}
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'checksum': '', 'roots': {'bookmark_bar': bar}, 'version': 1}, f, indent=3, ensure_ascii=False)
+
+
+def bench_chrome(n: int):
+    """Measure the Chrome import into ModelJSON and ModelSQLite: time, throughput and the peak memory
+    compared with the plain decoding of the file into dictionaries.
+
+    :param n: number of entries in the Chrome file
+    :return: nothing
+    """
+    chrome_name = 'bench_chrome_source.json'
+    _write_chrome(n, chrome_name)
+    size = os.path.getsize(chrome_name) / 1_048_576
+    print(f'chrome import, {n} entries, {size:.1f} MB:')
+
+    def _plain_decoding():
+        with open(chrome_name, encoding='utf-8') as f:
+            return json.load(f)
+
+    tracemalloc.start()
+    _plain_decoding()
+    plain_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'    {"json.load":>8}: peak {plain_peak / 1_048_576:7.1f} MB')
+    for title, model, filename in (('json', ModelJSON(), 'bench_chrome.json'),
+                                   ('sqlite', ModelSQLite(), 'bench_chrome.sqlite')):
+        for traced in (False, True):
+            if os.path.isfile(filename):
+                model.delete_database(filename)
+            model.create_database(filename)
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            result = model.convert_chrome(chrome_name)
+            seconds = time.perf_counter() - start
+            assert result == (True, ''), result
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f'    {"":>8}  peak {peak / 1_048_576:7.1f} MB')
+            else:
+                print(f'    {title:>8}: {seconds:6.2f} s, {n / seconds:8.0f} entries/s')
+        model.close()
+        model.delete_database(filename)
+    os.remove(chrome_name)
+
+
+def bench_chrome_export(n: int):
+    """Measure the Chrome export of a tree with the checksum: time, throughput and the peak memory
+    compared with the encoding of the whole document by json.dumps.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    chrome_name = 'bench_chrome_export.json'
+    filename = 'bench_chrome_export_db.json'
+    model = _write_tree(n, filename)
+    start = time.perf_counter()
+    result = model.export_chrome(chrome_name)
+    seconds = time.perf_counter() - start
+    assert result == (True, ''), result
+    tracemalloc.start()
+    model.export_chrome(chrome_name)  # the tracing slows down, so the time is measured without it
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    with open(chrome_name, encoding='utf-8') as f:
+        image = json.load(f)
+    tracemalloc.start()
+    json.dumps(image, ensure_ascii=False)
+    plain_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del image
+    size = os.path.getsize(chrome_name) / 1_048_576
+    print(f'chrome export, {n} nodes, {size:.1f} MB:')
+    print(f'    export: {seconds:6.2f} s, {n / seconds:8.0f} nodes/s, peak {peak / 1_048_576:7.1f} MB, '
+          f'json.dumps of the document {plain_peak / 1_048_576:7.1f} MB')
+    model.delete_database(filename)
+    os.remove(chrome_name)
+
+
+def _bulk_attr_dicts(n: int) -> t.Iterator[dict]:
+    """Generate the dictionaries of n new nodes with the layout of the generated trees, folders before their children.
+
+    :param n: number of nodes
+    :return: iterator of the dictionaries for add_node() and add_nodes()
+    """
+    for i in range(1, n + 1):
+        parent_no = (i - 1) // FANOUT * FOLDER_RATE  # number of the parent folder, 0 for the root
+        parent_name = f'folder {parent_no}' if parent_no else 'roots'
+        if i % FOLDER_RATE == 0:
+            yield {'name': f'folder {i}', 'parent_name': parent_name}
+        else:
+            yield {'name': f'url {i}', 'parent_name': parent_name, 'url': f'https://www.example.com/page/{i}'}
+
+
+def bench_add_nodes(n: int):
+    """Compare the scripted import by add_node() with a save per node and by one add_nodes() call.
+    The first way is quadratic, it is measured for a part of the nodes only.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    filename = 'bench_add_nodes.json'
+    part = min(n, 2000)  # number of the nodes added one by one
+    print('bulk adding:')
+    for title, count in (('add_node', part), ('add_nodes', n)):
+        model = ModelJSON()
+        if os.path.isfile(filename):
+            model.delete_database(filename)
+        model.create_database(filename)
+        start = time.perf_counter()
+        if title == 'add_node':
+            for attr_dict in _bulk_attr_dicts(count):
+                model.add_node(attr_dict, 'url' not in attr_dict)
+        else:
+            model.add_nodes(_bulk_attr_dicts(count))
+        seconds = time.perf_counter() - start
+        print(f'    {title:>9}: {count:>8} nodes in {seconds:7.2f}, {count / seconds:8.0f} nodes/s')
+        model.delete_database(filename)
+
+
+def bench_batch(n: int):
+    """Measure the batch mode: n commands of the simple and JSON syntax, adding, modifying and moving
+    the nodes of the generated layout, within one transaction.
+
+    :param n: number of commands
+    :return: nothing
+    """
+    filename = 'bench_batch.json'
+    model = ModelJSON()
+    if os.path.isfile(filename):
+        os.remove(filename)
+    model.create_database(filename)
+
+    def _lines() -> t.Iterator[str]:
+        for i, attr_dict in enumerate(_bulk_attr_dicts(n)):
+            name, parent_name = attr_dict['name'], attr_dict['parent_name']
+            if 'url' not in attr_dict:
+                yield f'add "{name}" "{parent_name}"'
+            elif i % 3 == 0:
+                yield json.dumps({'cmd': 'add', 'name': name, 'parent': parent_name, 'url': attr_dict['url']})
+            elif i % 3 == 1:
+                yield f'add "{name}" "{parent_name}" {attr_dict["url"]}'
+            else:
+                yield f'add "{name}" "{parent_name}" {attr_dict["url"]}'
+                yield f'modify "{name}" "keywords=page {i}"'
+                yield f'move "{name}" roots'
+
+    lines = list(_lines())
+    with open(os.devnull, 'w') as output:
+        start = time.perf_counter()
+        done, failed = Batch(model).run(lines, output)
+        seconds = time.perf_counter() - start
+    print(f'batch, {done} commands, {failed} failed, {seconds:6.2f} s, {done / seconds:8.0f} commands/s')
+    model.delete_database(filename)
+
+
+def bench_async(n: int):
+    """Measure how long a change blocks the caller: the synchronous ModelJSON saves the tree in the call,
+    BlockingModel returns after the change and saves in the worker thread while the caller goes on.
+
+    :param n: number of nodes of the database
+    :return: nothing
+    """
+    filename = 'bench_async.json'
+    _write_tree(n, filename)
+    print(f'async, {n} nodes, milliseconds:')
+    sync_model = ModelJSON()
+    sync_model.open_database(filename)
+    start = time.perf_counter()
+    sync_model.add_node({'name': 'sync', 'parent_name': 'roots'}, True)
+    print(f'    ModelJSON add_node: {(time.perf_counter() - start) * 1000:8.1f}')
+
+    executor_model = ExecutorModel(ModelJSON())
+    model = BlockingModel(executor_model)
+    start = time.perf_counter()
+    model.open_database(filename)
+    print(f'    BlockingModel open_database: {(time.perf_counter() - start) * 1000:8.1f}')
+    start = time.perf_counter()
+    model.add_node({'name': 'background', 'parent_name': 'roots'}, True)
+    returned = time.perf_counter()
+    model.get_children('roots')  # waits for the save
+    print(f'    BlockingModel add_node: {(returned - start) * 1000:8.1f}, '
+          f'the save goes on {(time.perf_counter() - returned) * 1000:8.1f} more')
+    model.close()
+    executor_model.shutdown()
+    sync_model.delete_database(filename)
+
+
+def bench_select(n: int):
+    """Measure a selection step in a folder of n children: the whole list printed for every prompt
+    as before and the paged list, the output bytes and the time of an invalid input and a selection.
+
+    :param n: number of the listed rows
+    :return: nothing
+    """
+    item_list = ('Return to the previous selection', 'Modify current node') + tuple(f'url {i}' for i in range(n))
+    print(f'selection, {n} rows, output of an invalid input and a selection:')
+    for title, cli in (('whole list', ViewCLI(select_page=n)), ('paged', ViewCLI())):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), mock.patch('builtins.input', side_effect=['x', str(n // 2)]):
+            start = time.perf_counter()
+            cli.select_line(item_list, 2)
+            seconds = time.perf_counter() - start
+        print(f'    {title:>10}: {len(output.getvalue()) / 1024:10.1f} KB, {seconds * 1000:8.2f} ms')
+
+
+def bench_server(n: int):
+    """Measure the calls of the bookmark server with the full saving and the journal: a read, a write
+    and a search per call of the client, compared with a script opening the database, making a change and saving it.
+
+    :param n: number of nodes of the database
+    :return: nothing
+    """
+    filename, socket_name = 'bench_server.json', 'bench_server.sock'
+    calls = 2000
+
+    def _per_call(func) -> float:
+        start = time.perf_counter()
+        for i in range(calls):
+            func(i)
+        return (time.perf_counter() - start) / calls * 1_000_000
+
+    print(f'server, {n} nodes, microseconds per call:')
+    for journal in (False, True):
+        _write_tree(n, filename)
+        model = ModelJSON(journal=journal)
+        model.open_database(filename)
+        server = BookmarkServer(model, socket_name)
+        thread = threading.Thread(target=asyncio.run, args=(server.serve_forever(), ), daemon=True)
+        thread.start()
+        while not os.path.exists(socket_name):
+            time.sleep(0.01)
+        client = BookmarkClient(socket_name)
+        get_time = _per_call(lambda i: client.get_node(f'url {i * 10 % n + 1}'))
+        add_time = _per_call(lambda i: client.add_node({'name': f'new {i}', 'parent_name': 'roots'}, True))
+        search_time = _per_call(lambda i: client.search(f'page {i % 1000}'))
+        client.shutdown()
+        thread.join()
+        print(f'    {"journal" if journal else "full save":>9}: get_node {get_time:6.0f}, '
+              f'add_node {add_time:6.0f}, search {search_time:6.0f}')
+        model.delete_database(filename)
+
+    _write_tree(n, filename)
+    start = time.perf_counter()
+    script_model = ModelJSON()
+    script_model.open_database(filename)
+    script_model.add_node({'name': 'script', 'parent_name': 'roots'}, True)
+    script_model.close()
+    print(f'    open, add_node and save by a script: {(time.perf_counter() - start) * 1_000_000:10.0f}')
+    script_model.delete_database(filename)
+
+
+def bench_projection(n: int):
+    """Compare a page of the children and the requested fields with the full lists and nodes, a folder of n urls.
+    The size is of the json reply, as the server sends it.
+
+    :param n: number of urls in the folder
+    :return: nothing
+    """
+    filename, sqlite_name = 'bench_projection.json', 'bench_projection.sqlite'
+    calls = 200
+    for name in (filename, sqlite_name):
+        if os.path.exists(name):
+            os.remove(name)
+    json_model = ModelJSON()
+    json_model.create_database(filename)
+    json_model.add_nodes([{'name': 'folder', 'parent_name': 'roots'}] +
+                         [{'name': f'url {i}', 'parent_name': 'folder', 'url': f'u{i}.com'} for i in range(n)])
+    json_model.close()
+    migrate_json(filename, sqlite_name)
+
+    print(f'projection, folder of {n} urls, microseconds per call and bytes of the reply:')
+    for title, model, name in (('json', ModelJSON(), filename), ('lazy', ModelLazyJSON(), filename),
+                               ('sqlite', ModelSQLite(), sqlite_name)):
+        model.open_database(name)
+        for call, args, label in (('get_children', ('folder', ), 'all children'),
+                                  ('get_children', ('folder', 0, 30), 'page of 30'),
+                                  ('get_node', ('folder', ), 'all fields'),
+                                  ('get_node', ('folder', ('name', 'guid')), 'name, guid')):
+            func = getattr(model, call)
+            start = time.perf_counter()
+            for _ in range(calls):
+                result = func(*args)
+            per_call = (time.perf_counter() - start) / calls * 1_000_000
+            print(f'    {title:>6} {call:>12}, {label:>12}: {per_call:9.0f}, {len(json.dumps(result)):9}')
+        model.close()
+    ModelLazyJSON().delete_database(filename)
+    ModelSQLite().delete_database(sqlite_name)
+
+
+def bench_subtree(n: int):
+    """Compare the fetching of the names and urls of a tree by calls per node, get_children() for every folder
+    and get_node() for every url, with one get_subtree() call, in the process and through the bookmark server.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    filename, socket_name = 'bench_subtree.json', 'bench_subtree.sock'
+    model = _write_tree(n, filename)
+    server = BookmarkServer(model, socket_name)
+    thread = threading.Thread(target=asyncio.run, args=(server.serve_forever(), ), daemon=True)
+    thread.start()
+    while not os.path.exists(socket_name):
+        time.sleep(0.01)
+    time.sleep(0.1)  # the socket file exists before the server listens
+    client = BookmarkClient(socket_name)
+
+    def _per_node(proto) -> int:
+        calls, urls, folders = 0, {}, ['roots']
+        while folders:
+            result, children = proto.get_children(folders.pop())
+            calls += 1
+            for name in children:
+                node = proto.get_node(name, ('url', 'children'))  # the url or the type of the node
+                calls += 1
+                if 'url' in node:
+                    urls[name] = node['url']
+                else:
+                    folders.append(name)
+        return calls
+
+    def _subtree(proto) -> int:
+        proto.get_subtree(fields=('url', ))
+        return 1
+
+    print(f'subtree fetching, {n} nodes, seconds and calls:')
+    for title, proto in (('in process', model), ('server', client)):
+        for method, func in (('per node', _per_node), ('subtree', _subtree)):
+            start = time.perf_counter()
+            calls = func(proto)
+            print(f'    {title:>10} {method:>8}: {time.perf_counter() - start:6.2f}, {calls}')
+    client.shutdown()
+    thread.join()
+    model.delete_database(filename)
+
+
+def bench_names(n: int):
+    """Compare the allocation of colliding names ("New Tab", "New Tab (1)", ...) by the linear probing
+    and by the name allocator. The probing is quadratic, it is measured for a part of the names only.
+
+    :param n: number of the colliding names
+    :return: nothing
+    """
+    part = min(n, 5000)  # number of the names allocated by the probing
+
+    def _probing(count: int):
+        used = set()
+        for _ in range(count):
+            i = 1
+            new_name = 'New Tab'
+            while new_name in used:
+                new_name = f'New Tab ({i})'
+                i += 1
+            used.add(new_name)
+
+    def _allocator(count: int):
+        root = RootBookmarks()
+        root.nodes_dict['roots'] = root
+        root.add_subtrees([Url(name='New Tab', url='chrome://newtab/') for _ in range(count)])
+
+    print('colliding names:')
+    for title, func, count in (('probing', _probing, part), ('allocator', _allocator, n)):
+        start = time.perf_counter()
+        func(count)
+        seconds = time.perf_counter() - start
+        print(f'    {title:>9}: {count:>8} names in {seconds:7.2f} s, {count / seconds:8.0f} names/s')
+
+
+def bench_netscape(n: int):
+    """Measure the Netscape HTML export of a tree and the import of the exported file:
+    time, throughput and the peak memory of the export, which does not depend on the tree size.
+
+    :param n: number of nodes
+    :return: nothing
+    """
+    html_name = 'bench_netscape.html'
+    filename = 'bench_netscape.json'
+    model = _write_tree(n, filename)
+    start = time.perf_counter()
+    result = model.export_netscape(html_name)
+    seconds = time.perf_counter() - start
+    assert result == (True, ''), result
+    tracemalloc.start()
+    model.export_netscape(html_name)  # the tracing slows down, so the time is measured without it
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = os.path.getsize(html_name) / 1_048_576
+    print(f'netscape, {n} nodes, {size:.1f} MB:')
+    print(f'    export: {seconds:6.2f} s, {n / seconds:8.0f} nodes/s, peak {peak / 1024:7.1f} KB')
+    model.delete_database(filename)
+    model.create_database(filename)
+    start = time.perf_counter()
+    result = model.convert_mozilla(html_name)
+    seconds = time.perf_counter() - start
+    assert result == (True, ''), result
+    print(f'    import: {seconds:6.2f} s, {n / seconds:8.0f} nodes/s')
+    model.delete_database(filename)
+    os.remove(html_name)
+
+
+def _write_places(n: int, filename: str):
+    """Write a Firefox places.sqlite database of n entries with the layout of the generated trees,
+    every tenth url is tagged. The tables keep the columns used by the reader and the indexes of Firefox.
+
+    :param n: number of entries
+    :param filename: places.sqlite filename
+    :return: nothing
+    """
+    prtime = 1678000000000000  # a PRTime timestamp, the entries are added a second apart
+    conn = sqlite3.connect(filename)
+    conn.executescript("""
+        CREATE TABLE moz_places (id INTEGER PRIMARY KEY, url LONGVARCHAR, title LONGVARCHAR);
+        CREATE TABLE moz_bookmarks (id INTEGER PRIMARY KEY, type INTEGER, fk INTEGER DEFAULT NULL, parent INTEGER,
+                                    position INTEGER, title LONGVARCHAR, dateAdded INTEGER, lastModified INTEGER,
+                                    guid TEXT UNIQUE);
+        CREATE TABLE moz_keywords (id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT UNIQUE, place_id INTEGER);
+        CREATE INDEX moz_bookmarks_itemindex ON moz_bookmarks (fk, type);
+        CREATE INDEX moz_bookmarks_parentindex ON moz_bookmarks (parent, position);
+        CREATE INDEX moz_keywords_placeindex ON moz_keywords (place_id);
+        """)
+    base = n + 10  # ids of the generated nodes are shifted, the first ones are the root folders
+    rows = [(1, 2, None, 0, 0, '', prtime, prtime, 'root________'),
+            (2, 2, None, 1, 0, 'toolbar', prtime, prtime, 'toolbar_____'),
+            (3, 2, None, 1, 1, 'tags', prtime, prtime, 'tags________'),
+            (4, 2, None, 3, 0, 'tag', prtime, prtime, 'tag_________')]
+    places = []
+    stack = [(generate_tree(n), 2)]
+    while stack:
+        folder, parent_id = stack.pop()
+        for position, node in enumerate(folder.children):
+            id_no = base + node.id_no
+            date = prtime + node.id_no * 1_000_000
+            if isinstance(node, Folder):
+                rows.append((id_no, 2, None, parent_id, position, node.name, date, date, node.guid[-12:]))
+                stack.append((node, id_no))
+            else:
+                places.append((id_no, node.url, None))
+                rows.append((id_no, 1, id_no, parent_id, position, node.name, date, date, node.guid[-12:]))
+                if node.id_no % 10 == 1:
+                    rows.append((base * 2 + node.id_no, 1, id_no, 4, node.id_no, None, date, date,
+                                 f'tagged{node.id_no:06}'[-12:]))
+    conn.executemany('INSERT INTO moz_places VALUES (?, ?, ?)', places)
+    conn.executemany('INSERT INTO moz_bookmarks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    conn.commit()
+    conn.close()
+
+
+def bench_places(n: int):
+    """Measure the Firefox places.sqlite import into ModelJSON and ModelSQLite: time, throughput
+    and the peak memory, compared with the plain fetching of the rows.
+
+    :param n: number of entries in places.sqlite
+    :return: nothing
+    """
+    places_name = 'bench_places.sqlite'
+    if os.path.isfile(places_name):
+        os.remove(places_name)
+    _write_places(n, places_name)
+    print(f'places import, {n} entries:')
+
+    def _plain_fetching():
+        conn = sqlite3.connect(places_name)
+        rows = conn.execute('SELECT * FROM moz_bookmarks').fetchall()
+        conn.close()
+        return rows
+
+    tracemalloc.start()
+    _plain_fetching()
+    plain_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'    {"fetchall":>8}: peak {plain_peak / 1_048_576:7.1f} MB')
+    for title, model, filename in (('json', ModelJSON(), 'bench_places.json'),
+                                   ('sqlite', ModelSQLite(), 'bench_places_db.sqlite')):
+        for traced in (False, True):
+            if os.path.isfile(filename):
+                model.delete_database(filename)
+            model.create_database(filename)
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            result = model.convert_mozilla(places_name)
+            seconds = time.perf_counter() - start
+            assert result == (True, ''), result
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f'    {"":>8}  peak {peak / 1_048_576:7.1f} MB')
+            else:
+                print(f'    {title:>8}: {seconds:6.2f} s, {n / seconds:8.0f} entries/s')
+        model.close()
+        model.delete_database(filename)
+    os.remove(places_name)
+
+
+BENCHMARKS = {
+    'memory': bench_memory,
+    'load': bench_load,
+    'save': bench_save,
+    'lazy': bench_lazy,
+    'add_nodes': bench_add_nodes,
+    'names': bench_names,
+    'projection': bench_projection,
+    'subtree': bench_subtree,
+    'batch': bench_batch,
+    'server': bench_server,
+    'async': bench_async,
+    'snapshot': bench_snapshot,
+    'search': bench_search,
+    'iter_tree': bench_iter_tree,
+    'print_tree': bench_print_tree,
+    'select': bench_select,
+    'startup': bench_startup,
+    'chrome': bench_chrome,
+    'chrome_export': bench_chrome_export,
+    'netscape': bench_netscape,
+    'places': bench_places,
+}  #: benchmark name: function(n)
+
+
+def main():
+    """Run the benchmarks given by the command line, all by default"""
+    args = sys.argv[1:]
+    n = 1_000_000  # default number of nodes
+    if '--nodes' in args:
+        i = args.index('--nodes')
+        n = int(args[i + 1])
+        del args[i:i + 2]
+    for name in args or BENCHMARKS:
+        BENCHMARKS[name](n)
+
+
+if __name__ == '__main__':
+    main()
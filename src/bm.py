@@ -0,0 +1,213 @@
+"""Command-line interface of the bookmark manager.
+One-shot subcommands work on a JSON database without the menus, <open> starts the menus with the opened tree:
+
+    python bm.py open DATABASE
+    python bm.py print DATABASE [--depth N]
+    python bm.py search DATABASE WORD ... [--limit N]
+    python bm.py add DATABASE NAME PARENT [--url URL] [--icon ICON] [--keywords KEYWORDS]
+    python bm.py delete DATABASE NAME
+    python bm.py export DATABASE {chrome,netscape} FILENAME
+    python bm.py batch DATABASE [COMMANDS_FILE]
+    python bm.py serve DATABASE [--socket SOCKET]
+
+Only sys, argparse and the constants of common are imported at the start,
+a subcommand imports the modules it needs at its call.
+The <print> subcommand opens the database lazily, it walks the node index and decodes no node.
+A subcommand exits with 0 for success, 1 for an error of the bookmark tree, 2 for wrong arguments.
+
+"""
+import sys
+import argparse
+
+from common import SEARCH_LIMIT
+
+
+def _open(model_class, database: str):
+    """Open the database with a new model, exit with 1 if the file does not exist.
+
+    :param model_class: class of the model
+    :param database: filename of the database
+    :return: the model with the opened tree
+    """
+    model = model_class()
+    try:
+        model.open_database(database)
+    except FileNotFoundError:
+        sys.exit(f'File <{database}> does not exist')
+    return model
+
+
+def cmd_open(args: argparse.Namespace) -> int:
+    """Start the menus of the bookmark manager with the opened tree."""
+    import presenter
+    try:
+        presenter.main(args.database)
+    except FileNotFoundError:
+        print(f'File <{args.database}> does not exist', file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_print(args: argparse.Namespace) -> int:
+    """Print the tree, the folders of the last level are collapsed."""
+    from model_lazy import ModelLazyJSON
+    from view_cli import ViewCLI
+    model = _open(ModelLazyJSON, args.database)
+    ViewCLI().output_tree(model.iter_tree(max_depth=args.depth), args.depth)
+    model.close()
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    """Print the names of the found bookmarks, the best matches first."""
+    from model_json import ModelJSON
+    model = _open(ModelJSON, args.database)
+    found = model.search(' '.join(args.words), args.limit)
+    if found:
+        sys.stdout.write(''.join(name + '\n' for name in found))
+    return 0 if found else 1
+
+
+def cmd_add(args: argparse.Namespace) -> int:
+    """Add a folder, or an url if the url is given."""
+    import exceptions
+    from model_json import ModelJSON
+    model = _open(ModelJSON, args.database)
+    attr_dict = {'name': args.name, 'parent_name': args.parent}
+    if args.url is not None:
+        attr_dict |= {'url': args.url, 'icon': args.icon, 'keywords': args.keywords}
+    try:
+        model.add_nodes((attr_dict, ))  # the parent and the name are checked
+    except exceptions.MyProjectError as e:
+        print(str(e).strip(), file=sys.stderr)
+        return 1
+    model.close()
+    print(f'Folder/Url <{args.name}> has been added')
+    return 0
+
+
+def cmd_delete(args: argparse.Namespace) -> int:
+    """Delete an url or an empty folder."""
+    import exceptions
+    from model_json import ModelJSON
+    if args.name == 'roots':
+        print(f'Folder <{args.name}> can not be deleted', file=sys.stderr)
+        return 1
+    model = _open(ModelJSON, args.database)
+    try:
+        model.delete_node(args.name)
+    except exceptions.MyProjectError as e:
+        print(str(e).strip(), file=sys.stderr)
+        return 1
+    model.close()
+    print(f'Bookmark {args.name} has been deleted')
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Export the tree to a browser bookmark file."""
+    from model_lazy import ModelLazyJSON
+    model = _open(ModelLazyJSON, args.database)
+    export = model.export_chrome if args.format == 'chrome' else model.export_netscape
+    result, message = export(args.filename)
+    model.close()
+    if not result:
+        print(message, file=sys.stderr)
+        return 1
+    print(f'The tree has been exported to <{args.filename}>')
+    return 0
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    """Run the batch commands, see the batch module."""
+    from batch import Batch
+    from model_json import ModelJSON
+    model = _open(ModelJSON, args.database)
+    if args.commands:
+        with open(args.commands, encoding='utf-8') as f:
+            done, failed = Batch(model).run(f, sys.stdout)
+    else:
+        done, failed = Batch(model).run(sys.stdin, sys.stdout)
+    model.close()
+    return 1 if failed else 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """Serve the tree until SIGINT, SIGTERM or the shutdown request, see the server module."""
+    import asyncio
+    from server import serve
+    try:
+        asyncio.run(serve(args.database, args.socket))
+    except FileNotFoundError:
+        print(f'File <{args.database}> does not exist', file=sys.stderr)
+        return 1
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """Make the parser of the command line, a subcommand sets its function to the <func> argument.
+
+    :return: the parser
+    """
+    parser = argparse.ArgumentParser(prog='bm', description='Bookmark manager')
+    subparsers = parser.add_subparsers(title='subcommands', required=True, metavar='SUBCOMMAND')
+
+    sub = subparsers.add_parser('open', help='start the menus with the opened tree')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.set_defaults(func=cmd_open)
+
+    sub = subparsers.add_parser('print', help='print the tree')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.add_argument('--depth', type=int, default=None, help='the deepest printed level, folders of it are collapsed')
+    sub.set_defaults(func=cmd_print)
+
+    sub = subparsers.add_parser('search', help='search bookmarks by their names, urls and keywords')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.add_argument('words', nargs='+', help='words to search, the last one may be incomplete')
+    sub.add_argument('--limit', type=int, default=SEARCH_LIMIT, help='maximal number of the results')
+    sub.set_defaults(func=cmd_search)
+
+    sub = subparsers.add_parser('add', help='add a folder, or an url with --url')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.add_argument('name', help='name of the new node')
+    sub.add_argument('parent', help='name of the parent folder')
+    sub.add_argument('--url', default=None, help='url of the new bookmark, a folder is added without it')
+    sub.add_argument('--icon', default='', help='icon of the new bookmark')
+    sub.add_argument('--keywords', default='', help='keywords of the new bookmark')
+    sub.set_defaults(func=cmd_add)
+
+    sub = subparsers.add_parser('delete', help='delete an url or an empty folder')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.add_argument('name', help='name of the node')
+    sub.set_defaults(func=cmd_delete)
+
+    sub = subparsers.add_parser('export', help='export the tree to a browser bookmark file')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.add_argument('format', choices=('chrome', 'netscape'), help='format of the bookmark file')
+    sub.add_argument('filename', help='bookmark filename, an existing file is overwritten')
+    sub.set_defaults(func=cmd_export)
+
+    sub = subparsers.add_parser('batch', help='run commands from a file or stdin, see the batch module')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.add_argument('commands', nargs='?', default='', help='filename of the commands, stdin by default')
+    sub.set_defaults(func=cmd_batch)
+
+    sub = subparsers.add_parser('serve', help='keep the tree in the memory for the clients, see the server module')
+    sub.add_argument('database', help='filename of the JSON database')
+    sub.add_argument('--socket', default='', help='filename of the Unix socket, DATABASE.sock by default')
+    sub.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse the command line and run the subcommand.
+
+    :param argv: arguments of the command line, sys.argv[1:] by default
+    :return: exit status of the subcommand
+    """
+    args = make_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
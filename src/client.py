@@ -0,0 +1,167 @@
+"""Client of the bookmark server, see the server module.
+BookmarkClient implements ModelProto, so Model(BookmarkClient(socket)) is used as any other model:
+a call is one request line and one response line on the connection, the tree is not loaded by the client.
+An exception of the model is raised again by the client with its type and message,
+an error of the protocol raises ServerError.
+
+"""
+import json
+import socket
+import builtins
+import itertools
+import typing as t
+
+import exceptions
+from common import SEARCH_LIMIT
+from traversal import TreeItem, Subtree
+
+MODEL_ERROR = 1  #: error code of an exception of the model, see the server module
+
+
+def _remote_error(error: dict) -> Exception:
+    """Make the exception of an error response.
+
+    :param error: the error object of the response
+    :return: the exception of the model with the message of the server, or ServerError
+    """
+    if error.get('code') == MODEL_ERROR:
+        type_name = error.get('data', {}).get('type', '')
+        cls = getattr(exceptions, type_name, None) or getattr(builtins, type_name, None)
+        if isinstance(cls, type) and issubclass(cls, Exception):
+            exc = cls.__new__(cls)  # the exceptions of the project make their messages from other arguments
+            exc.args = (error['message'], )
+            return exc
+    return exceptions.ServerError(error.get('code'), error.get('message', ''))
+
+
+class BookmarkClient:
+    """Implementation of ModelProto by the requests to the bookmark server.
+
+    """
+    def __init__(self, path: str, timeout: float | None = None):
+        """Constructor method, connect to the server.
+
+        :exception: FileNotFoundError or ConnectionRefusedError if the server does not run
+
+        :param path: filename of the Unix socket of the server
+        :param timeout: timeout of a call in seconds, None to wait forever
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self._responses = self.sock.makefile('rb')  # buffered reading of the response lines
+        self._ids = itertools.count(1)  # ids of the requests
+        self.cwd: str = self.call('cwd')  #: work directory of the server, relative filenames are resolved in it
+
+    def call(self, method: str, *params):
+        """Call a method of the server.
+
+        :raises ConnectionError: if the server closed the connection
+        :raises ServerError: if the server rejected the request
+
+        :param method: name of the method
+        :param params: positional arguments of the method
+        :return: result of the method
+        """
+        req_id = next(self._ids)
+        request = {'jsonrpc': '2.0', 'id': req_id, 'method': method, 'params': params}
+        self.sock.sendall(json.dumps(request, ensure_ascii=False).encode() + b'\n')
+        line = self._responses.readline()
+        if not line:
+            raise ConnectionError('The bookmark server closed the connection')
+        response = json.loads(line)
+        if 'error' in response:
+            raise _remote_error(response['error'])
+        return response['result']
+
+    def disconnect(self):
+        """Close the connection, the server keeps the tree.
+
+        :return: nothing
+        """
+        self._responses.close()
+        self.sock.close()
+
+    def shutdown(self):
+        """Stop the server, the changes are flushed.
+
+        :return: nothing
+        """
+        self.call('shutdown')
+        self.disconnect()
+
+    # ---- nodes section ----
+    def get_children(self, node_name: str, offset: int = 0, limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it, see ModelProto."""
+        result, children = self.call('get_children', node_name, offset, limit)
+        return result, tuple(children)
+
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+        """Walk the subtree of the start node, see ModelProto. The server sends all the records at once."""
+        return (TreeItem(*item) for item in self.call('iter_tree', start, order, max_depth))
+
+    def get_subtree(self, name: str = 'roots', max_depth: int | None = None, fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once, see ModelProto. One request for the whole subtree."""
+        return Subtree(*self.call('get_subtree', name, max_depth, list(fields)))
+
+    def add_node(self, attr_dict: dict, node_type: bool):
+        """Add a folder or url to the tree, see ModelProto."""
+        self.call('add_node', attr_dict, node_type)
+
+    def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree, see ModelProto. The batch is one request."""
+        self.call('add_nodes', list(attr_dicts))
+
+    def update_node(self, name: str, attr_dict: dict):
+        """Update a folder or url of the tree, see ModelProto."""
+        self.call('update_node', name, attr_dict)
+
+    def delete_node(self, name: str):
+        """Delete a node from the tree, see ModelProto."""
+        self.call('delete_node', name)
+
+    def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder, see ModelProto."""
+        self.call('move_node', name, parent_name)
+
+    def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it, see ModelProto."""
+        return self.call('get_node', name, None if fields is None else list(fields))
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords, see ModelProto."""
+        return tuple(self.call('search', query, limit))
+
+    # ---- database section ----
+    def create_database(self, name: str):
+        """Create an empty bookmark structure and a file to keep the database, see ModelProto."""
+        self.call('create_database', name)
+
+    def open_database(self, name: str):
+        """Open a database, see ModelProto. The server serves the new tree to all its clients."""
+        self.call('open_database', name)
+
+    def delete_database(self, name):
+        """Delete the database file, see ModelProto."""
+        self.call('delete_database', name)
+
+    def close(self):
+        """Flush the unsaved changes of the tree, see ModelProto. The connection is kept."""
+        self.call('close')
+
+    # ---- convertors section ----
+    def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the tree, see ModelProto."""
+        return tuple(self.call('convert_chrome', filename))
+
+    def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the tree, see ModelProto."""
+        return tuple(self.call('convert_mozilla', filename))
+
+    def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Netscape bookmark HTML file, see ModelProto."""
+        return tuple(self.call('export_netscape', filename))
+
+    def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Chrome bookmark JSON file, see ModelProto."""
+        return tuple(self.call('export_chrome', filename))
@@ -12,3 +12,18 @@ FILL_HEADER = '-'  #: a character to fill header's line
 VALID_CHARS = "_-. /"  #: valid special characters in the names of bookmarks ot trees
 URL_FIELDS = ['name', 'url', 'icon', 'keywords']  #: enabled url fields to modify
 FOLDER_FIELDS = ['name']  #: enabled url fields to modify
+JOURNAL_SUFFIX = '.log'  #: suffix of the journal file, sidecar of the database file
+JOURNAL_LIMIT = 1_048_576  #: size of the journal in bytes to fold it into a fresh snapshot
+TEMP_SUFFIX = '.tmp'  #: suffix of the temporary file for the atomic saving
+SNAPSHOT_SUFFIX = '.snap'  #: suffix of the binary snapshot cache of the database file
+INDEX_SUFFIX = '.idx'  #: suffix of the node index file for the lazy opening
+LAZY_CACHE_SIZE = 256  #: number of materialized folders kept by the lazy model
+SEARCH_LIMIT = 20  #: default number of the search results
+OUTPUT_CHUNK = 4096  #: number of the buffered lines written at once by the tree printing
+TREE_DEPTH = None  #: depth of the tree printing, the folders of the last level are collapsed, None for the whole tree
+PAGE_SIZE = 0  #: lines per screen of the tree printing on a terminal, 0 for the terminal height, -1 for no paging
+SOCKET_SUFFIX = '.sock'  #: suffix of the Unix socket of the server, sidecar of the database file
+SERVER_FLUSH_MS = 50  #: the server flushes the changes this number of milliseconds after the first unsaved one
+MODEL_CHUNK = 1024  #: number of the iter_tree records passed from the model thread at once
+SAVE_CHUNK = 1024  #: number of the urls encoded by one call of the json encoder at the saving
+SELECT_PAGE = 30  #: data lines per page of a selection list, a longer list is paged and can be filtered
@@ -0,0 +1,493 @@
+"""Readers of the bookmark files of internet browsers.
+A reader converts a file into lists of new node objects, Folder and Url, with their children.
+The nodes are not in a tree yet: names may be duplicated and parent guids are not set,
+a Model adds them to its tree (see RootBookmarks.add_subtrees()) and saves the tree once.
+
+Chrome keeps the bookmarks in a JSON file with three root folders: bookmark_bar, other and synced.
+The file is decoded with an object hook, so every Chrome entry is converted to a node
+as soon as it is decoded and the dictionaries of the entries are not kept.
+
+The Chrome writer is a generator of JSON chunks with the stack of children iterators, it computes the checksum
+of Chrome in the same pass: MD5 of the id, the UTF-16 name and the url (or 'folder') of every node in the file order.
+The checksum follows the roots, the order of the keys does not matter for Chrome.
+
+The Netscape bookmark HTML file is exported by Firefox and other browsers. It is read by chunks with
+a streaming html.parser, the parser keeps the stack of open folders only. The writer is a generator
+of lines with the stack of children iterators, so both directions need the memory for the tree depth.
+
+Firefox keeps the bookmarks in the places.sqlite database of the profile: the entries of moz_bookmarks
+refer to their parent folders by id and to the urls in moz_places. The entries are read by batches
+ordered by the parent and the position, the hierarchy is built in one pass: every folder id has its children
+list, an entry is appended to the list of its parent whenever the parent itself is read.
+Firefox tags are the folders of the tags root, they become the keywords of the urls.
+"""
+import re
+import json
+import html
+import uuid
+import sqlite3
+import hashlib
+import pathlib
+import itertools
+import typing as t
+from datetime import datetime
+from datetime import timezone
+from functools import lru_cache
+from html.parser import HTMLParser
+from json.encoder import encode_basestring
+
+from time_convert import stamp_to_string
+from time_convert import object_to_stamp
+from my_nodes import Folder
+from my_nodes import Url
+
+CHROME_ROOTS = ('bookmark_bar', 'other', 'synced')  #: root folders of the Chrome bookmarks
+CHROME_ROOT_GUIDS = {'bookmark_bar': '0bc5d13f-2cba-5d74-951f-3f233fe6c908',
+                     'other': '82b081ec-3dd3-529c-8475-ab6c344590dd',
+                     'synced': '4cf2e351-0e85-532b-bb37-df045d8f8d0f'}  #: permanent guids of the Chrome root folders
+CHROME_GUID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')  #: a guid valid for Chrome
+CHROME_ROOT_NAMES = {'bookmark_bar': 'Bookmarks bar', 'other': 'Other bookmarks',
+                     'synced': 'Mobile bookmarks'}  #: names of the new Chrome root folders
+NETSCAPE_DOCTYPE = 'NETSCAPE-Bookmark-file-1'  #: doctype of the Netscape bookmark HTML file
+NETSCAPE_HEADER = f"""<!DOCTYPE {NETSCAPE_DOCTYPE}>
+<!-- This is an automatically generated file.
+     It will be read and overwritten.
+     DO NOT EDIT! -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+"""  #: beginning of the Netscape bookmark HTML file
+CHUNK_SIZE = 65536  #: size of the chunks to read a bookmark file
+SQLITE_HEADER = b'SQLite format 3\x00'  #: beginning of an SQLite database file
+PLACES_BATCH = 10_000  #: number of the rows fetched at once from places.sqlite
+PLACES_ROOT = 'root________'  #: guid of the root folder of places.sqlite
+PLACES_TAGS = 'tags________'  #: guid of the folder of the tags
+PLACES_ROOTS = {'menu________': 'Bookmarks Menu', 'toolbar_____': 'Bookmarks Toolbar',
+                'unfiled_____': 'Other Bookmarks', 'mobile______': 'Mobile Bookmarks'}  #: names of the root folders
+# folders and urls except the tags, the tags of an url are folded into one string,
+# an untitled url is named as its page or by its url, as Firefox shows it
+PLACES_QUERY = """
+WITH tags AS (SELECT id FROM moz_bookmarks WHERE guid = ?)
+SELECT b.id, b.type, b.parent, COALESCE(NULLIF(b.title, ''), p.title, p.url, ''), b.dateAdded, b.lastModified, b.guid, IFNULL(p.url, ''),
+       (SELECT group_concat(t.title, ',') FROM moz_bookmarks AS e JOIN moz_bookmarks AS t ON t.id = e.parent
+        WHERE e.fk = b.fk AND t.parent IN tags),
+       (SELECT keyword FROM moz_keywords WHERE place_id = b.fk)
+FROM moz_bookmarks AS b LEFT JOIN moz_places AS p ON p.id = b.fk
+WHERE b.type IN (1, 2) AND b.id NOT IN tags
+  AND b.parent NOT IN tags AND b.parent NOT IN (SELECT id FROM moz_bookmarks WHERE parent IN tags)
+ORDER BY b.parent, b.position
+"""
+
+
+def _today() -> str:
+    """Get the current datetime as a string, without microseconds.
+
+    :return: datetime in ISO 8601 format
+    """
+    return datetime.isoformat(datetime.today().replace(microsecond=0))
+
+
+@lru_cache(maxsize=65536)
+def _google_seconds(seconds: int) -> str:
+    """Convert the seconds of a Chrome timestamp, entries added together share them.
+
+    :param seconds: seconds since January 1, 1601
+    :return: datetime in ISO 8601 format
+    """
+    return stamp_to_string(seconds * 1_000_000, 'google')
+
+
+def unix_date(stamp: str | None) -> str:
+    """Convert a Unix timestamp of the Netscape bookmark file to the datetime string of the nodes.
+
+    :param stamp: seconds since January 1, 1970 as a string, None, '0' or empty for an unknown date
+    :return: datetime in ISO 8601 format, the current datetime for an unknown or invalid timestamp
+    """
+    try:
+        if stamp and int(stamp):
+            return stamp_to_string(int(stamp), 'unix')
+    except (ValueError, OverflowError, OSError):
+        pass  # not a number or out of the platform range
+    return _today()
+
+
+@lru_cache(maxsize=65536)
+def date_to_stamp(date: str, epoch_type: str) -> int:
+    """Convert the datetime string of a node to a timestamp, nodes added together share the datetime.
+
+    :param date: datetime in ISO 8601 format, UTC
+    :param epoch_type: output format, see time_convert.object_to_stamp()
+    :return: timestamp, 0 for an invalid datetime
+    """
+    try:
+        return object_to_stamp(datetime.fromisoformat(date).replace(tzinfo=timezone.utc), epoch_type)
+    except (ValueError, TypeError, OverflowError, OSError):
+        return 0  # unknown date
+
+
+@lru_cache(maxsize=65536)
+def _prtime_seconds(seconds: int) -> str:
+    """Convert the seconds of a PRTime timestamp, entries added together share them.
+
+    :param seconds: seconds since January 1, 1970
+    :return: datetime in ISO 8601 format
+    """
+    return stamp_to_string(seconds * 1_000_000, 'prtime')
+
+
+def prtime_date(stamp: int | None) -> str:
+    """Convert a Mozilla PRTime timestamp to the datetime string of the nodes.
+
+    :param stamp: microseconds since January 1, 1970, None or 0 for an unknown date
+    :return: datetime in ISO 8601 format, the current datetime for an unknown or invalid timestamp
+    """
+    try:
+        if stamp:
+            return _prtime_seconds(stamp // 1_000_000)  # the nodes keep the seconds only
+    except (TypeError, OverflowError, OSError):
+        pass  # not a number or out of the platform range
+    return _today()
+
+
+def chrome_date(stamp: str) -> str:
+    """Convert a Chrome timestamp to the datetime string of the nodes.
+
+    :param stamp: microseconds since January 1, 1601 as a string, '0' or empty for an unknown date
+    :return: datetime in ISO 8601 format, the current datetime for an unknown or invalid timestamp
+    """
+    try:
+        if int(stamp):
+            return _google_seconds(int(stamp) // 1_000_000)  # the nodes keep the seconds only
+    except (ValueError, OverflowError, OSError):
+        pass  # not a number or out of the platform range
+    return _today()
+
+
+def _chrome_hook(dct: dict):
+    """Object hook of the json decoder: convert a Chrome entry to a node, keep other objects.
+    Children of a folder are decoded and converted before the folder itself.
+
+    :param dct: decoded json object
+    :return: Folder or Url object for an entry, the input dictionary otherwise
+    """
+    node_type = dct.get('type')
+    if node_type == 'url':
+        return Url.from_dict({'url': dct.get('url', ''), 'icon': '', 'keywords': '', 'id_no': dct.get('id', 0),
+                              'date_added': chrome_date(dct.get('date_added', '')), 'guid': dct.get('guid', ''),
+                              'parent_guid': '', 'name': dct.get('name', '')})
+    if node_type == 'folder':
+        return Folder.from_dict({'children': dct.get('children', []),
+                                 'date_modified': chrome_date(dct.get('date_modified', '')),
+                                 'id_no': dct.get('id', 0), 'date_added': chrome_date(dct.get('date_added', '')),
+                                 'guid': dct.get('guid', ''), 'parent_guid': '', 'name': dct.get('name', '')})
+    return dct
+
+
+def read_chrome(filename: str) -> list[Folder]:
+    """Read a Chrome bookmark file.
+
+    :exceptions: FileNotFoundError if the file does not exist, ValueError if it is not a Chrome bookmark file
+
+    :param filename: Chrome bookmark filename
+    :return: list of the Chrome root folders which are present in the file, with their subtrees
+    """
+    with open(filename, encoding='utf-8') as f:
+        image = json.load(f, object_hook=_chrome_hook)  # ValueError for a broken json
+    roots = image.get('roots') if isinstance(image, dict) else None
+    if not isinstance(roots, dict):
+        raise ValueError(f'<{filename}> is not a Chrome bookmark file, no roots')
+    return [roots[name] for name in CHROME_ROOTS if isinstance(roots.get(name), Folder)]
+
+
+def _chrome_guid(guid: str) -> str:
+    """Get a guid valid for Chrome: a lowercase uuid string.
+
+    :param guid: guid of the node
+    :return: the same guid if it is valid, a new one otherwise
+    """
+    if CHROME_GUID.fullmatch(guid):
+        return guid
+    return str(uuid.uuid4())  # guids of Firefox and others
+
+
+def chrome_chunks(root, get_children: t.Callable[[t.Any], t.Iterable]) -> t.Iterator[str]:
+    """Generate the chunks of the Chrome bookmark file, in the tree order.
+    Top level folders with the guids of the Chrome roots become these roots, other top level nodes are added
+    to the bookmark bar. Ids of the nodes are kept if they are unique numbers, other nodes get new ids.
+    Every open folder keeps an iterator of its children, the set of the used ids is the only O(n) state.
+
+    :param root: the root node, its children are the top level nodes
+    :param get_children: function to get an iterable of the children objects of a folder or the root
+    :return: iterator of the JSON chunks
+    """
+    checksum = hashlib.md5()
+    root_names = {guid: name for name, guid in CHROME_ROOT_GUIDS.items()}
+    roots: dict = {}  # {Chrome root name: folder}
+    others = []  # top level nodes added to the bookmark bar
+    for node in get_children(root):
+        name = root_names.get(node.guid) if isinstance(node, Folder) else None
+        if name and name not in roots:
+            roots[name] = node
+        else:
+            others.append(node)
+    used_ids = set()
+    new_ids = itertools.count(1)
+
+    def _next_id(node) -> str:
+        """Keep the id of the node if it is a new number, otherwise get a new one."""
+        try:
+            id_no = int(node.id_no)
+        except (ValueError, TypeError):
+            id_no = 0
+        while id_no <= 0 or id_no in used_ids:
+            id_no = next(new_ids)
+        used_ids.add(id_no)
+        return str(id_no)
+
+    def _open_folder(folder, id_no: str) -> tuple[str, str]:
+        """Get the beginning and the end of the folder object, the children are between them."""
+        checksum.update(id_no.encode() + folder.name.encode('utf-16-le') + b'folder')
+        return '{"children": [', (f'], "date_added": "{date_to_stamp(folder.date_added, "google")}", '
+                                  f'"date_modified": "{date_to_stamp(folder.date_modified, "google")}", '
+                                  f'"guid": "{_chrome_guid(folder.guid)}", "id": "{id_no}", '
+                                  f'"name": {encode_basestring(folder.name)}, "type": "folder"}}')
+
+    children_lists = {}  # {Chrome root name: iterable of its children}
+    for i, name in enumerate(CHROME_ROOTS):
+        if name in roots:
+            children_lists[name] = get_children(roots[name])
+        else:  # a new empty root with the id of a new Chrome profile
+            roots[name] = Folder(id_no=i + 1, guid=CHROME_ROOT_GUIDS[name], name=CHROME_ROOT_NAMES[name])
+            children_lists[name] = ()
+    root_ids = [_next_id(roots[name]) for name in CHROME_ROOTS]  # the roots get their ids before the nodes
+    yield '{\n   "roots": {'
+    for i, name in enumerate(CHROME_ROOTS):
+        children = iter(children_lists[name])
+        if name == 'bookmark_bar':
+            children = itertools.chain(children, others)
+        head, tail = _open_folder(roots[name], root_ids[i])
+        yield f'{"," if i else ""}\n      "{name}": {head}'
+        stack = [(children, tail)]  # explicit stack of the children iterators and ends of the open folders
+        first = True  # the next node is the first child of its folder
+        while stack:
+            node = next(stack[-1][0], None)
+            separator = '\n' if first else ',\n'
+            if node is None:
+                yield stack.pop()[1]  # end of the folder
+                first = False
+            elif isinstance(node, Folder):
+                head, tail = _open_folder(node, _next_id(node))
+                yield separator + head
+                stack.append((iter(get_children(node)), tail))
+                first = True
+            else:
+                id_no = _next_id(node)
+                checksum.update(id_no.encode() + node.name.encode('utf-16-le') + b'url' + node.url.encode())
+                yield (f'{separator}{{"date_added": "{date_to_stamp(node.date_added, "google")}", '
+                       f'"guid": "{_chrome_guid(node.guid)}", "id": "{id_no}", "name": {encode_basestring(node.name)}, '
+                       f'"type": "url", "url": {encode_basestring(node.url)}}}')
+                first = False
+    yield f'\n   }},\n   "checksum": "{checksum.hexdigest()}",\n   "version": 1\n}}\n'
+
+
+def write_chrome(root, filename: str, get_children: t.Callable[[t.Any], t.Iterable]):
+    """Write the tree to a Chrome bookmark file, chunk by chunk.
+
+    :param root: the root node
+    :param filename: Chrome bookmark filename
+    :param get_children: function to get an iterable of the children objects of a folder or the root
+    :return: nothing
+    """
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(chrome_chunks(root, get_children))
+
+
+class NetscapeParser(HTMLParser):
+    """Streaming parser of the Netscape bookmark HTML file.
+    <DT><H3>name</H3> is a folder, the next <DL> list contains its children,
+    <DT><A HREF="url">name</A> is an url. Nodes are added to the children of the open folder
+    as soon as their names end.
+
+    """
+    def __init__(self):
+        """Constructor method.
+        """
+        super().__init__(convert_charrefs=True)
+        self.nodes: list = []  # top level nodes of the file
+        self.netscape = False  # True if the doctype of the Netscape bookmark file has been met
+        self._lists: list[list] = []  # stack of the children lists of the open folders
+        self._node: Folder | Url | None = None  # the node whose name is being read
+        self._text: list[str] = []  # parts of the node name
+        self._folder: Folder | None = None  # the last folder, its children list is the next <DL>
+
+    def handle_decl(self, decl: str):
+        """Check the doctype of the file."""
+        if decl.upper() == f'DOCTYPE {NETSCAPE_DOCTYPE}'.upper():
+            self.netscape = True
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        """Open a folder list, start a folder or an url."""
+        if tag == 'dl':
+            if self._folder is not None:
+                self._lists.append(self._folder.children)  # children of the last folder
+                self._folder = None
+            else:
+                self._lists.append(self._lists[-1] if self._lists else self.nodes)  # the top level list
+        elif tag == 'h3' and self._lists:
+            attr_dict = dict(attrs)
+            date_added = unix_date(attr_dict.get('add_date'))
+            self._node = Folder(guid='', date_added=date_added,  # guids are set at the adding to a tree
+                                date_modified=unix_date(attr_dict.get('last_modified')))
+            self._text = []
+        elif tag == 'a' and self._lists:
+            attr_dict = dict(attrs)
+            self._node = Url(url=attr_dict.get('href') or '', icon=attr_dict.get('icon') or '',
+                             keywords=attr_dict.get('tags') or attr_dict.get('shortcuturl') or '',
+                             guid='', date_added=unix_date(attr_dict.get('add_date')))
+            self._text = []
+        elif tag == 'dt':
+            self._folder = None  # the last folder has no children list
+
+    def handle_endtag(self, tag: str):
+        """Close a folder list, add a folder or an url to the open folder."""
+        if tag == 'dl':
+            if self._lists:
+                self._lists.pop()
+            self._folder = None
+        elif tag in ('h3', 'a') and self._node is not None:
+            self._node.name = ''.join(self._text).strip()  # an empty name is replaced at the adding to a tree
+            self._lists[-1].append(self._node)
+            self._folder = self._node if tag == 'h3' else None
+            self._node = None
+
+    def handle_data(self, data: str):
+        """Collect the name of the node."""
+        if self._node is not None:
+            self._text.append(data)
+
+
+def read_netscape(filename: str, chunk_size: int = CHUNK_SIZE) -> list:
+    """Read a Netscape bookmark HTML file by chunks.
+
+    :exceptions: FileNotFoundError if the file does not exist, ValueError if it is not a Netscape bookmark file
+
+    :param filename: bookmark HTML filename
+    :param chunk_size: number of characters read at once
+    :return: list of the top level nodes with their subtrees
+    """
+    parser = NetscapeParser()
+    with open(filename, encoding='utf-8', errors='replace') as f:
+        while chunk := f.read(chunk_size):
+            parser.feed(chunk)
+    parser.close()
+    if not parser.netscape:
+        raise ValueError(f'<{filename}> is not a Netscape bookmark file, no doctype')
+    return parser.nodes
+
+
+def netscape_lines(root, get_children: t.Callable[[t.Any], t.Iterable]) -> t.Iterator[str]:
+    """Generate the lines of the Netscape bookmark HTML file, in the tree order.
+    Every open folder keeps an iterator of its children, nothing else is kept.
+
+    :param root: the root node, its children are the top level nodes of the file
+    :param get_children: function to get an iterable of the children objects of a folder or the root
+    :return: iterator of the lines with line ends
+    """
+    yield NETSCAPE_HEADER
+    yield '<DL><p>\n'
+    stack = [iter(get_children(root))]  # explicit stack of the children iterators of the open folders
+    while stack:
+        node = next(stack[-1], None)
+        indent = '    ' * len(stack)
+        if node is None:
+            stack.pop()  # end of the folder
+            yield indent[4:] + '</DL><p>\n'
+        elif isinstance(node, Folder):
+            yield (f'{indent}<DT><H3 ADD_DATE="{date_to_stamp(node.date_added, "unix")}" '
+                   f'LAST_MODIFIED="{date_to_stamp(node.date_modified, "unix")}">{html.escape(node.name)}</H3>\n')
+            yield indent + '<DL><p>\n'
+            stack.append(iter(get_children(node)))
+        else:
+            attrs = f'HREF="{html.escape(node.url)}" ADD_DATE="{date_to_stamp(node.date_added, "unix")}"'
+            if node.icon:
+                attrs += f' ICON="{html.escape(node.icon)}"'
+            if node.keywords:
+                attrs += f' TAGS="{html.escape(node.keywords)}"'
+            yield f'{indent}<DT><A {attrs}>{html.escape(node.name)}</A>\n'
+
+
+def write_netscape(root, filename: str, get_children: t.Callable[[t.Any], t.Iterable]):
+    """Write the tree to a Netscape bookmark HTML file, line by line.
+
+    :param root: the root node
+    :param filename: bookmark HTML filename
+    :param get_children: function to get an iterable of the children objects of a folder or the root
+    :return: nothing
+    """
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(netscape_lines(root, get_children))
+
+
+def is_sqlite(filename: str) -> bool:
+    """Check the header of the file.
+
+    :exceptions: FileNotFoundError if the file does not exist
+
+    :param filename: filename to check
+    :return: True for an SQLite database file
+    """
+    with open(filename, 'rb') as f:
+        return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+
+def read_places(filename: str, batch_size: int = PLACES_BATCH) -> list[Folder]:
+    """Read the bookmarks of the Firefox places.sqlite database, the database is opened read-only.
+
+    :exceptions: FileNotFoundError if the file does not exist, ValueError if it is not a places database
+
+    :param filename: places.sqlite filename
+    :param batch_size: number of the rows fetched at once
+    :return: list of the Firefox root folders with their subtrees
+    """
+    if not is_sqlite(filename):
+        raise ValueError(f'<{filename}> is not an SQLite database')
+    lists: dict[int, list] = {}  # {folder id: children list}, a list is created by the folder or by its first child
+    root_id = None
+    conn = sqlite3.connect(pathlib.Path(filename).resolve().as_uri() + '?mode=ro', uri=True)
+    try:
+        cursor = conn.execute(PLACES_QUERY, (PLACES_TAGS, ))
+        while rows := cursor.fetchmany(batch_size):
+            for id_no, node_type, parent, title, date_added, date_modified, guid, url, tags, keyword in rows:
+                if node_type == 2:
+                    if guid == PLACES_ROOT:
+                        root_id = id_no
+                        continue
+                    children = lists.setdefault(id_no, [])
+                    node = Folder.from_dict({'children': children, 'date_modified': prtime_date(date_modified),
+                                             'id_no': id_no, 'date_added': prtime_date(date_added), 'guid': guid,
+                                             'parent_guid': '', 'name': PLACES_ROOTS.get(guid, title)})
+                else:
+                    node = Url.from_dict({'url': url, 'icon': '', 'keywords': tags or keyword or '', 'id_no': id_no,
+                                          'date_added': prtime_date(date_added), 'guid': guid, 'parent_guid': '',
+                                          'name': title})
+                lists.setdefault(parent, []).append(node)
+    except sqlite3.Error as e:
+        raise ValueError(f'<{filename}> is not a Firefox places database, {e}') from None
+    finally:
+        conn.close()
+    if root_id is None:
+        raise ValueError(f'<{filename}> is not a Firefox places database, no root folder')
+    return lists.get(root_id, [])
+
+
+def read_mozilla(filename: str) -> list:
+    """Read a Mozilla bookmark file: the places.sqlite database or a Netscape bookmark HTML file.
+
+    :exceptions: FileNotFoundError if the file does not exist, ValueError if it is not a bookmark file
+
+    :param filename: places.sqlite or bookmark HTML filename
+    :return: list of the top level nodes with their subtrees
+    """
+    if is_sqlite(filename):
+        return read_places(filename)
+    return read_netscape(filename)
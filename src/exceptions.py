@@ -26,6 +26,14 @@ class NodeNotExists(MyProjectError):
         )
 
 
+class NodeExists(MyProjectError):
+    """Raise if a new node name already exists in the common dict of nodes. It returns an appropriate error message"""
+    def __init__(self, node_name):
+        super().__init__(
+            f'Node <{node_name}> already exists {chr(10)}'
+        )
+
+
 class FolderNotExist(MyProjectError):
     """Raise if named folder doesn't exist in the common dict of nodes. It returns an appropriate error message"""
     def __init__(self, folder_name):
@@ -41,3 +49,28 @@ class FolderNotEmpty(MyProjectError):
             f'Folder <{folder_name}> is not empty and can not be deleted {chr(10)}'
         )
 
+
+class NodeNotMovable(MyProjectError):
+    """Raise if a node is moved into itself or its subtree, or the root is moved. It returns an appropriate error message"""
+    def __init__(self, node_name, folder_name):
+        super().__init__(
+            f'Node <{node_name}> can not be moved to the folder <{folder_name}> {chr(10)}'
+        )
+
+
+class SaveFailed(MyProjectError):
+    """Raise if the background save of the changes failed, the next change is not made. It returns an appropriate error message"""
+    def __init__(self, error):
+        self.error = error
+        super().__init__(
+            f'The changes have not been saved: {error} {chr(10)}'
+        )
+
+
+class ServerError(MyProjectError):
+    """Raise if the bookmark server rejects a request. It returns an appropriate error message"""
+    def __init__(self, code, message):
+        self.code = code
+        super().__init__(
+            f'Server error {code}: {message} {chr(10)}'
+        )
@@ -0,0 +1,440 @@
+"""Asynchronous interface of the Model part, so the file reading and writing never block the caller.
+AsyncModelProto has the awaitable equivalents of the ModelProto methods, AsyncModel is its facade.
+ExecutorModel implements it by a synchronous model running in one worker thread: the calls keep their order,
+the tree is never changed by two threads, the json decoding and encoding run in the worker.
+After a change of the tree the save is started in the worker and the call returns without waiting for it.
+
+    model = AsyncModel(ExecutorModel(ModelJSON()))
+    await model.open_database('bookmarks.json')
+
+BlockingModel adapts ExecutorModel to ModelProto for the synchronous Presenter: a change returns at once,
+the menus are rendered while the tree is saved, and only the next call of the model waits for the save.
+
+"""
+import itertools
+import typing as t
+
+import exceptions
+from common import SEARCH_LIMIT, MODEL_CHUNK
+from traversal import TreeItem, Subtree
+from model_interface import ModelProto
+
+
+class AsyncModelProto(t.Protocol):
+    """Prototype class of the asynchronous Model, the methods are as in ModelProto.
+
+    """
+
+    cwd: str  #: current work directory
+
+    # ---- nodes section ----
+    async def get_children(self, node_name: str, offset: int = 0,
+                           limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it, see ModelProto."""
+
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs',
+                  max_depth: int | None = None) -> t.AsyncIterator[TreeItem]:
+        """Walk the subtree of the start node, see ModelProto. Iterate it by <async for>."""
+
+    async def get_subtree(self, name: str = 'roots', max_depth: int | None = None,
+                          fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once, see ModelProto."""
+
+    async def add_node(self, attr_dict: dict, node_type: bool):
+        """Add a folder or url to the tree, see ModelProto."""
+
+    async def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree, see ModelProto."""
+
+    async def update_node(self, name: str, attr_dict: dict):
+        """Update a folder or url of the tree, see ModelProto."""
+
+    async def delete_node(self, name: str):
+        """Delete a node from the tree, see ModelProto."""
+
+    async def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder, see ModelProto."""
+
+    async def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it, see ModelProto."""
+
+    async def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords, see ModelProto."""
+
+    # ---- database section ----
+    async def create_database(self, name: str):
+        """Create an empty bookmark structure and a file to keep the database, see ModelProto."""
+
+    async def open_database(self, name: str):
+        """Open a database, see ModelProto."""
+
+    async def delete_database(self, name):
+        """Delete the database file, see ModelProto."""
+
+    async def close(self):
+        """Flush the unsaved changes of the current database, see ModelProto."""
+
+    # ---- convertors section ----
+    async def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the tree, see ModelProto."""
+
+    async def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the tree, see ModelProto."""
+
+    async def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Netscape bookmark HTML file, see ModelProto."""
+
+    async def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Chrome bookmark JSON file, see ModelProto."""
+
+
+class AsyncModel:
+    """Asynchronous Model class."""
+
+    def __init__(self, proto: AsyncModelProto):
+        self.proto = proto
+        self.cwd = proto.cwd  #: current work directory
+
+    # ---- nodes section ----
+    async def get_children(self, node_name: str, offset: int = 0,
+                           limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it, see Model."""
+        return await self.proto.get_children(node_name, offset, limit)
+
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs',
+                  max_depth: int | None = None) -> t.AsyncIterator[TreeItem]:
+        """Walk the subtree of the start node, see Model. Iterate it by <async for>."""
+        return self.proto.iter_tree(start, order, max_depth)
+
+    async def get_subtree(self, name: str = 'roots', max_depth: int | None = None,
+                          fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once, see Model."""
+        return await self.proto.get_subtree(name, max_depth, fields)
+
+    async def add_node(self, attr_dict: dict, node_type: bool):
+        """Add a folder or url to the tree, see Model."""
+        await self.proto.add_node(attr_dict, node_type)
+
+    async def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree, see Model."""
+        await self.proto.add_nodes(attr_dicts)
+
+    async def update_node(self, name: str, attr_dict: dict):
+        """Update a folder or url of the tree, see Model."""
+        await self.proto.update_node(name, attr_dict)
+
+    async def delete_node(self, name: str):
+        """Delete a node from the tree, see Model."""
+        await self.proto.delete_node(name)
+
+    async def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder, see Model."""
+        await self.proto.move_node(name, parent_name)
+
+    async def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it, see Model."""
+        return await self.proto.get_node(name, fields)
+
+    async def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords, see Model."""
+        return await self.proto.search(query, limit)
+
+    # ---- database section ----
+    async def create_database(self, name: str):
+        """Create an empty bookmark structure and a file to keep the database, see Model."""
+        await self.proto.create_database(name)
+
+    async def open_database(self, name: str):
+        """Open a database, see Model."""
+        await self.proto.open_database(name)
+
+    async def delete_database(self, name):
+        """Delete the database file, see Model."""
+        await self.proto.delete_database(name)
+
+    async def close(self):
+        """Flush the unsaved changes of the current database, see Model."""
+        await self.proto.close()
+
+    # ---- convertors section ----
+    async def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the tree, see Model."""
+        return await self.proto.convert_chrome(filename)
+
+    async def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the tree, see Model."""
+        return await self.proto.convert_mozilla(filename)
+
+    async def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Netscape bookmark HTML file, see Model."""
+        return await self.proto.export_netscape(filename)
+
+    async def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Chrome bookmark JSON file, see Model."""
+        return await self.proto.export_chrome(filename)
+
+
+class ExecutorModel:
+    """Implementation of AsyncModelProto by a synchronous model in a worker thread.
+
+    """
+    def __init__(self, model: ModelProto):
+        """Constructor method.
+
+        :param model: synchronous model, its flush policy is replaced by the save after every change
+                      until shutdown() restores it
+        """
+        self.model = model
+        self.cwd = model.cwd  #: current work directory
+        self.background_flush = hasattr(model, 'flush_ops')  #: the changes are saved in the background
+        self._flush_policy = None  # flush_ops and flush_ms of the model, restored by shutdown()
+        if self.background_flush:
+            self._flush_policy = model.flush_ops, model.flush_ms
+            self.model.flush_ops = self.model.flush_ms = 0  # the worker flushes after the change
+        self._executor = None  # the worker thread, started at the first call
+        self._flush_future = None  # the last started save
+
+    def submit(self, func: t.Callable, *args):
+        """Run a function in the worker thread after the previous calls.
+
+        :param func: function, usually a method of the model
+        :param args: arguments of the function
+        :return: concurrent.futures.Future of the result
+        """
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor  # imported on demand, it is slow to import
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model')
+        return self._executor.submit(func, *args)
+
+    def submit_change(self, func: t.Callable, *args):
+        """Run a function changing the tree in the worker thread and start the save after it.
+        If the previous save failed, the next change saves again before it is made: a new error is raised
+        as SaveFailed and the change is not made. An error of the last save is raised by close().
+
+        :param func: function, usually a method of the model
+        :param args: arguments of the function
+        :return: concurrent.futures.Future of the result, it does not wait for the save
+        """
+        previous = self._flush_future
+
+        def _checked():
+            # the worker runs the calls in their order, the previous save is done here
+            if previous is not None and previous.exception() is not None:
+                try:
+                    self.model.flush()  # save again the changes of the failed save
+                except OSError as e:
+                    raise exceptions.SaveFailed(e) from e
+            return func(*args)
+
+        future = self.submit(_checked)
+        if self.background_flush:
+            self._flush_future = self.submit(self.model.flush)
+        return future
+
+    @property
+    def saving(self) -> bool:
+        """True if the save of the changes is running or waits for the worker."""
+        return self._flush_future is not None and not self._flush_future.done()
+
+    def shutdown(self):
+        """Wait for the calls and the save, stop the worker thread and restore the flush policy of the model.
+
+        :return: nothing
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._flush_policy is not None:
+            self.model.flush_ops, self.model.flush_ms = self._flush_policy
+            self._flush_policy = None
+
+    def next_chunk(self, items: t.Iterator) -> list:
+        """Take the next MODEL_CHUNK items of an iterator made by the model, in the worker thread.
+
+        :param items: iterator of the model, e.g. of iter_tree()
+        :return: list of the items, empty at the end
+        """
+        return self.submit(lambda: list(itertools.islice(items, MODEL_CHUNK))).result()
+
+    async def _run(self, func: t.Callable, *args):
+        """Await a function in the worker thread."""
+        import asyncio  # it is already imported by the running event loop
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    async def _change(self, func: t.Callable, *args):
+        """Await a function changing the tree in the worker thread, the save is not awaited."""
+        import asyncio  # it is already imported by the running event loop
+        return await asyncio.wrap_future(self.submit_change(func, *args))
+
+    # ---- nodes section ----
+    async def get_children(self, node_name: str, offset: int = 0,
+                           limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it, see ModelProto."""
+        return await self._run(self.model.get_children, node_name, offset, limit)
+
+    async def iter_tree(self, start: str = 'roots', order: str = 'dfs',
+                        max_depth: int | None = None) -> t.AsyncIterator[TreeItem]:
+        """Walk the subtree of the start node, see ModelProto. The records are taken by MODEL_CHUNK in the worker."""
+        items = await self._run(self.model.iter_tree, start, order, max_depth)
+        while chunk := await self._run(lambda: list(itertools.islice(items, MODEL_CHUNK))):
+            for item in chunk:
+                yield item
+
+    async def get_subtree(self, name: str = 'roots', max_depth: int | None = None,
+                          fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once, see ModelProto. It is collected in the worker."""
+        return await self._run(self.model.get_subtree, name, max_depth, tuple(fields))
+
+    async def add_node(self, attr_dict: dict, node_type: bool):
+        """Add a folder or url to the tree, see ModelProto."""
+        await self._change(self.model.add_node, attr_dict, node_type)
+
+    async def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree, see ModelProto."""
+        await self._change(self.model.add_nodes, attr_dicts)
+
+    async def update_node(self, name: str, attr_dict: dict):
+        """Update a folder or url of the tree, see ModelProto."""
+        await self._change(self.model.update_node, name, attr_dict)
+
+    async def delete_node(self, name: str):
+        """Delete a node from the tree, see ModelProto."""
+        await self._change(self.model.delete_node, name)
+
+    async def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder, see ModelProto."""
+        await self._change(self.model.move_node, name, parent_name)
+
+    async def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it, see ModelProto."""
+        return await self._run(self.model.get_node, name, fields)
+
+    async def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords, see ModelProto."""
+        return await self._run(self.model.search, query, limit)
+
+    # ---- database section ----
+    async def create_database(self, name: str):
+        """Create an empty bookmark structure and a file to keep the database, see ModelProto."""
+        await self._run(self.model.create_database, name)
+
+    async def open_database(self, name: str):
+        """Open a database, see ModelProto. The file is read and decoded in the worker."""
+        await self._run(self.model.open_database, name)
+
+    async def delete_database(self, name):
+        """Delete the database file, see ModelProto."""
+        await self._run(self.model.delete_database, name)
+
+    async def close(self):
+        """Flush the unsaved changes of the current database, see ModelProto. The save is awaited."""
+        await self._run(self.model.close)
+
+    # ---- convertors section ----
+    async def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the tree, see ModelProto."""
+        return await self._change(self.model.convert_chrome, filename)
+
+    async def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the tree, see ModelProto."""
+        return await self._change(self.model.convert_mozilla, filename)
+
+    async def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Netscape bookmark HTML file, see ModelProto."""
+        return await self._run(self.model.export_netscape, filename)
+
+    async def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Chrome bookmark JSON file, see ModelProto."""
+        return await self._run(self.model.export_chrome, filename)
+
+
+class BlockingModel:
+    """Implementation of ModelProto by ExecutorModel for the synchronous Presenter.
+    A call waits for its result, but not for the save after a change.
+
+    """
+    def __init__(self, proto: ExecutorModel):
+        """Constructor method.
+
+        :param proto: the model running in the worker thread
+        """
+        self.proto = proto
+        self.model = proto.model  # the synchronous model, its methods are called in the worker
+        self.cwd = proto.cwd  #: current work directory
+
+    # ---- nodes section ----
+    def get_children(self, node_name: str, offset: int = 0, limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it, see ModelProto."""
+        return self.proto.submit(self.model.get_children, node_name, offset, limit).result()
+
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+        """Walk the subtree of the start node, see ModelProto. The records are taken by MODEL_CHUNK in the worker."""
+        items = self.proto.submit(self.model.iter_tree, start, order, max_depth).result()
+        while chunk := self.proto.next_chunk(items):
+            yield from chunk
+
+    def get_subtree(self, name: str = 'roots', max_depth: int | None = None, fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once, see ModelProto. It is collected in the worker."""
+        return self.proto.submit(self.model.get_subtree, name, max_depth, tuple(fields)).result()
+
+    def add_node(self, attr_dict: dict, node_type: bool):
+        """Add a folder or url to the tree, see ModelProto. The save is not awaited."""
+        self.proto.submit_change(self.model.add_node, attr_dict, node_type).result()
+
+    def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree, see ModelProto. The save is not awaited."""
+        self.proto.submit_change(self.model.add_nodes, attr_dicts).result()
+
+    def update_node(self, name: str, attr_dict: dict):
+        """Update a folder or url of the tree, see ModelProto. The save is not awaited."""
+        self.proto.submit_change(self.model.update_node, name, attr_dict).result()
+
+    def delete_node(self, name: str):
+        """Delete a node from the tree, see ModelProto. The save is not awaited."""
+        self.proto.submit_change(self.model.delete_node, name).result()
+
+    def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder, see ModelProto. The save is not awaited."""
+        self.proto.submit_change(self.model.move_node, name, parent_name).result()
+
+    def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it, see ModelProto."""
+        return self.proto.submit(self.model.get_node, name, fields).result()
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords, see ModelProto."""
+        return self.proto.submit(self.model.search, query, limit).result()
+
+    # ---- database section ----
+    def create_database(self, name: str):
+        """Create an empty bookmark structure and a file to keep the database, see ModelProto."""
+        self.proto.submit(self.model.create_database, name).result()
+
+    def open_database(self, name: str):
+        """Open a database, see ModelProto."""
+        self.proto.submit(self.model.open_database, name).result()
+
+    def delete_database(self, name):
+        """Delete the database file, see ModelProto."""
+        self.proto.submit(self.model.delete_database, name).result()
+
+    def close(self):
+        """Flush the unsaved changes of the current database, see ModelProto. The save is awaited."""
+        self.proto.submit(self.model.close).result()
+
+    # ---- convertors section ----
+    def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the tree, see ModelProto. The save is not awaited."""
+        return self.proto.submit_change(self.model.convert_chrome, filename).result()
+
+    def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the tree, see ModelProto. The save is not awaited."""
+        return self.proto.submit_change(self.model.convert_mozilla, filename).result()
+
+    def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Netscape bookmark HTML file, see ModelProto."""
+        return self.proto.submit(self.model.export_netscape, filename).result()
+
+    def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the tree to a Chrome bookmark JSON file, see ModelProto."""
+        return self.proto.submit(self.model.export_chrome, filename).result()
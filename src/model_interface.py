@@ -2,6 +2,9 @@
 
 import typing as t
 
+from common import SEARCH_LIMIT
+from traversal import TreeItem, Subtree
+
 class ModelProto(t.Protocol):
     """Prototype class of Model.
 
@@ -10,15 +13,42 @@ class ModelProto(t.Protocol):
     cwd: str  #: current work directory
 
     # ---- nodes section ----
-    def get_children(self, node_name: str) -> tuple[bool, tuple[str, ...]]:
-        """Get a list of child names of the node.
+    def get_children(self, node_name: str, offset: int = 0, limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it.
 
         :exceptions: NodeNotExists if node_name does not exist
+        :raises ValueError: if the offset or the limit is negative
 
         :param node_name: name of a node
+        :param offset: number of the skipped children, default to 0
+        :param limit: maximal number of the children, None for all the rest
         :return: True/False, tuple of child's names/empty tuple
         """
 
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+        """Walk the subtree of the start node without recursion, the start node is the first one.
+
+        :raises NodeNotExists: if the start node does not exist
+        :raises ValueError: if the order is unknown
+
+        :param start: name of the start node, the root by default
+        :param order: 'dfs' for the depth-first order, 'bfs' for the breadth-first one
+        :param max_depth: the deepest level to walk, None for the whole subtree
+        :return: iterator of the (depth, name, is_folder) records
+        """
+
+    def get_subtree(self, name: str = 'roots', max_depth: int | None = None, fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once: flat lists of the names, the parent indexes and the types
+        of the nodes in the depth-first order and a column of values for every requested field.
+
+        :raises NodeNotExists: if the node does not exist
+
+        :param name: name of the start node, the root by default
+        :param max_depth: the deepest level to get, None for the whole subtree
+        :param fields: names of the fields to get for every node, the names and types only by default
+        :return: the Subtree of the node
+        """
+
     def add_node(self, attr_dict: dict, node_type: bool):
         """Add a folder or url to the tree and save the tree into the file
 
@@ -27,6 +57,19 @@ class ModelProto(t.Protocol):
         :return: nothing
         """
 
+    def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree and save the tree once.
+        A dictionary is as for add_node(), with the 'url' key for an url, without it for a folder,
+        a parent may be a folder added earlier in the same batch. Either all the nodes are added or none of them.
+
+        :raises NodeNotExists: if a parent does not exist
+        :raises FolderNotExist: if a parent is not a folder
+        :raises NodeExists: if a name is already in the tree or in the batch
+
+        :param attr_dicts: iterable of the dictionaries with initial node attributes and the parent name
+        :return: nothing
+        """
+
     def update_node(self, name: str, attr_dict: dict):
         """Update a folder or url of the internal tree and save it into the file
 
@@ -45,14 +88,36 @@ class ModelProto(t.Protocol):
         :return: nothing
         """
 
-    def get_node(self, name: str) -> dict:
-        """Get a node content.
+    def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder.
+
+        :raises NodeNotExists: if the node or the folder does not exist
+        :raises FolderNotExist: if the new parent is not a folder
+        :raises NodeNotMovable: if the node is the root, or the folder is in the subtree of the node
+
+        :param name: name of the moved node
+        :param parent_name: name of the new parent folder
+        :return: nothing
+        """
+
+    def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it.
         Replace children objects with their names for folder children list
 
         :param name: node name
+        :param fields: names of the fields to get, the fields the node does not have are omitted; None for all
         :return: dictionary {field_name: field_value} of the node
         """
 
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords. Results are ranked,
+        a match in the name is better than in the keywords or the url.
+
+        :param query: words to search, the last one may be incomplete
+        :param limit: maximal number of the results, default to SEARCH_LIMIT
+        :return: tuple of the node names, the best matches first
+        """
+
     # ---- database section ----
     def create_database(self, name: str):
         """Create an empty bookmark structure and a file to keep the database.
@@ -81,6 +146,12 @@ class ModelProto(t.Protocol):
         :return: nothing
         """
 
+    def close(self):
+        """Flush the unsaved changes of the current database.
+
+        :return: nothing
+        """
+
     # ---- convertors section ----
     def convert_chrome(self, filename: str) -> tuple[bool, str]:
         """Convert Chrome bookmark JSON filename to the current tree. Return (True/False, error message)
@@ -92,7 +163,21 @@ class ModelProto(t.Protocol):
     def convert_mozilla(self, filename: str) -> tuple[bool, str]:
         """Convert Mozilla bookmark filename to the current tree. Return (True/False, error message).
 
-        :param filename: Mozilla bookmark filename to convert
+        :param filename: Mozilla bookmark filename to convert, places.sqlite or a bookmark HTML file
+        :return: (True, empty string)  or (False, error message)
+        """
+
+    def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Netscape bookmark HTML file. Return (True/False, error message).
+
+        :param filename: bookmark HTML filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+
+    def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Chrome bookmark JSON file. Return (True/False, error message).
+
+        :param filename: Chrome bookmark filename, an existing file is overwritten
         :return: (True, empty string)  or (False, error message)
         """
 
@@ -105,15 +190,44 @@ class Model:
 
         # ---- nodes section ----
 
-    def get_children(self, node_name: str) -> tuple[bool, tuple[str, ...]]:
-        """Get a list of child names of the node.
+    def get_children(self, node_name: str, offset: int = 0, limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it.
 
         :exceptions: NodeNotExists if node_name does not exist
+        :raises ValueError: if the offset or the limit is negative
 
         :param node_name: name of a node
+        :param offset: number of the skipped children, default to 0
+        :param limit: maximal number of the children, None for all the rest
         :return: True/False, tuple of child's names/empty tuple
         """
-        return self.proto.get_children(node_name)
+        return self.proto.get_children(node_name, offset, limit)
+
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+        """Walk the subtree of the start node without recursion, the start node is the first one.
+
+        :raises NodeNotExists: if the start node does not exist
+        :raises ValueError: if the order is unknown
+
+        :param start: name of the start node, the root by default
+        :param order: 'dfs' for the depth-first order, 'bfs' for the breadth-first one
+        :param max_depth: the deepest level to walk, None for the whole subtree
+        :return: iterator of the (depth, name, is_folder) records
+        """
+        return self.proto.iter_tree(start, order, max_depth)
+
+    def get_subtree(self, name: str = 'roots', max_depth: int | None = None, fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once: flat lists of the names, the parent indexes and the types
+        of the nodes in the depth-first order and a column of values for every requested field.
+
+        :raises NodeNotExists: if the node does not exist
+
+        :param name: name of the start node, the root by default
+        :param max_depth: the deepest level to get, None for the whole subtree
+        :param fields: names of the fields to get for every node, the names and types only by default
+        :return: the Subtree of the node
+        """
+        return self.proto.get_subtree(name, max_depth, fields)
 
     def add_node(self, attr_dict: dict, node_type: bool):
         """Add a folder or url to the tree and save the tree into the file
@@ -124,6 +238,20 @@ class Model:
         """
         self.proto.add_node(attr_dict, node_type)
 
+    def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree and save the tree once.
+        A dictionary is as for add_node(), with the 'url' key for an url, without it for a folder,
+        a parent may be a folder added earlier in the same batch. Either all the nodes are added or none of them.
+
+        :raises NodeNotExists: if a parent does not exist
+        :raises FolderNotExist: if a parent is not a folder
+        :raises NodeExists: if a name is already in the tree or in the batch
+
+        :param attr_dicts: iterable of the dictionaries with initial node attributes and the parent name
+        :return: nothing
+        """
+        self.proto.add_nodes(attr_dicts)
+
     def update_node(self, name: str, attr_dict: dict):
         """Update a folder or url of the internal tree and save it into the file
 
@@ -144,14 +272,38 @@ class Model:
         """
         self.proto.delete_node(name)
 
-    def get_node(self, name: str) -> dict:
-        """Get a node content.
+    def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder.
+
+        :raises NodeNotExists: if the node or the folder does not exist
+        :raises FolderNotExist: if the new parent is not a folder
+        :raises NodeNotMovable: if the node is the root, or the folder is in the subtree of the node
+
+        :param name: name of the moved node
+        :param parent_name: name of the new parent folder
+        :return: nothing
+        """
+        self.proto.move_node(name, parent_name)
+
+    def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it.
         Replace children objects with their names for folder children list
 
         :param name: node name
+        :param fields: names of the fields to get, the fields the node does not have are omitted; None for all
         :return: dictionary {field_name: field_value} of the node
         """
-        return self.proto.get_node(name)
+        return self.proto.get_node(name, fields)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords. Results are ranked,
+        a match in the name is better than in the keywords or the url.
+
+        :param query: words to search, the last one may be incomplete
+        :param limit: maximal number of the results, default to SEARCH_LIMIT
+        :return: tuple of the node names, the best matches first
+        """
+        return self.proto.search(query, limit)
 
     # ---- database section ----
     def create_database(self, name: str):
@@ -183,3 +335,43 @@ class Model:
         :return: nothing
         """
         self.proto.delete_database(name)
+
+    def close(self):
+        """Flush the unsaved changes of the current database.
+
+        :return: nothing
+        """
+        self.proto.close()
+
+    # ---- convertors section ----
+    def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the current tree. Return (True/False, error message)
+
+        :param filename: Google bookmark filename to convert
+        :return: (True, empty string)  or (False, error message)
+        """
+        return self.proto.convert_chrome(filename)
+
+    def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the current tree. Return (True/False, error message).
+
+        :param filename: Mozilla bookmark filename to convert, places.sqlite or a bookmark HTML file
+        :return: (True, empty string)  or (False, error message)
+        """
+        return self.proto.convert_mozilla(filename)
+
+    def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Netscape bookmark HTML file. Return (True/False, error message).
+
+        :param filename: bookmark HTML filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        return self.proto.export_netscape(filename)
+
+    def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Chrome bookmark JSON file. Return (True/False, error message).
+
+        :param filename: Chrome bookmark filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        return self.proto.export_chrome(filename)
@@ -1,75 +1,523 @@
 """A Model part of the bookmark manager.
 This version creates an internal tree of node objects.
 The bookmark tree is stored into a file in the json format.
+The file is replaced atomically, changes are flushed according to the flush policy
+(every N mutations, every T milliseconds, at the closing) or at the exit of a transaction.
+With the snapshot cache enabled, a sidecar binary snapshot of the tree is written after a successful load or save,
+it is keyed by the size, modification time and content hash of the json file and used instead of json decoding
+while the key is valid.
+In the journal mode every mutation is appended to a sidecar journal file as a small json record,
+the journal is replayed on top of the snapshot at the opening and folded into a fresh snapshot
+when its size exceeds the limit. The first record of the journal keeps the content hash of the snapshot
+it is applied to, a journal left by an interrupted compaction does not match the new snapshot and is dropped.
 Methods of ModelJSON class for an interface:
 
 """
+import gc
 import os
 import json
+import hashlib
+import time
+import itertools
+import typing as t
+from contextlib import contextmanager
 
 from time_convert import stamp_to_string
+from traversal import TreeItem, Subtree, walk, collect
+from common import JOURNAL_SUFFIX, JOURNAL_LIMIT, TEMP_SUFFIX, SNAPSHOT_SUFFIX, SEARCH_LIMIT, SAVE_CHUNK
 from my_nodes import RootBookmarks
 from my_nodes import Folder
 from my_nodes import Url
 
 
-class MyJSONEncoder(json.JSONEncoder):
-    """Overwrite the default JSON encoder class from the json module
+def tree_to_rows(root: RootBookmarks) -> tuple[tuple, list[tuple]]:
+    """Convert a tree into a flat list of rows for the binary snapshot, parents precede their children.
 
+    :param root: the root of the tree
+    :return: (root field values, rows), a row is (index of the parent folder, True for a folder, field values);
+             folders are indexed in the order of their rows, the root has index 0
     """
-    def default(self, obj: Folder | Url | RootBookmarks):
-        """Customize the encoding of the following custom classes: Root Bookmarks, Folder, Url.
-
-        :param obj: a tree object that is being serialized
-        :return: a dictionary of the input object to encode by json.py
-        """
-        if isinstance(obj, Folder | Url):
-            return obj.__dict__  # for serialisation return an object's dict instead of the object
-        elif isinstance(obj, RootBookmarks):    # for RootBookmarks a recursive ref to the object has to eliminate
-            obj_copy = obj.__dict__.copy()  # make a swallow copy of the tree dict
-            del obj_copy['nodes_dict']   # remove the dict of all nodes from json image (for the copy only!!!)
-            return obj_copy  # for serialisation return an object's dict instead of the object (edited copy !)
+    root_values = tuple(getattr(root, field) for field in RootBookmarks.FIELDS[1:])  # without children
+    rows = []
+    folder_index = {id(root): 0}  # index of folders in the rows order
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        parent = folder_index[id(folder)]
+        for node in folder.children:
+            if isinstance(node, Folder):
+                folder_index[id(node)] = len(folder_index)
+                rows.append((parent, True, (node.date_modified, node.id_no, node.date_added,
+                                            node.guid, node.parent_guid, node.name)))
+                stack.append(node)
+            else:
+                rows.append((parent, False, (node.url, node.icon, node.keywords, node.id_no,
+                                             node.date_added, node.guid, node.parent_guid, node.name)))
+    # children of a folder are appended in their order, folders are expanded later, so the rows are sorted by folders
+    return root_values, rows
+
+
+def rows_to_tree(root_values: tuple, rows: list[tuple]) -> RootBookmarks:
+    """Convert the flat rows of the binary snapshot into a new tree, see tree_to_rows().
+
+    :param root_values: field values of the root without children
+    :param rows: rows of the nodes
+    :return: the root of the new tree
+    """
+    root = RootBookmarks()
+    root.nodes_dict['roots'] = root
+    root.update_root(**dict(zip(RootBookmarks.FIELDS[1:], root_values)))
+    nodes_dict = root.nodes_dict  # local names for the speed
+    guid_dict = root.guid_dict
+    new_folder = Folder.__new__
+    new_url = Url.__new__
+    folders = [root]
+    for parent, is_folder, values in rows:
+        if is_folder:
+            node = new_folder(Folder)
+            node.date_modified, node.id_no, node.date_added, node.guid, node.parent_guid, node.name = values
+            node.children = []
+            folders.append(node)
         else:
-            super().default(obj)  # the object does not need to be transformed
+            node = new_url(Url)
+            node.url, node.icon, node.keywords, node.id_no, node.date_added, node.guid, node.parent_guid, \
+                node.name = values
+        folders[parent].children.append(node)
+        nodes_dict[node.name] = node
+        guid_dict[node.guid] = node
+    return root
+
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector while a big tree is built: the new nodes are not garbage,
+    but every allocated thousand of them would trigger a collection.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _fsync_dir(filename: str):
+    """Flush the directory entry of the file to the disk, if the platform allows it.
+
+    :param filename: name of the file in the directory
+    :return: nothing
+    """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return  # not available on Windows
+    fd = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(filename: str, mode: str = 'w'):
+    """Open a temporary file instead of the file, fsync it and rename it into place at the exit,
+    so a crash never leaves a truncated file.
+
+    :param filename: name of the written file
+    :param mode: mode of the opening, 'w' or 'wb'
+    :return: the opened temporary file
+    """
+    temp_name = filename + TEMP_SUFFIX  # the temporary file is in the same directory
+    with open(temp_name, mode) as write_file:
+        yield write_file
+        write_file.flush()
+        os.fsync(write_file.fileno())  # the data is on the disk before the renaming
+    os.replace(temp_name, filename)  # atomic replacement of the file
+    _fsync_dir(filename)  # make the renaming durable
+
+
+def image_to_tree(tree_image: dict) -> RootBookmarks:
+    """Convert the json image of a tree into a new tree of node objects.
+    One pass with an explicit stack, so the nesting depth is not limited by the recursion limit.
+    Lists of children are converted in place, nodes are added to the nodes dict and the guid index
+    as they are created.
+
+    :param tree_image: dictionary of the root decoded from json, it is consumed by the tree
+    :return: the root of the new tree
+    """
+    root = RootBookmarks()  # create a new bookmark's tree object
+    root.nodes_dict['roots'] = root  # {'roots': root object}  is the first record to the nodes dict
+    root.update_root(**tree_image)  # the root children is still a list of dicts
+    nodes_dict = root.nodes_dict  # local names for the speed
+    guid_dict = root.guid_dict
+    folder_from_dict = Folder.from_dict
+    url_from_dict = Url.from_dict
+
+    the_node: Folder | Url  # explicit declaration for mypy
+    stack = [root.children]  # lists of children to convert
+    while stack:
+        children = stack.pop()
+        for i, x in enumerate(children):
+            if 'children' in x:  # item has a child list, so it is a folder
+                the_node = folder_from_dict(x)  # crate a Folder object from dict json attributes
+                stack.append(the_node.children)  # convert the children later
+            else:  # an url found
+                the_node = url_from_dict(x)  # create an Url object from dict json attributes
+            children[i] = the_node  # put the object to the children list
+            nodes_dict[the_node.name] = the_node  # add an pair 'name: object' to the global node's dict
+            guid_dict[the_node.guid] = the_node  # add the node to the guid index
+    return root
+
+
+def tree_to_image(root: RootBookmarks) -> dict:
+    """Convert a tree of node objects into its json image of plain dicts and lists.
+    One pass with an explicit stack, the image is ready for the C encoder of json.dumps
+    and gives the same file as the tree had been encoded node by node.
+
+    :param root: the root of the tree
+    :return: dictionary of the root with nested children dictionaries
+    """
+    image = root.to_dict()
+    image['children'] = []
+    stack = [(root.children, image['children'])]  # (children objects, list of their images)
+    while stack:
+        children, images = stack.pop()
+        for node in children:
+            node_image = node.to_dict()
+            if isinstance(node, Folder):
+                node_image['children'] = []  # fill it later
+                stack.append((node.children, node_image['children']))
+            images.append(node_image)
+    return image
+
+
+def page_slice(offset: int = 0, limit: int | None = None) -> slice:
+    """Get the slice of a page of children.
+
+    :raises ValueError: if the offset or the limit is negative
+
+    :param offset: number of the skipped children
+    :param limit: maximal number of the children, None for all the rest
+    :return: the slice of the page
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError(f'Offset {offset} and limit {limit} of the children should not be negative')
+    return slice(offset, None if limit is None else offset + limit)
+
 
+_CHILDREN = '\x00children\x00'  # placeholder of the children of a folder for the encoder
+_CHILDREN_JSON = json.dumps(_CHILDREN)  # its json text, the folder text is split by it
+
+
+def iter_tree_json(root: RootBookmarks) -> t.Iterator[str]:
+    """Encode a tree into json by pieces, their concatenation is json.dumps(tree_to_image(root)).
+    One pass with an explicit stack, no image of the whole tree is built. A call of the C encoder takes
+    the fields of a folder or a run of up to SAVE_CHUNK urls of one folder, so the other threads
+    get the GIL between the pieces while the tree is saved in the background.
+
+    :param root: the root of the tree
+    :return: iterator of the json pieces
+    """
+    def _split(folder: Folder) -> tuple[str, str]:
+        fields = folder.to_dict()
+        fields['children'] = _CHILDREN
+        head, tail = json.dumps(fields).split(_CHILDREN_JSON)
+        return head + '[', ']' + tail  # the children are encoded between the head and the tail
+
+    head, tail = _split(root)
+    yield head
+    stack = [[iter(root.children), tail, False]]  # [iterator of children, tail of the folder, a child was encoded]
+    while stack:
+        entry = stack[-1]
+        children = entry[0]
+        urls = []
+        node = next(children, None)
+        while isinstance(node, Url) and len(urls) < SAVE_CHUNK:
+            urls.append(node.to_dict())
+            node = next(children, None) if len(urls) < SAVE_CHUNK else None
+        pieces = []
+        if urls:
+            pieces.append((', ' if entry[2] else '') + json.dumps(urls)[1:-1])  # urls without the brackets
+            entry[2] = True
+        if isinstance(node, Folder):
+            head, tail = _split(node)
+            pieces.append((', ' if entry[2] else '') + head)
+            entry[2] = True
+            stack.append([iter(node.children), tail, False])
+        elif not urls or len(urls) < SAVE_CHUNK:  # the children are over
+            pieces.append(entry[1])
+            stack.pop()
+        yield ''.join(pieces)
 
 class ModelJSON:
     """Implementation of a Model module with an internal tree structure.
     Storing a tree database in JSON format.
 
     """
-    def __init__(self):
+    def __init__(self, journal: bool = False, journal_limit: int = JOURNAL_LIMIT,
+                 flush_ops: int = 1, flush_ms: int = 0, snapshot: bool = False):
         """Constructor method.
+
+        :param journal: True to append mutations to the journal instead of the full file rewriting, default to False
+        :param journal_limit: size of the journal in bytes to fold it into a fresh snapshot
+        :param flush_ops: flush the changes every N mutations, 0 - at the closing or explicit flush only
+        :param flush_ms: flush the changes if T milliseconds passed since the last flush, 0 - disabled
+        :param snapshot: True to keep the binary snapshot cache of the database file, default to False
         """
         self.root = RootBookmarks()     # create a new bookmark's tree object
         self.root.nodes_dict['roots'] = self.root  # {'roots': self.root object}  is the first record to the nodes dict
         self.tree_name = ''  # name of the current tree and database filename (json format)
         self.cwd = os.getcwd()  # current working directory
+        self.journal = journal  # journal mode flag
+        self.journal_limit = journal_limit  # the journal size threshold for the compaction
+        self.flush_ops = flush_ops  # flush policy: number of mutations
+        self.flush_ms = flush_ms  # flush policy: time since the last flush
+        self.dirty = False  # True if the tree has changes which are not flushed to the disk
+        self._pending: list[dict] = []  # journal records which are not flushed yet
+        self._full_save = False  # True if the changes are not journaled, e.g. an import, the flush saves the tree
+        self._ops = 0  # number of mutations since the last flush
+        self._last_flush = time.monotonic()  # time of the last flush
+        self._depth = 0  # nesting depth of transactions
+        self._base = ''  # sha256 of the database file, the journal is applied to it, '' if it is not known
+        self.snapshot = snapshot  # snapshot cache flag
 
     def _save_tree(self):
-        """Save the tree to the self.current_tree json file
+        """Save the tree to the self.current_tree json file.
+        The file is written by atomic_write(), so a crash never leaves a truncated database.
+
+        :return: nothing
+        """
+        # hashed by blocks, the content is not kept; the key of the snapshot cache and the base of the journal
+        digest = hashlib.sha256() if self.snapshot or self.journal else None
+        with atomic_write(self.tree_name, 'wb') as write_file:
+            pieces = iter_tree_json(self.root)  # the C encoder by pieces, see iter_tree_json()
+            while block := ''.join(itertools.islice(pieces, SAVE_CHUNK)).encode():
+                write_file.write(block)  # a block at once, the other threads go on between the blocks
+                if digest:
+                    digest.update(block)
+        self._base = digest.hexdigest() if digest else ''
+        if self.snapshot:
+            self._write_snapshot(self._base)  # the rows are built from the tree
+
+    @property
+    def snapshot_name(self) -> str:
+        """Filename of the binary snapshot cache of the current tree."""
+        return self.tree_name + SNAPSHOT_SUFFIX
+
+    def _snapshot_key(self, digest: str) -> tuple[int, int, str]:
+        """Get the key of the database file for the snapshot cache.
+
+        :param digest: sha256 hex digest of the content of the database file
+        :return: (size, modification time in ns, content hash)
+        """
+        stat = os.stat(self.tree_name)
+        return stat.st_size, stat.st_mtime_ns, digest
+
+    def _write_snapshot(self, digest: str):
+        """Write the binary snapshot of the current tree, which is the content of the database file.
+
+        :param digest: sha256 hex digest of the content of the database file
+        :return: nothing
+        """
+        import pickle  # imported on demand, the snapshot cache is optional
+        temp_name = self.snapshot_name + TEMP_SUFFIX
+        with open(temp_name, 'wb') as f, _gc_paused():
+            pickler = pickle.Pickler(f, protocol=5)
+            pickler.fast = True  # no memo, the rows are not recursive, equal strings are rarely shared
+            pickler.dump((self._snapshot_key(digest), tree_to_rows(self.root)))
+        os.replace(temp_name, self.snapshot_name)  # a reader never sees a partial cache
+
+    def _read_snapshot(self, data: bytes) -> RootBookmarks | None:
+        """Read the binary snapshot if it is valid for the database file.
+
+        :param data: content of the database file
+        :return: the root of the tree or None if the cache is missing, broken or stale
+        """
+        import pickle  # imported on demand, the snapshot cache is optional
+        try:
+            with open(self.snapshot_name, 'rb') as f:
+                key, (root_values, rows) = pickle.load(f)
+        except Exception:  # no cache or any damage of it, decode json
+            return None
+        if key != self._snapshot_key(hashlib.sha256(data).hexdigest()):
+            return None  # the database file was changed
+        return rows_to_tree(root_values, rows)
+
+    @property
+    def journal_name(self) -> str:
+        """Filename of the journal of the current tree."""
+        return self.tree_name + JOURNAL_SUFFIX
+
+    def _commit(self, record: dict | None):
+        """Register a mutation of the tree and flush the changes according to the flush policy.
+
+        :param record: json record of the mutation for the journal, None if the flush saves the whole tree
+        :return: nothing
+        """
+        self.dirty = True
+        self._ops += 1
+        if self.journal and record is not None:
+            self._pending.append(record)  # keep the record till the flush
+        if self._depth:
+            return  # the transaction flushes at the exit
+        if (self.flush_ops and self._ops >= self.flush_ops) or \
+                (self.flush_ms and (time.monotonic() - self._last_flush) * 1000 >= self.flush_ms):
+            self.flush()
+
+    def flush(self):
+        """Write the unsaved changes to the disk.
+        Append the pending records to the journal in the journal mode, otherwise save the full tree.
+        The changes without the journal records (an import) are saved with the journal folded into the tree.
+
+        :return: nothing
+        """
+        if self.dirty and self.tree_name:
+            if self._full_save:
+                self.compact()  # one save for the journaled and the imported changes
+            elif self.journal:
+                with open(self.journal_name, 'a') as f:
+                    if not f.tell():  # a new journal, the first record is the hash of the database file
+                        f.write(json.dumps({'op': 'base', 'digest': self._base or self._file_digest()}) + '\n')
+                    f.write(''.join(json.dumps(record) + '\n' for record in self._pending))  # one record per line
+                    f.flush()
+                    os.fsync(f.fileno())
+                    size = f.tell()  # current size of the journal
+                if size > self.journal_limit:
+                    self.compact()  # fold the journal into a fresh snapshot
+            else:
+                self._save_tree()  # snapshot mode, rewrite the whole file
+        self._reset_pending()
+
+    def _reset_pending(self):
+        """Forget the unsaved changes after they were written to the disk.
+
+        :return: nothing
+        """
+        self.dirty = False
+        self._pending = []
+        self._full_save = False
+        self._ops = 0
+        self._last_flush = time.monotonic()
+
+    @contextmanager
+    def transaction(self) -> t.Iterator['ModelJSON']:
+        """Context manager to share one flush among many mutations. Transactions may be nested,
+        the outermost one flushes the changes at the exit.
+
+        :return: the model instance
+        """
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.flush()  # the tree in the memory is already changed, keep the disk in sync
+
+    def close(self):
+        """Flush the unsaved changes of the current tree.
+
+        :return: nothing
+        """
+        self.flush()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot of the tree and remove the journal.
+
+        :return: nothing
+        """
+        self._save_tree()  # the snapshot includes all journaled mutations
+        if os.path.isfile(self.journal_name):
+            os.remove(self.journal_name)
+
+    def _file_digest(self) -> str:
+        """Get the content hash of the database file.
+
+        :return: sha256 hex digest
+        """
+        with open(self.tree_name, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _replay_journal(self):
+        """Apply the journal records to the tree loaded from the snapshot.
+        The journal of another snapshot is removed without the replay, it is left by a compaction
+        interrupted after the saving, so all its records are already in the snapshot.
 
         :return: nothing
         """
-        with open(self.tree_name, "w") as write_file:
-            json.dump(self.root, write_file, cls=MyJSONEncoder)
+        if not os.path.isfile(self.journal_name):
+            return  # nothing to replay
+        with open(self.journal_name, 'r') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        if records and records[0]['op'] == 'base' and records[0]['digest'] != self._base:
+            os.remove(self.journal_name)  # the stale records are never applied again
+            return
+        guids = self.root.guid_dict
+        for record in records:
+            match record['op']:
+                case 'add' | 'add_nodes':
+                    for add_record in record.get('nodes', (record, )):
+                        attrs = add_record['attrs']
+                        attrs['parent_name'] = add_record['parent_name']
+                        self.root.add_node(attrs, add_record['node_type'])
+                case 'update':
+                    self.root.update_node(record['name'], record['attrs'])
+                    self.root.get_parent(record['attrs']['name']).date_modified = record['stamp']
+                case 'delete':
+                    self.root.delete_node(record['name'])
+                case 'move':
+                    self.root.move_node(record['name'], record['parent_name'])
+                    self.root.get_parent(record['name']).date_modified = record['stamp']
+                    guids[record['old_parent']].date_modified = record['stamp']
 
     # ---- nodes section ----
-    def get_children(self, node_name: str) -> tuple[bool, tuple[str, ...]]:
-        """Get a list of child names of the node.
+    def get_children(self, node_name: str, offset: int = 0, limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it.
 
         :exceptions: NodeNotExists if node_name does not exist
+        :raises ValueError: if the offset or the limit is negative
 
         :param node_name: name of a node
+        :param offset: number of the skipped children, default to 0
+        :param limit: maximal number of the children, None for all the rest
         :return: True/False, tuple of child's names/empty tuple
         """
         node = self.root.check_node(node_name)  # return an object or raise NodeNotExist
-        if 'children' in node.__dict__:  # this is a folder
-            children = tuple([child.name for child in node.__dict__['children']])
+        page = page_slice(offset, limit)
+        if isinstance(node, Folder | RootBookmarks):  # this is a folder
+            children = tuple([child.name for child in node.children[page]])  # the page only
             return True, children  # return Tree, tuple of child's names
         else:
             return False, ()  # return False, empty tuple for url node
 
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+        """Walk the subtree of the start node without recursion, see traversal.walk().
+
+        :raises NodeNotExists: if the start node does not exist
+        :raises ValueError: if the order is unknown
+
+        :param start: name of the start node, the root by default
+        :param order: 'dfs' for the depth-first order, 'bfs' for the breadth-first one
+        :param max_depth: the deepest level to walk, None for the whole subtree
+        :return: iterator of the (depth, name, is_folder) records
+        """
+        node = self.root.check_node(start)  # return an object or raise NodeNotExist
+        return walk(node, lambda x: getattr(x, 'children', None), lambda x: x.name, order, max_depth)
+
+    def get_subtree(self, name: str = 'roots', max_depth: int | None = None, fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once, see traversal.collect().
+
+        :raises NodeNotExists: if the node does not exist
+
+        :param name: name of the start node, the root by default
+        :param max_depth: the deepest level to get, None for the whole subtree
+        :param fields: names of the fields to get for every node, the names and types only by default
+        :return: the Subtree with the flat lists of the nodes in the depth-first order
+        """
+        node = self.root.check_node(name)  # return an object or raise NodeNotExist
+        fields = tuple(fields)
+        return collect(node, lambda x: getattr(x, 'children', None), lambda x: x.name,
+                       (lambda x: x.get_fields(fields)) if fields else None, fields, max_depth)
+
     def add_node(self, attr_dict: dict, node_type: bool):
         """Add a folder or url to the tree and save the tree into the file
 
@@ -77,8 +525,32 @@ class ModelJSON:
         :param node_type: True for folder adding, False for url
         :return: nothing
         """
+        parent_name = attr_dict['parent_name']  # keep it, the argument is removed by the nodes method
         self.root.add_node(attr_dict, node_type)  # call an appropriated nodes method
-        self._save_tree()  # save the updated current root
+        node = self.root.nodes_dict[attr_dict['name']]  # get the new node object
+        attrs = {key: value for key, value in node.to_dict().items() if key not in ('children', 'parent_guid')}
+        self._commit({'op': 'add', 'node_type': node_type, 'parent_name': parent_name, 'attrs': attrs})
+
+    def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree and save the tree once, see RootBookmarks.add_nodes().
+        Either all the nodes are added or none of them, the batch is one mutation for the flush policy.
+
+        :raises NodeNotExists: if a parent does not exist
+        :raises FolderNotExist: if a parent is not a folder
+        :raises NodeExists: if a name is already in the tree or in the batch
+
+        :param attr_dicts: iterable of the dictionaries with initial node attributes and the parent name
+        :return: nothing
+        """
+        nodes = self.root.add_nodes(attr_dicts)  # nothing is changed on an error
+        records = []  # add records of the nodes, the journal keeps them in one line
+        if self.journal:
+            guids = self.root.guid_dict
+            for node in nodes:
+                attrs = {key: value for key, value in node.to_dict().items() if key not in ('children', 'parent_guid')}
+                records.append({'node_type': isinstance(node, Folder), 'parent_name': guids[node.parent_guid].name,
+                                'attrs': attrs})
+        self._commit({'op': 'add_nodes', 'nodes': records})
 
     def update_node(self, name: str, attr_dict: dict):
         """Update a folder or url of the internal tree and save it into the file
@@ -88,7 +560,8 @@ class ModelJSON:
         :return: nothing
         """
         self.root.update_node(name, attr_dict)  # call an appropriated nodes method
-        self._save_tree()  # save the updated current root
+        stamp = self.root.get_parent(attr_dict['name']).date_modified  # keep the parent stamp for the replay
+        self._commit({'op': 'update', 'name': name, 'attrs': attr_dict, 'stamp': stamp})
 
     def delete_node(self, name: str):
         """Delete a node from the current tree.
@@ -100,18 +573,44 @@ class ModelJSON:
         :return: nothing
         """
         self.root.delete_node(name)     # call a nodes method
-        self._save_tree()    # save the updated current root
+        self._commit({'op': 'delete', 'name': name})
+
+    def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder, see RootBookmarks.move_node().
 
-    def get_node(self, name: str) -> dict:
-        """Get a node content.
+        :raises NodeNotExists: if the node or the folder does not exist
+        :raises FolderNotExist: if the new parent is not a folder
+        :raises NodeNotMovable: if the node is the root, or the folder is in the subtree of the node
+
+        :param name: name of the moved node
+        :param parent_name: name of the new parent folder
+        :return: nothing
+        """
+        old_parent = self.root.get_parent(name).guid if name != 'roots' else ''  # or NodeNotExists
+        stamp = self.root.move_node(name, parent_name)  # nothing is changed on an error
+        self._commit({'op': 'move', 'name': name, 'parent_name': parent_name, 'old_parent': old_parent,
+                      'stamp': stamp})
+
+    def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, or only the requested fields of it.
         Replace children objects with their names for folder children list
 
         :exceptions: raise NodeNotExists if node_name does not exist
 
         :param name: node name
+        :param fields: names of the fields to get, the fields the node does not have are omitted; None for all
         :return: dictionary {field_name: field_value} of the node
         """
-        return self.root.get_node(name)     # call a nodes method
+        return self.root.get_node(name, fields)     # call a nodes method
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords with the inverted index of the tree.
+
+        :param query: words to search, the last one may be incomplete
+        :param limit: maximal number of the results, default to SEARCH_LIMIT
+        :return: tuple of the node names, the best matches first
+        """
+        return tuple(self.root.search(query, limit))     # call a nodes method
 
     # ---- database section ----
     def create_database(self, name: str):
@@ -122,10 +621,13 @@ class ModelJSON:
         :param name: name and filename of the new database
         :return: nothing
         """
+        self.flush()  # keep the changes of the previous tree
         with open(name, 'x') as f:     # open a new file as exclusive, of c if such a file exists
             pass    # ask for file recreating , see a controller logic
         self.tree_name = name    # store the name of the current bookmark tree
         self._save_tree()  # save a new tree to the json file
+        if os.path.isfile(self.journal_name):
+            os.remove(self.journal_name)  # a stale journal does not belong to the new tree
 
     def delete_database(self, name: str):
         """Delete the database file.
@@ -138,7 +640,14 @@ class ModelJSON:
         self.root = RootBookmarks()     # create a new bookmark's tree object
         self.root.nodes_dict['roots'] = self.root  # {'roots': self.root object}  is the first record to the nodes dict
         self.tree_name = ''  # name of the current tree and database filename (json format)
+        self.dirty = False  # changes of the deleted tree are discarded
+        self._pending = []
+        self._full_save = False
+        self._ops = 0
         os.remove(name)  # delete the file
+        for suffix in (JOURNAL_SUFFIX, SNAPSHOT_SUFFIX):
+            if os.path.isfile(name + suffix):
+                os.remove(name + suffix)  # delete the journal and the snapshot cache
 
     def open_database(self, name: str):
         """Open a database, read and extract it into a bookmark tree.
@@ -149,36 +658,99 @@ class ModelJSON:
         :return: nothing
         """
 
-        def _dict_into_object(dct: dict) -> dict:
-            """Convert a dict into an object. Add the item (key, value) to the node's dict. Recursively.
+        # ---- body of the open_database() ----
+        self.flush()  # keep the changes of the previous tree
+        # ---- read json database ----
+        with open(name, 'rb') as f:   # open the tree image file, or FileNotFoundError exception
+            data = f.read()   # read the json image and then close the file
+        self.tree_name = name    # set the current tree name
+
+        with _gc_paused():
+            root = self._read_snapshot(data) if self.snapshot else None  # try the binary snapshot first
+            if root is None:
+                # ---- decode nested dictionaries from json image to the original objects, fill the node's dict ----
+                root = image_to_tree(json.loads(data))  # image is a dict
+                self.root = root  # the snapshot is written from the current tree
+                if self.snapshot:
+                    self._write_snapshot(hashlib.sha256(data).hexdigest())  # the next opening is fast
+        self.root = root
+
+        # ---- apply the mutations made after the last snapshot ----
+        if self.journal or os.path.isfile(self.journal_name):
+            self._base = hashlib.sha256(data).hexdigest()  # the journal is applied to this content
+        self._replay_journal()
+
+    # ---- convertors section ----
+    def _import_nodes(self, read: t.Callable[[str], list], filename: str, file_kind: str) -> tuple[bool, str]:
+        """Read a bookmark file and add its nodes to <roots>, the import is one mutation for the flush policy.
+        The nodes are not journaled, the flush saves the whole tree and folds the journal into it.
+
+        :param read: reader of the file, returns a list of new nodes with their subtrees, see converters
+        :param filename: bookmark filename to convert
+        :param file_kind: kind of the file for the error message
+        :return: (True, empty string)  or (False, error message)
+        """
+        try:
+            nodes = read(filename)
+        except FileNotFoundError:
+            return False, f'File <{filename}> does not exist'
+        except (ValueError, UnicodeDecodeError) as e:
+            return False, f'File <{filename}> is not a {file_kind}: {e}'
+        self.root.add_subtrees(nodes)
+        self._full_save = True  # the nodes are not journaled, the flush saves the tree with the pending records
+        self._commit(None)
+        return True, ''
+
+    def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the current tree. Return (True/False, error message)
+        Chrome root folders are added to <roots> with all their nodes.
+
+        :param filename: Google bookmark filename to convert
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import read_chrome  # imported on demand, converters load the parsers
+        return self._import_nodes(read_chrome, filename, 'Chrome bookmark file')
+
+    def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the current tree. Return (True/False, error message).
+        The file is the places.sqlite database of a Firefox profile, it is read by batches,
+        or a Netscape bookmark HTML file exported by Firefox or other browsers.
+        Its top level nodes are added to <roots> and the tree is saved once.
 
-            :param dct: input dictionary
-            :return: intermediate dictionary during the recursion executes
-            """
-            the_node: Folder | Url  # explicit declaration for mypy
+        :param filename: Mozilla bookmark filename to convert
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import read_mozilla  # imported on demand, converters load the parsers
+        return self._import_nodes(read_mozilla, filename, 'Mozilla bookmark file')
 
-            i = 0  # an index in the children list
-            for x in dct['children']:  # an iteration of children
-                if 'children' in x:  # item has a child list, so it is a folder
-                    _dict_into_object(x)  # recursion call for the nested child list
-                    the_node = Folder(**x)  # crate a Folder object from dict json attributes
-                else:  # an url found
-                    the_node = Url(**x)  # create an Url object from dict json attributes
+    def _export_tree(self, write: t.Callable, filename: str) -> tuple[bool, str]:
+        """Write the current tree to a bookmark file.
 
-                dct['children'][i] = the_node  # put the object to the children list
-                self.root.nodes_dict[the_node.name] = the_node  # add an pair 'name: object' to the global node's dict
-                i += 1
-            return dct  # return the dict where dicts are replaced by equivalent objects - nodes
+        :param write: writer of the file, write(root, filename, get_children), see converters
+        :param filename: bookmark filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        try:
+            write(self.root, filename, lambda folder: folder.children)
+        except OSError as e:
+            return False, f'File <{filename}> can not be written: {e}'
+        return True, ''
 
-        # ---- body of the open_database() ----
-        # ---- read json database ----
-        with open(name, 'r') as f:   # open the tree image file, or FileNotFoundError exception
-            tree_image = json.load(f)   # read the json image and then close the file, image is a dict
-        self.tree_name = name    # set the current tree name
+    def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Netscape bookmark HTML file, children of <roots> are the top level nodes.
 
-        # ---- update the root from the json image ----
-        self.root.update_root(**tree_image)
+        :param filename: bookmark HTML filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import write_netscape  # imported on demand, converters load the parsers
+        return self._export_tree(write_netscape, filename)
 
-        # ---- decode nested dictionaries from json image to the original objects and add it to the node's list ----
-        dt = self.root.__dict__  # start from the root children
-        _dict_into_object(dt)  # decode nested dictionaries recursively
+    def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Chrome bookmark JSON file with its checksum.
+        Top level folders imported from Chrome become its roots again, other top level nodes go to the bookmark bar.
+
+        :param filename: Chrome bookmark filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import write_chrome  # imported on demand, converters load the parsers
+        return self._export_tree(write_chrome, filename)
@@ -0,0 +1,415 @@
+"""A lazy Model part of the bookmark manager for huge JSON databases.
+The database file is not decoded at the opening. A sidecar index keeps the byte offsets of every node
+in the file, the names of the folder children and the parent names. Folders are materialized
+(decoded with their url children) only when they are visited, the materialized folders are kept
+in a bounded LRU cache, cold folders are evicted.
+The index is rebuilt when the size or the modification time of the database file has been changed.
+Any mutation, search or conversion loads the whole tree and continues as ModelJSON.
+
+The index relies on the layout of the file written by ModelJSON: json.dumps with default separators,
+the fields of the nodes in the FIELDS order, so the node name is the last field of every object.
+"""
+import os
+import re
+import json
+import mmap
+import typing as t
+from collections import OrderedDict
+
+import exceptions
+from common import JOURNAL_SUFFIX, INDEX_SUFFIX, LAZY_CACHE_SIZE, SEARCH_LIMIT
+from model_json import ModelJSON
+from model_json import page_slice, atomic_write
+from traversal import TreeItem, Subtree, walk, collect
+
+# structural tokens of the database file, quotes inside json strings are escaped, so they never match there
+TOKENS = re.compile(rb'\{"(?:(c)hildren": \[|(u)rl": )|\](), "date_(?:modified|added)": |"name": "([^"\\]*(?:\\.[^"\\]*)*)"}')
+# positions in the index entry of a node
+START, END, CHILDREN_START, CHILDREN_END, PARENT, CHILDREN = range(6)
+INDEX_FIELDS = {'name', 'children'}  #: fields of the nodes known from the index
+
+
+def build_index(buffer) -> dict:
+    """Scan the database file and build the index of its nodes.
+
+    :raises ValueError: if the file has an unexpected layout
+
+    :param buffer: content of the database file, bytes or mmap
+    :return: dictionary {name: [start, end, children start, children end, parent name, children names]},
+             offsets of children and children names are None for urls
+    """
+    nodes: dict = {}
+    stack: list = []  # entries of the objects being scanned, the name is unknown till the object end
+    for match in TOKENS.finditer(buffer):
+        folder_start, url_start, children_end, name = match.groups()
+        if folder_start:
+            stack.append([match.start(), 0, match.end() - 1, 0, '', []])
+        elif url_start:
+            stack.append([match.start(), 0, None, None, '', None])
+        elif children_end is not None:
+            stack[-1][CHILDREN_END] = match.start() + 1
+        else:
+            entry = stack.pop()
+            entry[END] = match.end()
+            node_name = json.loads(b'"' + name + b'"') if b'\\' in name else name.decode()  # escapes are rare
+            if entry[CHILDREN] is not None:
+                for child in entry[CHILDREN]:
+                    nodes[child][PARENT] = node_name
+            if stack:
+                stack[-1][CHILDREN].append(node_name)
+            nodes[node_name] = entry
+    if stack or 'roots' not in nodes:
+        raise ValueError('unexpected layout of the database file')
+    return nodes
+
+
+class ModelLazyJSON(ModelJSON):
+    """Implementation of a Model module with the lazy reading of the JSON database.
+
+    """
+    def __init__(self, cache_size: int = LAZY_CACHE_SIZE, **kwargs):
+        """Constructor method.
+
+        :param cache_size: number of materialized folders kept in the memory
+        :param kwargs: params of ModelJSON
+        """
+        super().__init__(**kwargs)
+        self.lazy = False  # True while the tree is not loaded
+        self.cache_size = cache_size  # max number of materialized folders
+        self.index: dict = {}  # the node index of the database file
+        self.cache: OrderedDict = OrderedDict()  # LRU cache {folder name: {node name: node content}}
+        self._buffer: mmap.mmap | None = None  # the mapped database file
+
+    @property
+    def index_name(self) -> str:
+        """Filename of the index of the current tree."""
+        return self.tree_name + INDEX_SUFFIX
+
+    def _release(self):
+        """Forget the lazy state and unmap the database file.
+
+        :return: nothing
+        """
+        self.lazy = False
+        self.index = {}
+        self.cache.clear()
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def _load_all(self):
+        """Load the whole tree before a mutation, continue as ModelJSON.
+
+        :return: nothing
+        """
+        if self.lazy:
+            name = self.tree_name
+            self._release()
+            super().open_database(name)
+
+    def _read_index(self) -> dict:
+        """Read the sidecar index if it is valid for the database file, otherwise build and save a new one.
+
+        :return: the node index
+        """
+        stat = os.stat(self.tree_name)
+        try:
+            with open(self.index_name) as f:
+                index_image = json.load(f)
+            if (index_image['size'], index_image['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                return index_image['nodes']
+        except (OSError, ValueError, KeyError):
+            pass  # no index or a broken one, build a new index
+        nodes = build_index(self._buffer)
+        with atomic_write(self.index_name) as f:  # a crash never leaves a truncated index
+            f.write(json.dumps({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'nodes': nodes}))
+        return nodes
+
+    def _entry(self, name: str) -> list:
+        """Get the index entry of the node.
+
+        :raises NodeNotExists: if the node does not exist
+
+        :param name: node name
+        :return: the index entry
+        """
+        try:
+            return self.index[name]
+        except KeyError:
+            raise exceptions.NodeNotExists(name) from None
+
+    def _decode(self, entry: list) -> dict:
+        """Decode the own fields of a node from the database file, the children are not decoded.
+
+        :param entry: index entry of the node
+        :return: dictionary {field_name: field_value}, children list of a folder is empty
+        """
+        if entry[CHILDREN] is None:
+            return json.loads(self._buffer[entry[START]:entry[END]])
+        return json.loads(self._buffer[entry[START]:entry[CHILDREN_START] + 1] + b']' +
+                          self._buffer[entry[CHILDREN_END]:entry[END]])
+
+    def _materialize(self, folder_name: str) -> dict:
+        """Get the materialized folder: the folder and its url children decoded. Evict the coldest folder
+        if the cache is full.
+
+        :param folder_name: name of the folder
+        :return: dictionary {node name: node content} of the folder and its urls
+        """
+        if folder_name in self.cache:
+            self.cache.move_to_end(folder_name)  # the folder is the most recently used
+            return self.cache[folder_name]
+        entry = self.index[folder_name]
+        folder = self._decode(entry)
+        folder['children'] = list(entry[CHILDREN])  # children names as in ModelJSON.get_node()
+        nodes = {folder_name: folder}
+        for child in entry[CHILDREN]:
+            child_entry = self.index[child]
+            if child_entry[CHILDREN] is None:
+                nodes[child] = self._decode(child_entry)
+        self.cache[folder_name] = nodes
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)  # evict the coldest folder
+        return nodes
+
+    # ---- nodes section ----
+    def get_children(self, node_name: str, offset: int = 0, limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it, from the index.
+
+        :exceptions: NodeNotExists if node_name does not exist
+        :raises ValueError: if the offset or the limit is negative
+
+        :param node_name: name of a node
+        :param offset: number of the skipped children, default to 0
+        :param limit: maximal number of the children, None for all the rest
+        :return: True/False, tuple of child's names/empty tuple
+        """
+        if not self.lazy:
+            return super().get_children(node_name, offset, limit)
+        page = page_slice(offset, limit)
+        children = self._entry(node_name)[CHILDREN]
+        if children is None:
+            return False, ()  # return False, empty tuple for url node
+        return True, tuple(children[page])
+
+    def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content, materialize the folder or the parent folder of the url.
+        The name and the children are taken from the index, nothing is decoded if only they are requested.
+
+        :exceptions: raise NodeNotExists if node_name does not exist
+
+        :param name: node name
+        :param fields: names of the fields to get, the fields the node does not have are omitted; None for all
+        :return: dictionary {field_name: field_value} of the node
+        """
+        if not self.lazy:
+            return super().get_node(name, fields)
+        entry = self._entry(name)
+        if fields is not None:
+            fields = tuple(fields)
+            if set(fields) <= INDEX_FIELDS:
+                index_fields = {'name': name} | ({} if entry[CHILDREN] is None else {'children': list(entry[CHILDREN])})
+                return {field: index_fields[field] for field in fields if field in index_fields}
+        folder_name = name if entry[CHILDREN] is not None else entry[PARENT]
+        node = self._materialize(folder_name)[name]
+        if fields is not None:
+            return {field: list(node[field]) if field == 'children' else node[field] for field in fields if field in node}
+        node = node.copy()
+        if 'children' in node:
+            node['children'] = list(node['children'])
+        return node
+
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+        """Walk the subtree of the start node without recursion over the index, nothing is decoded.
+
+        :raises NodeNotExists: if the start node does not exist
+        :raises ValueError: if the order is unknown
+
+        :param start: name of the start node, the root by default
+        :param order: 'dfs' for the depth-first order, 'bfs' for the breadth-first one
+        :param max_depth: the deepest level to walk, None for the whole subtree
+        :return: iterator of the (depth, name, is_folder) records
+        """
+        if not self.lazy:
+            return super().iter_tree(start, order, max_depth)
+        self._entry(start)  # or NodeNotExists
+        index = self.index
+        return walk(start, lambda x: index[x][CHILDREN], lambda x: x, order, max_depth)
+
+    def get_subtree(self, name: str = 'roots', max_depth: int | None = None, fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once over the index, see traversal.collect().
+        Nothing is decoded if only the names and the children are requested, the folders with the other fields
+        are materialized.
+
+        :raises NodeNotExists: if the node does not exist
+
+        :param name: name of the start node, the root by default
+        :param max_depth: the deepest level to get, None for the whole subtree
+        :param fields: names of the fields to get for every node, the names and types only by default
+        :return: the Subtree with the flat lists of the nodes in the depth-first order
+        """
+        if not self.lazy:
+            return super().get_subtree(name, max_depth, fields)
+        self._entry(name)  # or NodeNotExists
+        index = self.index
+        fields = tuple(fields)
+        get_fields = (lambda x: self.get_node(x, fields)) if fields else None  # from the index if it is enough
+        return collect(name, lambda x: index[x][CHILDREN], lambda x: x, get_fields, fields, max_depth)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords. Load the whole tree before.
+
+        :param query: words to search, the last one may be incomplete
+        :param limit: maximal number of the results, default to SEARCH_LIMIT
+        :return: tuple of the node names, the best matches first
+        """
+        self._load_all()
+        return super().search(query, limit)
+
+    def add_node(self, attr_dict: dict, node_type: bool):
+        """Add a folder or url to the tree and save the tree into the file. Load the whole tree before.
+
+        :param attr_dict: dictionary with initial node attributes
+        :param node_type: True for folder adding, False for url
+        :return: nothing
+        """
+        self._load_all()
+        super().add_node(attr_dict, node_type)
+
+    def add_nodes(self, attr_dicts):
+        """Add many folders and urls to the tree and save the tree once. Load the whole tree before.
+
+        :param attr_dicts: iterable of the dictionaries with initial node attributes and the parent name
+        :return: nothing
+        """
+        self._load_all()
+        super().add_nodes(attr_dicts)
+
+    def update_node(self, name: str, attr_dict: dict):
+        """Update a folder or url of the tree and save it into the file. Load the whole tree before.
+
+        :param name: updating node name
+        :param attr_dict: dictionary with the updating fields
+        :return: nothing
+        """
+        self._load_all()
+        super().update_node(name, attr_dict)
+
+    def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder. Load the whole tree before.
+
+        :param name: name of the moved node
+        :param parent_name: name of the new parent folder
+        :return: nothing
+        """
+        self._load_all()
+        super().move_node(name, parent_name)
+
+    def delete_node(self, name: str):
+        """Delete a node from the current tree. Load the whole tree before.
+
+        :raises NodeNotExists: if node_name does not exist
+        :raises FolderNotEmpty: if node_name folder is not empty
+
+        :param name: node name to delete
+        :return: nothing
+        """
+        self._load_all()
+        super().delete_node(name)
+
+    # ---- database section ----
+    def create_database(self, name: str):
+        """Create an empty bookmark structure and a file to keep the database.
+
+        :exceptions: FileExistsError if given filename exists
+
+        :param name: name and filename of the new database
+        :return: nothing
+        """
+        self._release()
+        super().create_database(name)
+
+    def delete_database(self, name: str):
+        """Delete the database file and its index.
+
+        :exception: FileNotFoundError if the filename does not exist
+
+        :param name: name and filename of the deleting database
+        :return: nothing
+        """
+        self._release()
+        super().delete_database(name)
+        if os.path.isfile(name + INDEX_SUFFIX):
+            os.remove(name + INDEX_SUFFIX)  # delete the index
+
+    def open_database(self, name: str):
+        """Open a database lazily: map the file and read its index, nodes are decoded on demand.
+        A database with a journal or an unexpected layout is loaded as a whole.
+
+        :exception: FileNotFoundError if the filename does not exist
+
+        :param name: name and filename of the opening database
+        :return: nothing
+        """
+        self.flush()  # keep the changes of the previous tree
+        self._release()
+        with open(name, 'rb') as f:  # or FileNotFoundError exception
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if os.path.isfile(name + JOURNAL_SUFFIX):
+            buffer.close()
+            super().open_database(name)  # the journal is replayed on the whole tree
+            return
+        self.tree_name = name
+        self._buffer = buffer
+        try:
+            self.index = self._read_index()
+        except ValueError:
+            self._release()
+            super().open_database(name)  # not written by ModelJSON, decode the whole file
+            return
+        self.lazy = True
+
+    def close(self):
+        """Flush the unsaved changes and unmap the database file.
+
+        :return: nothing
+        """
+        super().close()
+        self._release()
+
+    # ---- convertors section ----
+    def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the current tree. Load the whole tree before.
+
+        :param filename: Google bookmark filename to convert
+        :return: (True, empty string)  or (False, error message)
+        """
+        self._load_all()
+        return super().convert_chrome(filename)
+
+    def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the current tree. Load the whole tree before.
+
+        :param filename: Mozilla bookmark filename to convert
+        :return: (True, empty string)  or (False, error message)
+        """
+        self._load_all()
+        return super().convert_mozilla(filename)
+
+    def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Netscape bookmark HTML file. Load the whole tree before.
+
+        :param filename: bookmark HTML filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        self._load_all()
+        return super().export_netscape(filename)
+
+    def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Chrome bookmark JSON file. Load the whole tree before.
+
+        :param filename: Chrome bookmark filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        self._load_all()
+        return super().export_chrome(filename)
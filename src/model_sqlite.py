@@ -0,0 +1,638 @@
+"""A Model part of the bookmark manager with the SQLite storage.
+Nodes are kept as rows of one table of a local SQLite file, the tree is not loaded into the memory.
+Names, guids and parent guids are indexed, so every call is an indexed query
+and every mutation is one small transaction.
+The order of the children is the order of the row ids.
+A JSON database of ModelJSON can be migrated with migrate_json().
+Imported bookmark files are inserted within one transaction.
+The search is a scan with LIKE patterns, the same tokens and field weights as the search index of ModelJSON.
+
+"""
+import os
+import sys
+import uuid
+import sqlite3
+import typing as t
+from datetime import datetime
+
+import exceptions
+from common import SEARCH_LIMIT
+from model_json import ModelJSON
+from model_json import page_slice
+from search_index import tokenize, FIELD_WEIGHTS
+from traversal import TreeItem, Subtree, walk, collect
+from my_nodes import RootBookmarks
+from my_nodes import Folder
+from my_nodes import Url
+from my_nodes import NameAllocator
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    guid TEXT NOT NULL,
+    parent_guid TEXT,
+    name TEXT NOT NULL,
+    is_folder INTEGER NOT NULL,
+    id_no,
+    date_added TEXT,
+    date_modified TEXT,
+    url TEXT,
+    icon TEXT,
+    keywords TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS nodes_name ON nodes (name);
+CREATE UNIQUE INDEX IF NOT EXISTS nodes_guid ON nodes (guid);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent_guid, id);
+'''  #: database schema, id column keeps the order of the children
+
+FOLDER_COLUMNS = ('date_modified', 'id_no', 'date_added', 'guid', 'parent_guid', 'name')  #: folder fields
+URL_COLUMNS = ('url', 'icon', 'keywords', 'id_no', 'date_added', 'guid', 'parent_guid', 'name')  #: url fields
+ROOT_COLUMNS = ('date_added', 'date_modified', 'guid', 'parent_guid', 'name')  #: fields of the <roots> node
+ALL_COLUMNS = ('guid', 'parent_guid', 'name', 'is_folder', 'id_no', 'date_added', 'date_modified',
+               'url', 'icon', 'keywords')  #: columns of the insert query
+INSERT_QUERY = f'INSERT INTO nodes ({", ".join(ALL_COLUMNS)}) VALUES ({", ".join("?" * len(ALL_COLUMNS))})'
+
+
+def _today() -> str:
+    """Get the current datetime as a string, without microseconds.
+
+    :return: datetime in ISO 8601 format
+    """
+    return datetime.isoformat(datetime.today().replace(microsecond=0))
+
+
+def _node_row(node, is_folder: bool) -> tuple:
+    """Make a row of the insert query from a node object.
+
+    :param node: Folder, Url or RootBookmarks object
+    :param is_folder: True for folders and the root
+    :return: tuple of the column values in the ALL_COLUMNS order
+    """
+    return (node.guid, node.parent_guid, node.name, int(is_folder),
+            getattr(node, 'id_no', 0), node.date_added, getattr(node, 'date_modified', None),
+            getattr(node, 'url', None), getattr(node, 'icon', None), getattr(node, 'keywords', None))
+
+
+def _field_columns(fields: t.Iterable[str]) -> tuple[str, ...]:
+    """Get the columns to read for the requested fields of the nodes, the type, the name and the guid
+    are always read.
+
+    :param fields: names of the fields
+    :return: tuple of the column names from ALL_COLUMNS
+    """
+    known = ('is_folder', 'name', 'guid')
+    return known + tuple(x for x in ALL_COLUMNS if x in fields and x not in known)
+
+
+class ModelSQLite:
+    """Implementation of a Model module with the SQLite storage.
+
+    """
+    def __init__(self):
+        """Constructor method.
+        """
+        self.conn: sqlite3.Connection | None = None  # connection to the current database
+        self.tree_name = ''  # name of the current tree and database filename (sqlite format)
+        self.cwd = os.getcwd()  # current working directory
+
+    def _connect(self, name: str):
+        """Open a connection to the database file and set it as the current one.
+
+        :param name: filename of the database
+        :return: nothing
+        """
+        self.close()  # close the previous database
+        self.conn = sqlite3.connect(name)
+        self.conn.row_factory = sqlite3.Row  # access columns by names
+        self.conn.executescript(SCHEMA)
+        self.tree_name = name
+
+    def _insert_subtrees(self, nodes: list, parent_name: str = 'roots'):
+        """Insert new nodes with their subtrees into the folder within one transaction,
+        parents before children. Duplicate names get the ' (i)' suffixes, guids which are empty
+        or already in the database are replaced by new ones, as RootBookmarks.add_subtrees() does.
+
+        :param nodes: list of new Folder or Url objects, children lists of folders contain new objects
+        :param parent_name: name of the parent folder, default to 'roots'
+        :return: nothing
+        """
+        parent_row = self._get_row(parent_name)
+        names = {x[0] for x in self.conn.execute('SELECT name FROM nodes')}  # names in use
+        guids = {x[0] for x in self.conn.execute('SELECT guid FROM nodes')}  # guids in use
+        allocator = NameAllocator()
+
+        def _rows():
+            """Yield rows of the new nodes in the depth-first order."""
+            stack = [(parent_row['guid'], node) for node in reversed(nodes)]  # explicit stack instead of recursion
+            while stack:
+                parent_guid, node = stack.pop()
+                if not node.guid or node.guid in guids:
+                    node.guid = str(uuid.uuid4())  # get a new GUID
+                node.parent_guid = parent_guid
+                node.name = allocator.allocate(node.name or node.guid, names)
+                names.add(node.name)
+                guids.add(node.guid)
+                is_folder = isinstance(node, Folder)
+                yield _node_row(node, is_folder)
+                if is_folder:
+                    stack.extend((node.guid, child) for child in reversed(node.children))
+
+        with self.conn:  # one transaction
+            self.conn.executemany(INSERT_QUERY, _rows())
+
+    @staticmethod
+    def _row_node(row: sqlite3.Row) -> Folder | Url:
+        """Make a node object from a row, children of a folder are not read.
+
+        :param row: the row of the node
+        :return: Folder or Url object
+        """
+        if row['is_folder']:
+            return Folder.from_dict({'children': []} | {key: row[key] for key in FOLDER_COLUMNS})
+        return Url.from_dict({key: row[key] for key in URL_COLUMNS})
+
+    def _iter_children(self, folder: Folder) -> t.Iterator[Folder | Url]:
+        """Iterate over the children of a folder, the rows are fetched on demand.
+
+        :param folder: folder object
+        :return: iterator of the children objects
+        """
+        cursor = self.conn.execute('SELECT * FROM nodes WHERE parent_guid = ? ORDER BY id', (folder.guid, ))
+        return map(self._row_node, cursor)
+
+    def _get_row(self, name: str, columns: t.Sequence[str] = ()) -> sqlite3.Row:
+        """Get the row of the named node.
+
+        :raises NodeNotExists: if node_name does not exist
+
+        :param name: node name
+        :param columns: columns to read, names from ALL_COLUMNS only; all the columns by default
+        :return: the row of the node
+        """
+        selected = ', '.join(columns) or '*'
+        row = self.conn.execute(f'SELECT {selected} FROM nodes WHERE name = ?', (name, )).fetchone()
+        if row is None:
+            raise exceptions.NodeNotExists(name)  # a named node does not exist, NodeNotExist error
+        return row
+
+    def _row_fields(self, row: sqlite3.Row, fields: t.Sequence[str]) -> dict:
+        """Get the requested fields of a node from its row, see get_node().
+
+        :param row: the row of the node with the is_folder, name and requested columns
+        :param fields: names of the fields in their order, the fields the node does not have are omitted
+        :return: dictionary {field_name: field_value}
+        """
+        name = row['name']
+        columns = URL_COLUMNS if not row['is_folder'] else ROOT_COLUMNS if name == 'roots' else FOLDER_COLUMNS
+        return {field: list(self.get_children(name)[1]) if field == 'children' else row[field]
+                for field in fields if field in columns or (field == 'children' and row['is_folder'])}
+
+    # ---- nodes section ----
+    def get_children(self, node_name: str, offset: int = 0, limit: int | None = None) -> tuple[bool, tuple[str, ...]]:
+        """Get a list of child names of the node, or a page of it, the page is selected by the query.
+
+        :exceptions: NodeNotExists if node_name does not exist
+        :raises ValueError: if the offset or the limit is negative
+
+        :param node_name: name of a node
+        :param offset: number of the skipped children, default to 0
+        :param limit: maximal number of the children, None for all the rest
+        :return: True/False, tuple of child's names/empty tuple
+        """
+        page = page_slice(offset, limit)
+        row = self._get_row(node_name, ('is_folder', 'guid'))
+        if not row['is_folder']:
+            return False, ()  # return False, empty tuple for url node
+        cursor = self.conn.execute('SELECT name FROM nodes WHERE parent_guid = ? ORDER BY id LIMIT ? OFFSET ?',
+                                   (row['guid'], -1 if limit is None else limit, page.start))  # -1 is no limit
+        return True, tuple(x[0] for x in cursor)  # return True, tuple of child's names
+
+    def iter_tree(self, start: str = 'roots', order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+        """Walk the subtree of the start node without recursion, see traversal.walk().
+        Only the name, type and guid columns are read, the children of a folder are queried when reached.
+
+        :raises NodeNotExists: if the start node does not exist
+        :raises ValueError: if the order is unknown
+
+        :param start: name of the start node, the root by default
+        :param order: 'dfs' for the depth-first order, 'bfs' for the breadth-first one
+        :param max_depth: the deepest level to walk, None for the whole subtree
+        :return: iterator of the (depth, name, is_folder) records
+        """
+        row = self._get_row(start)
+
+        def _query(guid: str) -> t.Iterator[tuple]:
+            # a generator, the query runs when the folder is reached, not when it is queued
+            yield from self.conn.execute('SELECT name, is_folder, guid FROM nodes WHERE parent_guid = ? ORDER BY id',
+                                         (guid, ))
+
+        def _children(node: tuple) -> t.Iterator[tuple] | None:
+            return _query(node[2]) if node[1] else None  # an url has no children
+
+        return walk((row['name'], row['is_folder'], row['guid']), _children, lambda x: x[0], order, max_depth)
+
+    def get_subtree(self, name: str = 'roots', max_depth: int | None = None, fields: t.Iterable[str] = ()) -> Subtree:
+        """Get the subtree of the node at once, see traversal.collect().
+        One query per folder reads the name, type and guid columns and the columns of the requested fields.
+
+        :raises NodeNotExists: if the node does not exist
+
+        :param name: name of the start node, the root by default
+        :param max_depth: the deepest level to get, None for the whole subtree
+        :param fields: names of the fields to get for every node, the names and types only by default
+        :return: the Subtree with the flat lists of the nodes in the depth-first order
+        """
+        fields = tuple(fields)
+        columns = ', '.join(_field_columns(fields))  # the name, the type and the guid are among them
+        row = self.conn.execute(f'SELECT {columns} FROM nodes WHERE name = ?', (name, )).fetchone()
+        if row is None:
+            raise exceptions.NodeNotExists(name)  # a named node does not exist, NodeNotExist error
+
+        def _query(guid: str) -> t.Iterator[sqlite3.Row]:
+            # a generator, the query runs when the folder is reached
+            yield from self.conn.execute(f'SELECT {columns} FROM nodes WHERE parent_guid = ? ORDER BY id', (guid, ))
+
+        def _children(node: sqlite3.Row) -> t.Iterator[sqlite3.Row] | None:
+            return _query(node['guid']) if node['is_folder'] else None  # an url has no children
+
+        return collect(row, _children, lambda x: x['name'], (lambda x: self._row_fields(x, fields)) if fields else None,
+                       fields, max_depth)
+
+    def add_node(self, attr_dict: dict, node_type: bool):
+        """Add a folder or url to the tree and save the tree into the file
+
+        :raises NodeExists: if the name is already in the tree
+
+        :param attr_dict: dictionary with initial node attributes
+        :param node_type: True for folder adding, False for url
+        :return: nothing
+        """
+        parent_row = self._get_row(attr_dict['parent_name'])  # get the parent row
+        guid = attr_dict.get('guid') or str(uuid.uuid4())  # get a new GUID if omitted
+        today = _today()
+        values = {'guid': guid, 'parent_guid': parent_row['guid'], 'name': attr_dict.get('name') or guid,
+                  'is_folder': int(node_type), 'id_no': attr_dict.get('id_no', 0),
+                  'date_added': attr_dict.get('date_added') or today,
+                  'date_modified': (attr_dict.get('date_modified') or today) if node_type else None,
+                  'url': None if node_type else attr_dict.get('url', ''),
+                  'icon': None if node_type else attr_dict.get('icon', ''),
+                  'keywords': None if node_type else attr_dict.get('keywords', '')}
+        try:
+            with self.conn:  # one transaction
+                self.conn.execute(INSERT_QUERY, tuple(values[x] for x in ALL_COLUMNS))
+        except sqlite3.IntegrityError as e:
+            self._raise_name_exists(values['name'], e)
+
+    def _raise_name_exists(self, name: str, error: sqlite3.IntegrityError, node_id: int | None = None):
+        """Raise NodeExists after the integrity error of a rolled back insert or update if the name is in use,
+        otherwise raise the integrity error again.
+
+        :raises NodeExists: if the name is in the tree
+        :raises IntegrityError: if the name is not in the tree
+
+        :param name: the inserted or new name of the node
+        :param error: the integrity error
+        :param node_id: id of the updated node, its own name is not a conflict; None for an insert
+        :return: nothing
+        """
+        if self.conn.execute('SELECT 1 FROM nodes WHERE name = ? AND id IS NOT ?', (name, node_id)).fetchone():
+            raise exceptions.NodeExists(name) from None
+        raise error
+
+    def add_nodes(self, attr_dicts: t.Iterable[dict]):
+        """Add many folders and urls to the tree within one transaction, see RootBookmarks.add_nodes().
+        Either all the nodes are inserted or none of them.
+
+        :raises NodeNotExists: if a parent does not exist
+        :raises FolderNotExist: if a parent is not a folder
+        :raises NodeExists: if a name is already in the tree or in the batch
+
+        :param attr_dicts: iterable of the dictionaries with initial node attributes and the parent name
+        :return: nothing
+        """
+        today = _today()  # one datetime for the batch
+        batch: dict = {}  # {name: (guid, is_folder)} of the new nodes
+        batch_guids: set = set()  # guids of the new nodes
+
+        def _rows():
+            """Yield rows of the new nodes, resolve their parents."""
+            for attr_dict in attr_dicts:
+                parent_name = attr_dict['parent_name']
+                if parent_name in batch:
+                    parent_guid, parent_is_folder = batch[parent_name]
+                else:
+                    parent_row = self._get_row(parent_name)
+                    parent_guid, parent_is_folder = parent_row['guid'], parent_row['is_folder']
+                if not parent_is_folder:
+                    raise exceptions.FolderNotExist(parent_name)
+                is_folder = 'url' not in attr_dict
+                guid = attr_dict.get('guid')
+                if not guid or guid in batch_guids or \
+                        self.conn.execute('SELECT 1 FROM nodes WHERE guid = ?', (guid, )).fetchone():
+                    guid = str(uuid.uuid4())  # get a new GUID
+                name = attr_dict.get('name') or guid
+                if name in batch:
+                    raise exceptions.NodeExists(name)
+                batch[name] = guid, is_folder
+                batch_guids.add(guid)
+                yield (guid, parent_guid, name, int(is_folder), attr_dict.get('id_no', 0),
+                       attr_dict.get('date_added') or today,
+                       (attr_dict.get('date_modified') or today) if is_folder else None,
+                       attr_dict.get('url'), None if is_folder else attr_dict.get('icon', ''),
+                       None if is_folder else attr_dict.get('keywords', ''))
+
+        try:
+            with self.conn:  # one transaction, it is rolled back on an error
+                self.conn.executemany(INSERT_QUERY, _rows())
+        except sqlite3.IntegrityError:
+            # a name is in use, the transaction is rolled back, find the name for the error message
+            for name in batch:
+                if self.conn.execute('SELECT 1 FROM nodes WHERE name = ?', (name, )).fetchone():
+                    raise exceptions.NodeExists(name) from None
+            raise
+
+    def update_node(self, name: str, attr_dict: dict):
+        """Update a folder or url of the internal tree and save it into the file.
+        A new guid of a folder is set to its children as the parent guid, as RootBookmarks.update_node() does.
+        The parent guid is not updated, a node is moved to another folder by move_node() only.
+
+        :raises NodeExists: if the node is renamed to a name in the tree
+        :raises IntegrityError: if the new guid is in the tree
+
+        :param name: updating node name
+        :param attr_dict: dictionary with the updating fields
+        :return: nothing
+        """
+        row = self._get_row(name)
+        columns = URL_COLUMNS if not row['is_folder'] else FOLDER_COLUMNS
+        # children are not columns, parent_guid would re-parent the node without the checks of move_node()
+        fields = {key: value for key, value in attr_dict.items() if key in columns and key != 'parent_guid'}
+        try:
+            with self.conn:  # one transaction
+                self.conn.execute('UPDATE nodes SET date_modified = ? WHERE guid = ?', (_today(), row['parent_guid']))
+                if fields:
+                    assignments = ', '.join(f'{key} = ?' for key in fields)
+                    self.conn.execute(f'UPDATE nodes SET {assignments} WHERE id = ?', (*fields.values(), row['id']))
+                if row['is_folder'] and fields.get('guid', row['guid']) != row['guid']:
+                    # the children keep their folder
+                    self.conn.execute('UPDATE nodes SET parent_guid = ? WHERE parent_guid = ?',
+                                      (fields['guid'], row['guid']))
+        except sqlite3.IntegrityError as e:
+            self._raise_name_exists(fields.get('name', name), e, row['id'])
+
+    def delete_node(self, name: str):
+        """Delete a node from the current tree.
+
+        :raises NodeNotExists: if node_name does not exist
+        :raises FolderNotEmpty: if node_name folder is not empty
+
+        :param name: node name to delete
+        :return: nothing
+        """
+        row = self._get_row(name)
+        if row['is_folder'] and \
+                self.conn.execute('SELECT 1 FROM nodes WHERE parent_guid = ? LIMIT 1', (row['guid'], )).fetchone():
+            raise exceptions.FolderNotEmpty(name)  # can not delete a non-empty folder, raise FolderNotEmpty
+        with self.conn:  # one transaction
+            self.conn.execute('DELETE FROM nodes WHERE id = ?', (row['id'], ))
+
+    def move_node(self, name: str, parent_name: str):
+        """Move a node with its subtree to the end of another folder, the node gets the next id.
+        The modification dates of the old and the new parents are updated.
+
+        :raises NodeNotExists: if the node or the folder does not exist
+        :raises FolderNotExist: if the new parent is not a folder
+        :raises NodeNotMovable: if the node is the root, or the folder is in the subtree of the node
+
+        :param name: name of the moved node
+        :param parent_name: name of the new parent folder
+        :return: nothing
+        """
+        row = self._get_row(name)
+        parent_row = self._get_row(parent_name)
+        if not parent_row['is_folder']:
+            raise exceptions.FolderNotExist(parent_name)
+        guid = parent_row['guid']
+        while guid:  # the path from the new parent to the root must not cross the node
+            if guid == row['guid']:
+                raise exceptions.NodeNotMovable(name, parent_name)
+            guid = self.conn.execute('SELECT parent_guid FROM nodes WHERE guid = ?', (guid, )).fetchone()[0]
+        if not row['parent_guid']:
+            raise exceptions.NodeNotMovable(name, parent_name)  # the root
+        today = _today()
+        with self.conn:  # one transaction
+            self.conn.execute('UPDATE nodes SET parent_guid = ?, id = (SELECT MAX(id) + 1 FROM nodes) WHERE id = ?',
+                              (parent_row['guid'], row['id']))
+            self.conn.execute('UPDATE nodes SET date_modified = ? WHERE guid IN (?, ?)',
+                              (today, row['parent_guid'], parent_row['guid']))
+
+    def get_node(self, name: str, fields: t.Iterable[str] | None = None) -> dict:
+        """Get a node content.
+        Replace children objects with their names for folder children list
+
+        :exceptions: raise NodeNotExists if node_name does not exist
+
+        :param name: node name
+        :param fields: names of the fields to get, the fields the node does not have are omitted; None for all.
+                       Only their columns are read, the children are queried if they are requested
+        :return: dictionary {field_name: field_value} of the node
+        """
+        if fields is not None:
+            fields = tuple(fields)
+            return self._row_fields(self._get_row(name, _field_columns(fields)), fields)
+        row = self._get_row(name)
+        if not row['is_folder']:
+            return {key: row[key] for key in URL_COLUMNS}
+        result, children = self.get_children(name)
+        columns = ROOT_COLUMNS if name == 'roots' else FOLDER_COLUMNS
+        return {'children': list(children)} | {key: row[key] for key in columns}
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> tuple[str, ...]:
+        """Search bookmarks by their names, urls and keywords, all words of the query should occur
+        in the fields as substrings. Results are ranked by the field weights, then by the name.
+
+        :param query: words to search
+        :param limit: maximal number of the results, default to SEARCH_LIMIT
+        :return: tuple of the node names, the best matches first
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return ()
+        patterns = ['%' + token.replace('_', '\\_') + '%' for token in tokens]  # tokens are words, escape '_' only
+        score = ' + '.join(f"(IFNULL({field}, '') LIKE ? ESCAPE '\\') * {weight}"
+                           for _ in tokens for field, weight in FIELD_WEIGHTS)
+        condition = ' AND '.join('(' + ' OR '.join(f"IFNULL({field}, '') LIKE ? ESCAPE '\\'"
+                                                   for field, _ in FIELD_WEIGHTS) + ')' for _ in tokens)
+        args = [pattern for pattern in patterns for _ in FIELD_WEIGHTS]
+        cursor = self.conn.execute(f"SELECT name FROM nodes WHERE parent_guid != '' AND {condition} "
+                                   f"ORDER BY {score} DESC, name LIMIT ?", (*args, *args, limit))
+        return tuple(x[0] for x in cursor)
+
+    # ---- database section ----
+    def create_database(self, name: str):
+        """Create an empty bookmark structure and a file to keep the database.
+
+        :exceptions: FileExistsError if given filename exists
+
+        :param name: name and filename of the new database
+        :return: nothing
+        """
+        with open(name, 'x') as f:     # open a new file as exclusive, or FileExistsError if such a file exists
+            pass
+        self._connect(name)
+        with self.conn:
+            self.conn.execute(INSERT_QUERY, _node_row(RootBookmarks(), True))  # the <roots> node
+
+    def delete_database(self, name: str):
+        """Delete the database file.
+
+        :exception: FileNotFoundError if the filename does not exist
+
+        :param name: name and filename of the deleting database
+        :return: nothing
+        """
+        if os.path.abspath(name) == os.path.abspath(self.tree_name or os.devnull):
+            self.close()  # the current database is being deleted
+            self.tree_name = ''
+        os.remove(name)  # delete the file
+
+    def open_database(self, name: str):
+        """Open a database, the tree is not read into the memory.
+
+        :exception: FileNotFoundError if the filename does not exist
+
+        :param name: name and filename of the opening database
+        :return: nothing
+        """
+        if not os.path.isfile(name):
+            raise FileNotFoundError(f'No such file: {name}')  # sqlite3 would create a new file
+        self._connect(name)
+
+    def close(self):
+        """Close the connection to the current database, all mutations are already committed.
+
+        :return: nothing
+        """
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    # ---- convertors section ----
+    def _import_nodes(self, read: t.Callable[[str], list], filename: str, file_kind: str) -> tuple[bool, str]:
+        """Read a bookmark file and insert its nodes into <roots> within one transaction.
+
+        :param read: reader of the file, returns a list of new nodes with their subtrees, see converters
+        :param filename: bookmark filename to convert
+        :param file_kind: kind of the file for the error message
+        :return: (True, empty string)  or (False, error message)
+        """
+        try:
+            nodes = read(filename)
+        except FileNotFoundError:
+            return False, f'File <{filename}> does not exist'
+        except (ValueError, UnicodeDecodeError) as e:
+            return False, f'File <{filename}> is not a {file_kind}: {e}'
+        self._insert_subtrees(nodes)
+        return True, ''
+
+    def convert_chrome(self, filename: str) -> tuple[bool, str]:
+        """Convert Chrome bookmark JSON filename to the current tree. Return (True/False, error message)
+        Chrome root folders are inserted into <roots> with all their nodes.
+
+        :param filename: Google bookmark filename to convert
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import read_chrome  # imported on demand, converters load the parsers
+        return self._import_nodes(read_chrome, filename, 'Chrome bookmark file')
+
+    def convert_mozilla(self, filename: str) -> tuple[bool, str]:
+        """Convert Mozilla bookmark filename to the current tree. Return (True/False, error message).
+        The file is the places.sqlite database of a Firefox profile, it is read by batches,
+        or a Netscape bookmark HTML file exported by Firefox or other browsers.
+        All the nodes are inserted by one executemany() within one transaction.
+
+        :param filename: Mozilla bookmark filename to convert
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import read_mozilla  # imported on demand, converters load the parsers
+        return self._import_nodes(read_mozilla, filename, 'Mozilla bookmark file')
+
+    def _export_tree(self, write: t.Callable, filename: str) -> tuple[bool, str]:
+        """Write the current tree to a bookmark file, the rows are read folder by folder.
+
+        :param write: writer of the file, write(root, filename, get_children), see converters
+        :param filename: bookmark filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        try:
+            write(self._row_node(self._get_row('roots')), filename, self._iter_children)
+        except OSError as e:
+            return False, f'File <{filename}> can not be written: {e}'
+        return True, ''
+
+    def export_netscape(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Netscape bookmark HTML file.
+
+        :param filename: bookmark HTML filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import write_netscape  # imported on demand, converters load the parsers
+        return self._export_tree(write_netscape, filename)
+
+    def export_chrome(self, filename: str) -> tuple[bool, str]:
+        """Export the current tree to a Chrome bookmark JSON file with its checksum.
+
+        :param filename: Chrome bookmark filename, an existing file is overwritten
+        :return: (True, empty string)  or (False, error message)
+        """
+        from converters import write_chrome  # imported on demand, converters load the parsers
+        return self._export_tree(write_chrome, filename)
+
+
+def migrate_json(json_name: str, sqlite_name: str):
+    """Migrate a JSON database of ModelJSON to a new SQLite database.
+    All nodes are inserted within one transaction, parents before their children.
+
+    :exceptions: FileNotFoundError if json_name does not exist, FileExistsError if sqlite_name exists
+
+    :param json_name: filename of the JSON database
+    :param sqlite_name: filename of the new SQLite database
+    :return: nothing
+    """
+    json_model = ModelJSON()
+    json_model.open_database(json_name)  # read the tree
+    root = json_model.root
+
+    def _rows():
+        """Yield rows of the tree nodes in the depth-first order."""
+        yield _node_row(root, True)
+        stack = list(reversed(root.children))  # explicit stack instead of recursion
+        while stack:
+            node = stack.pop()
+            is_folder = hasattr(node, 'children')
+            yield _node_row(node, is_folder)
+            if is_folder:
+                stack.extend(reversed(node.children))
+
+    with open(sqlite_name, 'x') as f:  # open a new file as exclusive, or FileExistsError if such a file exists
+        pass
+    conn = sqlite3.connect(sqlite_name)
+    try:
+        conn.executescript(SCHEMA)
+        with conn:  # one transaction
+            conn.executemany(INSERT_QUERY, _rows())
+    finally:
+        conn.close()
+
+
+def main():
+    """Migrate a JSON database to SQLite: python model_sqlite.py <database.json> <database.sqlite>"""
+    if len(sys.argv) != 3:
+        print(main.__doc__)
+        return
+    migrate_json(sys.argv[1], sys.argv[2])
+    print(f'Database <{sys.argv[1]}> has been migrated to <{sys.argv[2]}>')
+
+
+if __name__ == '__main__':
+    main()
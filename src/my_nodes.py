@@ -6,7 +6,11 @@ Root node has the name 'roots' (that everywhere given in literal form).
 There are two types of nodes: Folder and Url, node 'roots' is a special form of folder
 Folders have a mutable list of children, urls are leaf nodes.
 The tree structure keeps a global nodes' dictionary in the form {key=node_name: value=object: Folder | Url}
-All nodes have 'guid' and 'parent_guid' fields for reverse tree search
+All nodes have 'guid' and 'parent_guid' fields for reverse tree search,
+the tree keeps a guid index in the form {key=guid: value=object: RootBookmarks | Folder | Url}
+to resolve the parent of a node in constant time.
+The full-text search index of the tree is built at the first search and kept in sync by the tree mutations.
+Duplicate names get the ' (i)' suffixes from a name allocator in amortized constant time.
 
 Instances of the class Folder have the following attributes:
     self.guid: str
@@ -26,19 +30,28 @@ Instances of the class Url have the following attributes:
     self.url    # URL of the bookmark
     self.icon   # small graphic icon of the URL
     self.keywords   # the keywords for the URL content
+
+Node classes are slotted to keep the memory footprint of big trees small, they have no instance __dict__.
+Use to_dict() and from_dict() to convert a node to the dictionary of its fields and back,
+FIELDS class attribute keeps the order of the fields in the database file.
 """
 
+import re
 import uuid
 import typing as t
 from datetime import datetime
 
 import exceptions
+from search_index import SearchIndex
 
 
 class Node(object):
     """The base class of nodes for bookmark's tree.
 
     """
+    __slots__ = ('guid', 'parent_guid', 'name')
+    FIELDS: tuple[str, ...] = ('guid', 'parent_guid', 'name')  #: fields of the node in the file order
+
     def __init__(self, guid: str = '', parent_guid: str = '', name: str = ''):
         """Constructor method.
 
@@ -74,11 +87,39 @@ class Node(object):
         if kwargs:
             raise TypeError(f'{len(kwargs)} exceeded argument(s) was/were given')
 
+    def to_dict(self) -> dict:
+        """Get the fields of the node. Children of folders are kept as objects.
+
+        :return: dictionary {field_name: field_value} in the FIELDS order
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def get_fields(self, fields: t.Iterable[str]) -> dict:
+        """Get the requested fields of the node, children of folders are replaced with their names.
+
+        :param fields: names of the fields in their order, the fields the node does not have are omitted
+        :return: dictionary {field_name: field_value}
+        """
+        node_fields = self.FIELDS
+        return {field: [x.name for x in self.children] if field == 'children' else getattr(self, field)
+                for field in fields if field in node_fields}
+
+    @classmethod
+    def from_dict(cls, dct: dict):
+        """Create a node from the dictionary of its fields.
+
+        :param dct: dictionary {field_name: field_value}
+        :return: a new node object
+        """
+        return cls(**dct)
+
 
 class Bookmark(Node):
     """Parent class for Folder and Url classes.
 
     """
+    __slots__ = ('id_no', 'date_added')
+    FIELDS = ('id_no', 'date_added') + Node.FIELDS
     def __init__(self, id_no: int = 0, date_added: str = '', **kwargs):
         """Constructor method.
 
@@ -112,6 +153,8 @@ class Folder(Bookmark):
     """A Folder class, child class of Bookmark class.
 
     """
+    __slots__ = ('children', 'date_modified')
+    FIELDS = ('children', 'date_modified') + Bookmark.FIELDS
     def __init__(self, children: t.Optional[list] = None, date_modified: str = '', **kwargs):
         """Constructor method.
 
@@ -143,17 +186,52 @@ class Folder(Bookmark):
             self.date_modified = kwargs.pop('date_modified')
         super().update(**kwargs)
 
+    def to_dict(self) -> dict:
+        """Get the fields of the folder, children are kept as objects.
+
+        :return: dictionary {field_name: field_value} in the FIELDS order
+        """
+        return {'children': self.children, 'date_modified': self.date_modified, 'id_no': self.id_no,
+                'date_added': self.date_added, 'guid': self.guid, 'parent_guid': self.parent_guid, 'name': self.name}
+
+    @classmethod
+    def from_dict(cls, dct: dict) -> 'Folder':
+        """Create a folder from the dictionary of its fields.
+        A fast path for the database loading: if the dictionary has all the fields filled in (as in the file),
+        set them directly and skip the constructor with its default values.
+
+        :param dct: dictionary {field_name: field_value}
+        :return: a new folder object
+        """
+        if len(dct) != len(cls.FIELDS) or not (dct.get('guid') and dct.get('name') and dct.get('date_added')
+                                               and dct.get('date_modified')):
+            return cls(**dct)  # defaults are needed or fields are wrong, the constructor checks them
+        node = cls.__new__(cls)
+        try:
+            node.children = dct['children']
+            node.date_modified = dct['date_modified']
+            node.id_no = dct['id_no']
+            node.date_added = dct['date_added']
+            node.guid = dct['guid']
+            node.parent_guid = dct['parent_guid']
+            node.name = dct['name']
+        except KeyError:
+            return cls(**dct)  # unknown field, the constructor raises TypeError
+        return node
+
 
 class Url(Bookmark):
     """An Url class, child class of Bookmark class.
 
     """
+    __slots__ = ('url', 'icon', 'keywords')
+    FIELDS = ('url', 'icon', 'keywords') + Bookmark.FIELDS
     def __init__(self, url: str = '', icon:str = '', keywords:str = '', **kwargs):
         """Constructor method.
 
         :param url: URL address of an internet resource
         :param icon: icon for this website, not used now, for the future development
-        :param keywords: keywords for a fast search, not used now, for the future development
+        :param keywords: keywords for the search, indexed with the name and the url
         :param kwargs: other params for superclasses methods
         """
         self.url: str = url
@@ -175,22 +253,106 @@ class Url(Bookmark):
             self.keywords = kwargs.pop('keywords')
         super().update(**kwargs)
 
+    def to_dict(self) -> dict:
+        """Get the fields of the url.
+
+        :return: dictionary {field_name: field_value} in the FIELDS order
+        """
+        return {'url': self.url, 'icon': self.icon, 'keywords': self.keywords, 'id_no': self.id_no,
+                'date_added': self.date_added, 'guid': self.guid, 'parent_guid': self.parent_guid, 'name': self.name}
+
+    @classmethod
+    def from_dict(cls, dct: dict) -> 'Url':
+        """Create an url from the dictionary of its fields.
+        A fast path for the database loading: if the dictionary has all the fields filled in (as in the file),
+        set them directly and skip the constructor with its default values.
+
+        :param dct: dictionary {field_name: field_value}
+        :return: a new url object
+        """
+        if len(dct) != len(cls.FIELDS) or not (dct.get('guid') and dct.get('name') and dct.get('date_added')):
+            return cls(**dct)  # defaults are needed or fields are wrong, the constructor checks them
+        node = cls.__new__(cls)
+        try:
+            node.url = dct['url']
+            node.icon = dct['icon']
+            node.keywords = dct['keywords']
+            node.id_no = dct['id_no']
+            node.date_added = dct['date_added']
+            node.guid = dct['guid']
+            node.parent_guid = dct['parent_guid']
+            node.name = dct['name']
+        except KeyError:
+            return cls(**dct)  # unknown field, the constructor raises TypeError
+        return node
+
+
+class NameAllocator:
+    """Allocator of the unique names 'name', 'name (1)', 'name (2)', ..., the first free one as the linear probing.
+    For every base name it keeps the next suffix to probe: all the smaller suffixes are in use.
+    A released name with a smaller suffix moves it back, so the freed names are reused in the same order.
+    A base name without the entry starts from 1, so a new allocator is valid for any set of names
+    and learns its entries at the first duplicates.
+
+    """
+    SUFFIX = re.compile(r'(.*) \((\d+)\)')  #: a name with the suffix
+
+    __slots__ = ('next_suffix', )
+
+    def __init__(self):
+        """Constructor method.
+        """
+        self.next_suffix: dict[str, int] = {}  # {base name: the next suffix to probe}
+
+    def allocate(self, name: str, used: t.Container[str]) -> str:
+        """Get the unique name for a new node, the name is not reserved till it is added to the used names.
+
+        :param name: the wanted name
+        :param used: container of the names in use
+        :return: the wanted name if it is free, otherwise the first free name with a suffix
+        """
+        if name not in used:
+            return name
+        i = self.next_suffix.get(name, 1)
+        while f'{name} ({i})' in used:
+            i += 1  # every probe moves the next suffix forward, so it is done once for the name
+        self.next_suffix[name] = i
+        return f'{name} ({i})'
+
+    def release(self, name: str):
+        """Register a name which is not used anymore: a node is deleted or renamed.
+
+        :param name: the released name
+        :return: nothing
+        """
+        match = self.SUFFIX.fullmatch(name)
+        if match:
+            base, i = match.group(1), int(match.group(2))
+            if i < self.next_suffix.get(base, 1):
+                self.next_suffix[base] = i  # the freed name is the first one to reuse
+
 
 class RootBookmarks(Node):
     """The root class for bookmark's tree.
 
     """
+    __slots__ = ('nodes_dict', 'guid_dict', 'search_index', 'names', 'children', 'date_added', 'date_modified')
+    FIELDS = ('children', 'date_added', 'date_modified') + Node.FIELDS  # indexes are not stored
     def __init__(self):
         """Constructor method.
 
         """
         self.nodes_dict: dict = {}  # global dict of all nodes in the tree: {'name': <object>,,,}
+        self.guid_dict: dict = {}  # guid index of all nodes in the tree: {'guid': <object>,,,}
+        self.search_index: SearchIndex | None = None  # full-text index, built at the first search
+        self.names = NameAllocator()  # allocator of the unique names, learns the loaded names on demand
         self.children: list = list()  # create the list of child objects
         today = datetime.today().replace(microsecond=0)  # get today datetime object
         self.date_added: str = datetime.isoformat(today)  # insert the current datetime as a string
         self.date_modified: str = datetime.isoformat(today)  # insert the current datetime as a string
         # default values for name and parent_guid, no parent_guid for the root
         super().__init__(name='roots', parent_guid='')
+        self.guid_dict[self.guid] = self  # the root is the first record of the guid index
 
     def update_root(self, **kwargs):
         """Update params of the RootBookmarks class.
@@ -205,7 +367,25 @@ class RootBookmarks(Node):
             self.date_added = kwargs.pop('date_added')
         if 'date_modified' in kwargs:
             self.date_modified = kwargs.pop('date_modified')
+        self.guid_dict.pop(self.guid, None)
         super().update(**kwargs)
+        self.guid_dict[self.guid] = self  # the guid of the root may be changed
+
+    def check_index(self) -> bool:
+        """Check the consistency of the guid index with the nodes dictionary and the parent links.
+        An O(n) walk of the whole tree intended for the tests, call it as <assert root.check_index()>.
+
+        :return: True if the index is consistent, AssertionError otherwise
+        """
+        assert len(self.guid_dict) == len(self.nodes_dict), 'guid index and nodes dict differ in size'
+        linked = 0  # number of nodes linked to their parents
+        for node in self.nodes_dict.values():
+            assert self.guid_dict.get(node.guid) is node, f'node <{node.name}> is not indexed by its guid'
+            for child in getattr(node, 'children', ()):
+                assert child.parent_guid == node.guid, f'node <{child.name}> has a wrong parent guid'
+                linked += 1
+        assert linked == len(self.nodes_dict) - 1, 'some nodes are not linked to their parents'
+        return True
 
     def duplicate_name(self, name: str) -> str:
         """Check if a name already exists in the global node dict.
@@ -214,12 +394,7 @@ class RootBookmarks(Node):
         :param name: node name for checking
         :return: new unique node name or input name if it is not duplicated
         """
-        i = 1  # initial copy name number
-        new_name = name  # an input name for search
-        while new_name in self.nodes_dict:
-            new_name = f'{name} ({i})'
-            i += 1
-        return new_name
+        return self.names.allocate(name, self.nodes_dict)
 
     def check_node(self, node_name: str) -> Folder | Url:
         """Check if the node is in the global nodes dictionary
@@ -234,17 +409,21 @@ class RootBookmarks(Node):
         else:
             raise exceptions.NodeNotExists(node_name)  # a named node does not exist, NodeNotExist error
 
-    def get_node(self, node_name: str) -> dict:
+    def get_node(self, node_name: str, fields: t.Iterable[str] | None = None) -> dict:
         """Get a node content.
         Replace children objects with their names for folder children list
 
         :raises raise NodeNotExists if node_name does not exist
 
         :param node_name: node name
+        :param fields: names of the fields to get in their order, the fields the node does not have are omitted;
+                       None for all the fields
         :return: dictionary {field_name: field_value} of the node
         """
         node_object = self.check_node(node_name)  # get the node instance or NodeNotExist error
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        if fields is not None:  # only the requested fields are read, the children names are listed on request
+            return node_object.get_fields(fields)
+        node_content = node_object.to_dict()  # local copy of the node's fields
 
         # ---- check if the node is a folder ----
         if 'children' in node_content:  # any folder has a children list
@@ -264,7 +443,7 @@ class RootBookmarks(Node):
 
         # replace the parent name with the parent guid
         parent_node = self.nodes_dict[attr_dict['parent_name']]  # get a parent object
-        attr_dict['parent_guid'] = parent_node.__dict__['guid']  # get the parent guid and set it to args
+        attr_dict['parent_guid'] = parent_node.guid  # get the parent guid and set it to args
         del attr_dict['parent_name']  # remove the unnecessary argument
 
         # create a node, folder or url
@@ -276,27 +455,126 @@ class RootBookmarks(Node):
         # modify the parent's children list and common nodes dict
         parent_node.children.append(new_node)  # add new node object to the parent child list
         self.nodes_dict[new_node.name] = new_node  # add new node object to the node's dict
+        self.guid_dict[new_node.guid] = new_node  # add new node object to the guid index
+        if self.search_index is not None:
+            self.search_index.add(new_node)  # index the fields of the new node
+
+    def add_nodes(self, attr_dicts: t.Iterable[dict]) -> list:
+        """Add many folders and urls to the tree at once.
+        A dictionary is as for add_node(), with the 'url' key for an url, without it for a folder.
+        A parent may be a folder added earlier in the same batch. Guids and dates which are omitted
+        are set to new guids and the same current datetime. The whole batch is checked and its nodes are created
+        before the tree is changed, so either all the nodes are added or none of them.
+
+        :raises NodeNotExists: if a parent does not exist
+        :raises FolderNotExist: if a parent is not a folder
+        :raises NodeExists: if a name is already in the tree or in the batch
+
+        :param attr_dicts: iterable of the dictionaries with initial node attributes and the parent name
+        :return: list of the new nodes in the adding order
+        """
+        today = datetime.isoformat(datetime.today().replace(microsecond=0))  # one datetime for the batch
+        batch: dict = {}  # {name: node} of the new nodes
+        batch_guids: set = set()  # guids of the new nodes
+        added = []  # (parent, node) pairs
+        for attr_dict in attr_dicts:
+            attrs = dict(attr_dict)  # the caller's dictionary is kept
+            parent_name = attrs.pop('parent_name')
+            parent_node = batch[parent_name] if parent_name in batch else self.nodes_dict.get(parent_name)
+            if parent_node is None:
+                raise exceptions.NodeNotExists(parent_name)
+            if isinstance(parent_node, Url):
+                raise exceptions.FolderNotExist(parent_name)
+            guid = attrs.get('guid')
+            if not guid or guid in self.guid_dict or guid in batch_guids:
+                attrs['guid'] = str(uuid.uuid4())  # get a new GUID
+            attrs['parent_guid'] = parent_node.guid
+            attrs['name'] = attrs.get('name') or attrs['guid']
+            if attrs['name'] in self.nodes_dict or attrs['name'] in batch:
+                raise exceptions.NodeExists(attrs['name'])
+            attrs['date_added'] = attrs.get('date_added') or today
+            if 'url' in attrs:
+                new_node = Url(**attrs)  # create a new url instance
+            else:
+                attrs['date_modified'] = attrs.get('date_modified') or today
+                new_node = Folder(**attrs)  # create a new folder instance
+            batch[new_node.name] = new_node
+            batch_guids.add(new_node.guid)
+            added.append((parent_node, new_node))
+
+        # the batch is valid, link the nodes and update the indexes
+        for parent_node, new_node in added:
+            parent_node.children.append(new_node)  # add new node object to the parent child list
+            self.nodes_dict[new_node.name] = new_node  # add new node object to the node's dict
+            self.guid_dict[new_node.guid] = new_node  # add new node object to the guid index
+        if self.search_index is not None:
+            self.search_index.add_all(batch.values())  # the vocabulary is sorted once for the batch
+        return list(batch.values())
+
+    def add_subtrees(self, nodes: list, parent_name: str = 'roots'):
+        """Add new nodes with their subtrees to the folder, e.g. nodes read from a bookmark file.
+        Nodes are added in the tree order, parents before children. Duplicate names are replaced
+        by duplicate_name(), guids which are empty or already in the tree are replaced by new ones.
+
+        :param nodes: list of new Folder or Url objects, children lists of folders contain new objects
+        :param parent_name: name of the parent folder, default to 'roots'
+        :return: nothing
+        """
+        stack = [(self.nodes_dict[parent_name], node) for node in reversed(nodes)]  # explicit stack, no recursion
+        while stack:
+            parent_node, node = stack.pop()
+            if not node.guid or node.guid in self.guid_dict:
+                node.guid = str(uuid.uuid4())  # get a new GUID
+            node.parent_guid = parent_node.guid
+            node.name = self.duplicate_name(node.name or node.guid)
+            parent_node.children.append(node)  # add new node object to the parent child list
+            self.nodes_dict[node.name] = node  # add new node object to the node's dict
+            self.guid_dict[node.guid] = node  # add new node object to the guid index
+            if self.search_index is not None:
+                self.search_index.add(node)  # index the fields of the new node
+            if isinstance(node, Folder) and node.children:
+                children, node.children = node.children, []  # children are linked when they are added
+                stack.extend((node, child) for child in reversed(children))
 
     def update_node(self, name: str, attr_dict: dict):
-        """Update a folder or url of the internal tree.
+        """Update a folder or url of the internal tree. Nothing is changed on an error.
+
+        :raises TypeError: if a field is not a field of the node
 
         :param name: updating node name
         :param attr_dict: dictionary with the updating fields
         :return: nothing
         """
         node_object = self.nodes_dict[name]  # get the node object
+        unknown = [key for key in attr_dict if key not in node_object.FIELDS]
+        if unknown:
+            # checked before the search index and the node are touched, update() would raise it half-done
+            raise TypeError(f'{len(unknown)} exceeded argument(s) was/were given: {unknown}')
 
         # update of the parent node's date_modified field
         parent_folder = self.get_parent(name)  # get the parent folder object
         today = datetime.today().replace(microsecond=0)  # get today datetime object
         parent_folder.date_modified = datetime.isoformat(today)  # insert the current datetime as a string
 
+        old_guid = node_object.guid
+        if self.search_index is not None:
+            self.search_index.remove(node_object)  # the old field values are not searchable
         node_object.update(**attr_dict)  # update a node instance
+        if self.search_index is not None:
+            self.search_index.add(node_object)  # index the new field values
+
+        if node_object.guid != old_guid:
+            # the guid was changed, update the guid index and the parent links of the children
+            del self.guid_dict[old_guid]
+            self.guid_dict[node_object.guid] = node_object
+            for child in getattr(node_object, 'children', ()):
+                child.parent_guid = node_object.guid
 
         if name != attr_dict['name']:
             # a node name should be changed, update the common node's dict
             del self.nodes_dict[name]  # delete old (name: obj) pair from the node's dict
             self.nodes_dict[attr_dict['name']] = node_object  # add updated node object to the node's dict
+            self.names.release(name)  # the old name may be allocated again
 
     def delete_node(self, name: str):
         """Delete a node from the current tree.
@@ -309,16 +587,49 @@ class RootBookmarks(Node):
         """
         node_object = self.check_node(name)  # get the node instance if the node exists or raise NodeNotExist
 
-        if 'children' in node_object.__dict__ and node_object.__dict__['children']:  # child list presents and non-empty
+        if getattr(node_object, 'children', None):  # child list presents and non-empty
             raise exceptions.FolderNotEmpty(name)  # can not delete a non-empty folder, raise FolderNotEmpty
 
         # find a list of children of the parent node and delete the reference to the deleted node
-        parent_guid = node_object.parent_guid  # get the parend guid of the node
-        for x in self.nodes_dict.values():  # search within the common dict of nodes
-            if x.guid == parent_guid:
-                children = x.children  # get the child list of the parent node
-                children.remove(node_object)  # delete the node's object from the parent's child list
+        parent_node = self.guid_dict[node_object.parent_guid]  # get the parent node from the guid index
+        parent_node.children.remove(node_object)  # delete the node's object from the parent's child list
         del self.nodes_dict[name]  # remove the node from global node dict
+        del self.guid_dict[node_object.guid]  # remove the node from the guid index
+        self.names.release(name)  # the name may be allocated again
+        if self.search_index is not None:
+            self.search_index.remove(node_object)  # remove the node from the search index
+
+    def move_node(self, name: str, parent_name: str) -> str:
+        """Move a node with its subtree to the end of the children list of another folder.
+        The modification dates of the old and the new parents are updated.
+
+        :raises NodeNotExists: if the node or the folder does not exist
+        :raises FolderNotExist: if the new parent is not a folder
+        :raises NodeNotMovable: if the node is the root, or the folder is the node or a node of its subtree
+
+        :param name: name of the moved node
+        :param parent_name: name of the new parent folder
+        :return: the modification date of the parents
+        """
+        node_object = self.check_node(name)  # get the node instance or raise NodeNotExist
+        parent_node = self.check_node(parent_name)
+        if isinstance(parent_node, Url):
+            raise exceptions.FolderNotExist(parent_name)
+        ancestor = parent_node
+        while ancestor is not self:  # the path from the new parent to the root must not cross the node
+            if ancestor is node_object:
+                raise exceptions.NodeNotMovable(name, parent_name)
+            ancestor = self.guid_dict[ancestor.parent_guid]
+        if node_object is self:
+            raise exceptions.NodeNotMovable(name, parent_name)
+
+        old_parent = self.guid_dict[node_object.parent_guid]  # get the parent node from the guid index
+        old_parent.children.remove(node_object)
+        parent_node.children.append(node_object)
+        node_object.parent_guid = parent_node.guid
+        today = datetime.isoformat(datetime.today().replace(microsecond=0))
+        old_parent.date_modified = parent_node.date_modified = today
+        return today
 
     def get_parent(self, node_name: str) -> Folder:
         """Get a parent node object of the current node
@@ -329,7 +640,16 @@ class RootBookmarks(Node):
         :return: parent node object
         """
         node_object = self.check_node(node_name)  # get the node instance if the node exists or raise NodeNotExist
-        parent_guid = node_object.parent_guid  # get the parend guid of the node
-        # create a set of folders whose GUID is equal to the parent GUID (actually only one item)
-        # and get the first (and unique) element of a such set
-        return next(iter({x for x in self.nodes_dict.values() if x.guid == parent_guid}))
+        return self.guid_dict[node_object.parent_guid]  # get the parent node from the guid index
+
+    def search(self, query: str, limit: int) -> list[str]:
+        """Search the nodes by their names, urls and keywords. Build the search index at the first call.
+
+        :param query: text of the query, the last word may be incomplete
+        :param limit: maximal number of the results
+        :return: list of the node names, the best matches first
+        """
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            self.search_index.add_all(node for node in self.nodes_dict.values() if node is not self)
+        return [node.name for node in self.search_index.search(query, limit)]
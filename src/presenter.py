@@ -5,20 +5,20 @@ Creates, opens and converts bookmark files of internet browsers to the internal
 Allows to add, delete, and modify bookmark nodes, which are folders and URLs.
 
 """
-import sys
-import traceback
+import os
 import typing as t
 
 import exceptions  # user exceptions
 from model_interface import Model
 from model_json import ModelJSON  # connection to the Model part of the pattern
+from model_async import ExecutorModel, BlockingModel  # the model runs in a worker thread
 
 from view_interface import View
 from view_cli import ViewCLI  # connection to the View part of the pattern
 
 from common import VERSION
 from common import VERSION
-from common import VALID_CHARS, URL_FIELDS, FOLDER_FIELDS  # constants
+from common import VALID_CHARS, URL_FIELDS, FOLDER_FIELDS, TREE_DEPTH  # constants
 from common import MenuItem, Field  # user types
 
 
@@ -35,22 +35,39 @@ class Presenter:
         self.START_MENU = (
             MenuItem("Create a new bookmark's tree", self.create_tree),
             MenuItem("Open the bookmark's tree", self.open_tree),
+            MenuItem("Convert a browser bookmark file to a new bookmark's tree", self.convert_tree),
             MenuItem("Exit", self.exit_of_loop),
         )  # start menu to open or create the current bookmark structure
 
         self.MAIN_MENU = (
             MenuItem("Create a new bookmark's tree", self.create_tree),
             MenuItem("Open the bookmark's tree", self.open_tree),
+            MenuItem("Convert a browser bookmark file to a new bookmark's tree", self.convert_tree),
             MenuItem("Add a new node to the current tree, folder of url", self.add_bookmark),
             MenuItem("Modify the node of the current tree, folder or url", self.modify_bookmark),
             MenuItem("Delete the node of the current tree, folder or url", self.delete_bookmark),
+            MenuItem("Search bookmarks", self.search_bookmarks),
             MenuItem("Print the current bookmark tree", self.print_tree),
+            MenuItem("Export the current tree to a browser bookmark file", self.export_tree),
             MenuItem("Exit", self.exit_of_loop),
         )  # main menu
 
+        self.CONVERT_MENU = (
+            MenuItem("Google Chrome bookmarks, JSON file", lambda filename: self.model.convert_chrome(filename)),
+            MenuItem("Mozilla Firefox bookmarks, places.sqlite or HTML file", lambda filename: self.model.convert_mozilla(filename)),
+        )  # formats of the browser bookmark files, call(filename) returns (True/False, error message)
+
+        self.EXPORT_MENU = (
+            MenuItem("Google Chrome bookmarks, JSON file", lambda filename: self.model.export_chrome(filename)),
+            MenuItem("Netscape bookmarks, HTML file for all browsers",
+                     lambda filename: self.model.export_netscape(filename)),
+        )  # formats of the exported files, call(filename) returns (True/False, error message)
+
         self.view = View(ViewCLI())  # instance of a View implementation, here for CLI terminal
         self.menu_items: tuple[MenuItem, ...] = self.START_MENU    # prepare for start main menu
-        self.model = Model(ModelJSON()) # instance of a Model implementation, here for internal/JSON version
+        self.executor_model = ExecutorModel(ModelJSON())  # the worker thread of the model
+        self.model = Model(BlockingModel(self.executor_model))  # instance of a Model implementation,
+        # here for internal/JSON version in a worker thread, the menus go on while the changes are saved
 
     # ---- begin of the execution methods section ----
     @staticmethod
@@ -110,6 +127,65 @@ class Presenter:
         self.view.output_string(f'Current database is <{name}> {chr(10)}')  # output the current db name
         return True
 
+    def convert_tree(self) -> bool:
+        """Convert a bookmark file of an internet browser to a new bookmark's tree.
+        Request the filename of the browser bookmarks and check if it exists.
+        Create a new bookmark's tree (see create_tree()), request the format of the file
+        and convert the file to the new tree.
+
+        :return: True for success otherwise False
+        """
+        self.view.output_header(self.view.main_header)  # print the header of the action
+        prompt = "Input the filename of the browser bookmarks"  # set a prompt for the filename request
+        filename = self.view.input_line(prompt)  # get the filename, any characters of the path
+        if filename is None or not filename:
+            return False  # break
+        if not os.path.isfile(filename):
+            except_message = f'File <{filename}> does not exist in the work directory {self.model.cwd}{chr(10)}'
+            self.view.output_string(except_message)  # output an error
+            return False  # to the main menu
+
+        if not self.create_tree():  # the new tree to convert into
+            return False  # to the main menu
+
+        selected_no = self.view.select_line(tuple(item.descr for item in self.CONVERT_MENU))  # get the format
+        if selected_no is None:
+            return True  # break, the new tree is empty
+        result, message = self.CONVERT_MENU[selected_no].call(filename)  # convert the file
+        if result:
+            self.view.output_string(f'File <{filename}> has been converted {chr(10)}')  # output a success message
+        else:
+            self.view.output_string(f'{message} {chr(10)}')  # output an error message
+        return result
+
+    def export_tree(self) -> bool:
+        """Export the current bookmark tree to a bookmark file of internet browsers.
+        Request the filename, if the file already exists, request to overwrite this file.
+        Request the format of the file and export the tree.
+
+        :return: True for success otherwise False
+        """
+        self.view.output_header(self.view.main_header)  # print the header of the action
+        prompt = "Input the filename of the exported bookmarks"  # set a prompt for the filename request
+        filename = self.view.input_line(prompt)  # get the filename, any characters of the path
+        if filename is None or not filename:
+            return False  # break
+        if os.path.isfile(filename):
+            prompt = f'Do you want to overwrite file <{filename}>? (Yes/No)'  # ask Y/N
+            if not self.view.input_yes_or_no(prompt):  # if not
+                self.view.output_string(f'Keep an existing file <{filename}> {chr(10)}')
+                return False  # to the main menu
+
+        selected_no = self.view.select_line(tuple(item.descr for item in self.EXPORT_MENU))  # get the format
+        if selected_no is None:
+            return False  # break
+        result, message = self.EXPORT_MENU[selected_no].call(filename)  # export the tree
+        if result:
+            self.view.output_string(f'The tree has been exported to <{filename}> {chr(10)}')  # output a success
+        else:
+            self.view.output_string(f'{message} {chr(10)}')  # output an error message
+        return result
+
     def add_bookmark(self) -> bool:
         """Add a new node to the current tree, folder of url.
         Request a name for a new bookmark (alphabetic and numeric characters, additional
@@ -193,6 +269,8 @@ class Presenter:
         Select a node, then select a field of node to modify.
         Return when the field was modified or selection was broken by user.
         Editable fields for url are contained in URL_FIELDS, for folders - in FOLDER_FIELDS.
+        Every step of the selection gets the node and the names and types of its children by one call
+        of Model.get_subtree(), the editable fields of the selected node only are got by Model.get_node().
 
         :return: True for success otherwise False
         """
@@ -203,51 +281,48 @@ class Presenter:
         while True:
             # node selection loop
             try:
-                result, item_list = self.model.get_children(node_name)  # get children names of the node
-                if not result:  # False
-                    # an url has been selected
-                    try:
-                        attr_dict = self.model.get_node(node_name)  # get all attributes of the node if it exists
-                    except exceptions.NodeNotExists as e:
-                        traceback.print_exception(e, file=sys.stdout)  # traceback output
-                        sys.exit(1)  # stop execution with an error
-                    # ok, continue
-                    filtered_attrs = {key: attr_dict[key] for key in URL_FIELDS}  # a dict of editable fields
-
-                    # edit the filtered attributes of the selected node
-                    # select a field to edit
-                    copy_filtered_attrs = filtered_attrs.copy()  # keep mutable arg for pytest
-                    result, selected_field = self.view.select_field(copy_filtered_attrs, node_name)  # field request
-
-                    match result, selected_field:  # parsing results of selection
-                        case [None, _]:
-                            return False # break, return to main menu
-                        case [False, _]:  # return to the node selection
-                            node_name = node_stack.pop()  # get the previous node name from the node's stack
-                            result, item_list = self.model.get_children(node_name)  # get children names
-
-                        case [True, _]:  # node has been selected
-                            editing_field = Field(selected_field, filtered_attrs[selected_field])  # tuple(name, value)
-                            new_field = self.view.edit_field(editing_field)  # edit the selected field of the node
-                            if new_field is None:
-                                return False  # break, return to main menu
-                            filtered_attrs[selected_field] = new_field  # update attrs of node
-                            self.model.update_node(node_name, filtered_attrs)  # update the node in the tree
-                            message = f'Folder/Url <{node_name}> has been modified {chr(10)}'
-                            self.view.output_string(message)  # output a success message
-                            return True
-
-                        case _:
-                            message = f'Selection Error. Unexpected result <{result},' \
-                                      f' {selected_field}> has been encountered {chr(10)}'
-                            self.view.output_string(message)  # output a error message
-                            return False
-
+                # the node with the names and types of its children, no fields, a lazy model decodes no child
+                subtree = self.model.get_subtree(node_name, max_depth=1)
             except exceptions.NodeNotExists as e:
                 self.view.output_string(str(e))  # named folder doesn't exist, output an error message
                 return False
 
+            if not subtree.folders[0]:
+                # an url has been selected
+                attr_dict = self.model.get_node(node_name, URL_FIELDS)  # the editable attributes of the node
+                filtered_attrs = {key: attr_dict[key] for key in URL_FIELDS}  # a dict of editable fields
+
+                # edit the filtered attributes of the selected node
+                # select a field to edit
+                copy_filtered_attrs = filtered_attrs.copy()  # keep mutable arg for pytest
+                result, selected_field = self.view.select_field(copy_filtered_attrs, node_name)  # field request
+
+                match result, selected_field:  # parsing results of selection
+                    case [None, _]:
+                        return False # break, return to main menu
+                    case [False, _]:  # return to the node selection
+                        node_name = node_stack.pop()  # get the previous node name from the node's stack
+                        continue  # to the parent folder
+
+                    case [True, _]:  # node has been selected
+                        editing_field = Field(selected_field, filtered_attrs[selected_field])  # tuple(name, value)
+                        new_field = self.view.edit_field(editing_field)  # edit the selected field of the node
+                        if new_field is None:
+                            return False  # break, return to main menu
+                        filtered_attrs[selected_field] = new_field  # update attrs of node
+                        self.model.update_node(node_name, filtered_attrs)  # update the node in the tree
+                        message = f'Folder/Url <{node_name}> has been modified {chr(10)}'
+                        self.view.output_string(message)  # output a success message
+                        return True
+
+                    case _:
+                        message = f'Selection Error. Unexpected result <{result},' \
+                                  f' {selected_field}> has been encountered {chr(10)}'
+                        self.view.output_string(message)  # output a error message
+                        return False
+
             # a folder was selected
+            item_list = tuple(subtree.names[i] for i in subtree.children())  # children names of the folder
             comm_list = ('Return to the previous selection',
                          'Modify current node')  # the commands for selection list
             header1 = self.view.main_header  # get the current main header
@@ -263,12 +338,7 @@ class Presenter:
                     if node_stack:
                         node_name = node_stack.pop()  # get the parent folder name from the node's stack
                 case [False, 1]:  # modify this folder
-                    try:
-                        attr_dict = self.model.get_node(node_name)  # get all attributes of the node if it exists
-                    except exceptions.NodeNotExists as e:
-                        traceback.print_exception(e, file=sys.stdout)  # traceback output
-                        sys.exit(1)  # stop execution with an error
-                    # ok, continue
+                    attr_dict = self.model.get_node(node_name, FOLDER_FIELDS)  # the editable attributes of the folder
                     filtered_attrs = {key: attr_dict[key] for key in FOLDER_FIELDS}  # a dict with only required fields
                     copy_filtered_attrs = filtered_attrs.copy()  # keep mutable arg for pytest
                     # select a folder field
@@ -278,7 +348,6 @@ class Presenter:
                             return False  # break, return to main menu
                         case [False, _]:  # return to the node selection
                             node_name = node_stack.pop()  # get the previous node name from the node's stack
-                            result, item_list = self.model.get_children(node_name)  # get children names
                         case [True, _]:  # node has been selected
                             if filtered_attrs[selected_field] != 'roots':
                                 editing_field = Field(selected_field,
@@ -333,30 +402,39 @@ class Presenter:
             self.view.output_string(message)  # output a success message
             return True
 
-    def print_tree(self) -> bool:
+    def search_bookmarks(self) -> bool:
+        """Search bookmarks of the current tree by their names, urls and keywords.
+        Request the words to search, the last word may be incomplete.
+        Output the names of the found bookmarks, the best matches first.
+
+        :return: True if something was found otherwise False
+        """
+        self.view.output_header(self.view.main_header)  # print the header
+
+        # ---- query request ----
+        prompt = "Input words to search"  # set a prompt for the query request
+        query = self.view.input_line(prompt)  # get the query, any characters
+        if query is None or not query:
+            return False  # break
+
+        found = self.model.search(query)  # names of the found nodes
+        if not found:
+            self.view.output_string(f'Nothing has been found for <{query}> {chr(10)}')
+            return False
+        self.view.output_list(found)  # output the found names
+        return True
+
+    def print_tree(self, max_depth: int | None = TREE_DEPTH) -> bool:
         """Print the names of all the bookmark nodes of the current tree.
-        Use recursive inner function _output_loop().
+        The folders of the max_depth level are collapsed, the depth is the TREE_DEPTH setting by default.
+        The nodes are fetched by one call of Model.get_subtree() and given to the View.
 
+        :param max_depth: the deepest printed level, None for the whole tree
         :return: True for success otherwise False
         """
-        def _output_loop(node_name, tab):
-            result, child_names = self.model.get_children(node_name)  # get children names of the <node_name>
-            if result:  # node has children, this is a folder
-                self.view.output_header(f'Folder <{node_name}> BEGIN', tab)  # BEGIN of the folder <node_name>
-                tab += 8  # increment of tab shift
-                for child in child_names:
-                    _output_loop(child, tab)  # it is a nested folder, call it recursively
-                self.view.output_header(f'Folder <{node_name}> END', tab - 8)  # END of the folder <node_name>
-            else:
-                # print a url name
-                self.view.output_list((node_name, ), tab)  # output url name with current tabulation
-
-        # ---- body of print_tree()
         self.view.output_header(self.view.main_header)  # print the header
-        init_node = 'roots' # start folder
-        init_tab = 0  # start indent
-        _output_loop(init_node, init_tab)  # load initial node name and tabulation for recursion
-        return True
+        subtree = self.model.get_subtree(max_depth=max_depth)  # names and types of the nodes
+        return self.view.output_tree(subtree.items(), max_depth)
 
     # ---- end of the execution methods section ----
 
@@ -370,19 +448,44 @@ class Presenter:
             return menu_items[selected_no]  # return the selected menu item
 
     def execute_request(self, menu_item: MenuItem):
-        """Call the instance method from the current menu"""
+        """Call the instance method from the current menu.
+        An error of the background save of the previous changes is output, the current change is not made.
+        """
         self.view.main_header = menu_item.descr  # set description of a routine to the global var
-        result = menu_item.call()  # call a routine, return True if successful otherwise False
+        try:
+            result = menu_item.call()  # call a routine, return True if successful otherwise False
+        except exceptions.SaveFailed as e:
+            self.view.output_string(str(e))  # output an error message, the changes are saved again later
+
+    def close(self):
+        """Save the unsaved changes and stop the worker thread of the model.
+        An error of the final save is output as the errors of the background saves are.
+
+        :return: nothing
+        """
+        try:
+            self.model.close()  # flush the unsaved changes
+        except exceptions.SaveFailed as e:
+            self.view.output_string(str(e))  # a failed background save, the final one failed too
+        except OSError as e:
+            self.view.output_string(str(exceptions.SaveFailed(e)))  # output an error message, not a traceback
+        finally:
+            self.executor_model.shutdown()  # stop the worker after the final save
 
 
-def main():
+def main(tree_name: str = ''):
     """Main routine of the bookmark manager.
     Create an instance of the class Presenter.
     An infinite loop of the main menu until the EOF and RETURN or <Exit> commands are executed.
 
+    :param tree_name: name of the bookmark's tree to open before the main menu, default to empty
     :return: no
     """
     request_handler = Presenter()
+    if tree_name:
+        request_handler.model.open_database(tree_name)  # or FileNotFoundError
+        request_handler.menu_items = request_handler.MAIN_MENU  # the tree is opened, set the full main menu
+        request_handler.view.output_string(f'Current database is <{tree_name}> {chr(10)}')
     # --------------------------------------------------
     while True:
         request_handler.view.output_header(f'Bookmark Manager ver.{VERSION}, main menu')
@@ -391,6 +494,7 @@ def main():
             break
         request_handler.execute_request(menu_item)
     # end of the main loop
+    request_handler.close()  # flush the unsaved changes and stop the worker
     print('Thank you and goodbye!')
 
 if __name__ == '__main__':
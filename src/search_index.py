@@ -0,0 +1,154 @@
+"""An inverted full-text index of the bookmark tree for the search.
+Names, urls and keywords of the nodes are split into lowercase word tokens,
+every token keeps the nodes it occurs in with the weight of the fields: a token in the name
+weighs more than in the keywords and in the url.
+A query matches the nodes containing all its tokens, the last token of the query matches as a prefix
+(the user types it now) of at most MAX_EXPANSIONS tokens in the alphabetical order, the shortest ones first.
+The nodes are ranked by the sum of the weights, the equal ones keep the order of the indexing.
+Every token keeps the upper bound of its weights, so the scan of a long posting stops as soon as
+the limit is reached with the best possible score.
+
+"""
+import re
+import bisect
+
+TOKEN = re.compile(r'\w+')  #: a word token of the text
+FIELD_WEIGHTS = (('name', 3), ('keywords', 2), ('url', 1))  #: indexed fields and their weights
+MAX_EXPANSIONS = 64  #: maximal number of tokens matched by the prefix of the last query token
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into lowercase word tokens.
+
+    :param text: a text to split
+    :return: list of tokens in the text order
+    """
+    return TOKEN.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index {token: {node: weight}} of the nodes.
+    Nodes are the keys of the postings, so a renamed node keeps its place in the index till it is updated.
+
+    """
+    def __init__(self):
+        """Constructor method.
+        """
+        self.postings: dict = {}  # {token: {node: weight}}
+        self.node_tokens: dict = {}  # {node: tuple of its tokens}, to remove the node from the postings
+        self.vocabulary: list[str] = []  # sorted tokens for the prefix search
+        self.max_weight: dict = {}  # {token: upper bound of the weights in its posting}
+
+    def _index(self, node) -> list[str]:
+        """Add the tokens of a node to the postings.
+
+        :param node: Folder or Url object
+        :return: list of the new tokens, which are not in the vocabulary yet
+        """
+        weights: dict[str, int] = {}  # {token: weight} of the node
+        for field, weight in FIELD_WEIGHTS:
+            for token in set(tokenize(getattr(node, field, ''))):
+                weights[token] = weights.get(token, 0) + weight
+        new_tokens = []
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                self.max_weight[token] = weight
+                new_tokens.append(token)
+            elif weight > self.max_weight[token]:
+                self.max_weight[token] = weight
+            posting[node] = weight
+        self.node_tokens[node] = tuple(weights)
+        return new_tokens
+
+    def add(self, node):
+        """Add a node to the index.
+
+        :param node: Folder or Url object
+        :return: nothing
+        """
+        for token in self._index(node):
+            bisect.insort(self.vocabulary, token)
+
+    def add_all(self, nodes):
+        """Add many nodes to the index, the vocabulary is sorted once.
+
+        :param nodes: iterable of Folder or Url objects
+        :return: nothing
+        """
+        for node in nodes:
+            self._index(node)
+        self.vocabulary = sorted(self.postings)
+
+    def remove(self, node):
+        """Remove a node from the index, if it is indexed.
+
+        :param node: Folder or Url object
+        :return: nothing
+        """
+        for token in self.node_tokens.pop(node, ()):
+            posting = self.postings[token]
+            del posting[node]
+            if not posting:
+                del self.postings[token]  # the token is not used anymore
+                del self.max_weight[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def _prefix_matches(self, prefix: str) -> tuple[dict, int]:
+        """Get the nodes having one of the first MAX_EXPANSIONS tokens with the prefix,
+        a node weighs as its best token.
+
+        :param prefix: the beginning of the tokens
+        :return: dictionary {node: weight}, upper bound of the weights
+        """
+        i = bisect.bisect_left(self.vocabulary, prefix)
+        tokens = []
+        for token in self.vocabulary[i:i + MAX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        if len(tokens) == 1:
+            return self.postings[tokens[0]], self.max_weight[tokens[0]]  # no copy of a long posting
+        matches: dict = {}
+        for token in tokens:
+            for node, weight in self.postings[token].items():
+                if weight > matches.get(node, 0):
+                    matches[node] = weight
+        return matches, max((self.max_weight[token] for token in tokens), default=0)
+
+    def search(self, query: str, limit: int) -> list:
+        """Search the nodes matching all tokens of the query, the last token is a prefix.
+
+        :param query: text of the query
+        :param limit: maximal number of the results
+        :return: list of the nodes, the best ones first
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        matches, best_score = self._prefix_matches(tokens[-1])
+        postings = [matches]
+        for token in tokens[:-1]:
+            postings.append(self.postings.get(token, {}))
+            best_score += self.max_weight.get(token, 0)
+        postings.sort(key=len)  # scan the shortest posting, look up the others
+        shortest, others = postings[0], postings[1:]
+        found = []  # nodes with the best possible score
+        scored: dict[int, list] = {}  # {score: nodes} of the other matching nodes
+        for node, score in shortest.items():
+            for posting in others:
+                weight = posting.get(node)
+                if weight is None:
+                    break  # the node does not match all the tokens
+                score += weight
+            else:
+                if score == best_score:
+                    found.append(node)
+                    if len(found) == limit:
+                        return found  # nothing can be better
+                else:
+                    scored.setdefault(score, []).append(node)
+        for score in sorted(scored, reverse=True):
+            found.extend(scored[score])
+        return found[:limit]
@@ -0,0 +1,280 @@
+"""Bookmark server: one ModelJSON tree is kept in the memory behind a Unix domain socket,
+so the scripts do not load the whole database for every change.
+The protocol is JSON-RPC 2.0, one request or response per line:
+
+    --> {"jsonrpc": "2.0", "id": 1, "method": "get_node", "params": ["Python"]}
+    <-- {"jsonrpc": "2.0", "id": 1, "result": {"name": "Python", ...}}
+    <-- {"jsonrpc": "2.0", "id": 1, "error": {"code": 1, "message": "...", "data": {"type": "NodeNotExists"}}}
+
+Methods are the methods of ModelProto, params are a list of the positional arguments or an object
+of the named ones, iter_tree returns a list of the records. The server methods are "cwd" (the work directory
+of the server, relative filenames are resolved in it), "flush" (write the changes now) and "shutdown".
+The reading methods are served at once, the writing ones are serialized by a lock. The changes are flushed
+to the disk SERVER_FLUSH_MS after the first unsaved one, the save runs in a thread and holds the lock,
+so the reading goes on while the tree is saved and the writing waits for the save.
+The long methods (the opening, the imports and the exports) run in a thread holding the lock too,
+the other clients are served meanwhile, the reading waits only for the methods changing the tree.
+serve() opens the database in the journal mode, so a flush appends the changes only.
+Run a server for a database, the socket is a sidecar of the database by default:
+
+    python server.py DATABASE [SOCKET]
+    python bm.py serve DATABASE [--socket SOCKET]
+
+"""
+import os
+import sys
+import json
+import signal
+import asyncio
+import inspect
+import functools
+
+import exceptions
+from model_json import ModelJSON
+from common import SOCKET_SUFFIX, SERVER_FLUSH_MS
+
+READ_METHODS = ('get_children', 'iter_tree', 'get_subtree', 'get_node', 'search',
+                'export_netscape', 'export_chrome')  #: methods which do not change the tree
+WRITE_METHODS = ('add_node', 'add_nodes', 'update_node', 'delete_node', 'move_node', 'create_database',
+                 'open_database', 'delete_database', 'convert_chrome', 'convert_mozilla')  #: methods changing the tree
+THREAD_METHODS = ('open_database', 'create_database', 'convert_chrome', 'convert_mozilla',
+                  'export_netscape', 'export_chrome')  #: long methods which run in a thread, not on the event loop
+MODEL_ERRORS = (exceptions.MyProjectError, OSError, ValueError, KeyError)  #: exceptions returned to the client
+
+PARSE_ERROR = -32700  #: JSON-RPC error codes
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+MODEL_ERROR = 1  #: an exception of the model, its type name is the error data
+LINE_LIMIT = 64 * 1024 * 1024  #: maximal size of a request line, a batch of nodes may be big
+
+
+def _error(req_id, code: int, message: str, data: dict | None = None) -> dict:
+    """Make an error response.
+
+    :param req_id: id of the request, None if it is unknown
+    :param code: JSON-RPC error code
+    :param message: error message
+    :param data: additional data of the error
+    :return: the response object
+    """
+    error = {'code': code, 'message': message}
+    if data is not None:
+        error['data'] = data
+    return {'jsonrpc': '2.0', 'id': req_id, 'error': error}
+
+
+class BookmarkServer:
+    """Server of a bookmark tree.
+
+    """
+    def __init__(self, model: ModelJSON, path: str, flush_ms: int = SERVER_FLUSH_MS):
+        """Constructor method.
+
+        :param model: the model with an opened tree, its flush policy is replaced by the server one
+        :param path: filename of the Unix socket
+        :param flush_ms: delay of the flush after the first unsaved change in milliseconds
+        """
+        self.model = model
+        self.model.flush_ops = self.model.flush_ms = 0  # the server flushes the changes
+        self.path = path
+        self.flush_ms = flush_ms
+        self.write_lock = asyncio.Lock()  # serializes the writing and the saving
+        self.readable = asyncio.Event()  # cleared while a thread changes the tree, the reading waits for it
+        self.readable.set()
+        self._flush_timer: asyncio.TimerHandle | None = None  # the scheduled flush
+        self._flush_task: asyncio.Task | None = None  # the running flush
+        self._server: asyncio.AbstractServer | None = None
+        self.stopped = asyncio.Event()  #: set it to stop serve_forever()
+        self._signatures: dict = {}  # {method: signature} to check the params
+        self.server_methods = {'cwd': self._cwd, 'flush': self.flush, 'close': self.flush,
+                               'shutdown': self._shutdown}  #: methods of the server, coroutine functions
+
+    async def start(self):
+        """Listen to the socket, a stale socket file of a stopped server is replaced.
+
+        :return: nothing
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_client, path=self.path, limit=LINE_LIMIT)
+        os.chmod(self.path, 0o600)  # the tree is private
+
+    async def serve_forever(self):
+        """Serve the clients until the shutdown request or stop().
+
+        :return: nothing
+        """
+        await self.start()
+        await self.stopped.wait()
+        await self.stop()
+
+    async def stop(self):
+        """Stop listening, flush the changes and remove the socket file.
+
+        :return: nothing
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.flush()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    # ---- flush section ----
+    def _schedule_flush(self):
+        """Schedule the flush of the changes, the changes of the next flush_ms milliseconds share it.
+
+        :return: nothing
+        """
+        if self.model.dirty and self._flush_timer is None:
+            loop = asyncio.get_running_loop()
+            self._flush_timer = loop.call_later(self.flush_ms / 1000, self._start_flush)
+
+    def _start_flush(self):
+        """Start the scheduled flush.
+
+        :return: nothing
+        """
+        self._flush_timer = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        """Write the changes to the disk in a thread, the writing waits for the end of the save.
+
+        :return: nothing
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        async with self.write_lock:
+            if self.model.dirty:
+                await asyncio.get_running_loop().run_in_executor(None, self.model.flush)
+
+    async def _run_in_thread(self, changes: bool, call, *args, **kwargs):
+        """Run a long model call in a thread holding the write lock, so the event loop serves the other clients.
+
+        :param changes: True if the call changes the tree, the reading waits for its end
+        :param call: the method of the model
+        :param args: positional arguments of the call
+        :param kwargs: named arguments of the call
+        :return: the result of the call
+        """
+        async with self.write_lock:
+            if changes:
+                self.readable.clear()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, functools.partial(call, *args, **kwargs))
+            finally:
+                self.readable.set()
+
+    # ---- requests section ----
+    async def _cwd(self) -> str:
+        """Get the work directory of the server."""
+        return self.model.cwd
+
+    async def _shutdown(self):
+        """Stop the server after the response."""
+        self.stopped.set()
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve the requests of a client, one request per line, the responses are in the same order.
+
+        :param reader: stream of the requests
+        :param writer: stream of the responses
+        :return: nothing
+        """
+        try:
+            while line := await reader.readline():
+                response = await self.handle(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # the client has gone or sent a line over the limit
+        except asyncio.CancelledError:
+            pass  # the server has stopped with the client connected, the stream callback would log it
+        finally:
+            writer.close()
+
+    async def handle(self, line: bytes) -> dict:
+        """Run a request line.
+
+        :param line: JSON-RPC request
+        :return: JSON-RPC response
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, f'Parse error: {e}')
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _error(None, INVALID_REQUEST, 'Invalid request')
+        req_id, method, params = request.get('id'), request['method'], request.get('params', [])
+
+        if method in self.server_methods:
+            call = self.server_methods[method]
+        elif method in READ_METHODS or method in WRITE_METHODS:
+            call = getattr(self.model, method)
+        else:
+            return _error(req_id, METHOD_NOT_FOUND, f'Method not found: {method}')
+        args, kwargs = (params, {}) if isinstance(params, list) else ((), params)
+        if method not in self._signatures:
+            self._signatures[method] = inspect.signature(call)
+        try:
+            self._signatures[method].bind(*args, **kwargs)
+        except TypeError as e:
+            return _error(req_id, INVALID_PARAMS, f'Invalid params: {e}')
+
+        try:
+            if method in self.server_methods:
+                result = await call(*args, **kwargs)
+            elif method in THREAD_METHODS:
+                result = await self._run_in_thread(method in WRITE_METHODS, call, *args, **kwargs)
+                self._schedule_flush()
+            elif method in WRITE_METHODS:
+                async with self.write_lock:  # not while the tree is saved
+                    result = call(*args, **kwargs)
+                self._schedule_flush()
+            else:
+                await self.readable.wait()  # not while a thread changes the tree
+                result = call(*args, **kwargs)
+                if method == 'iter_tree':
+                    result = list(result)
+        except MODEL_ERRORS as e:
+            return _error(req_id, MODEL_ERROR, str(e).strip(), {'type': type(e).__name__})
+        except Exception as e:  # e.g. a param of a wrong type, the server goes on
+            return _error(req_id, INTERNAL_ERROR, f'Internal error: {type(e).__name__}: {e}')
+        return {'jsonrpc': '2.0', 'id': req_id, 'result': result}
+
+
+async def serve(database: str, path: str = '', **kwargs):
+    """Open the database and serve it until the shutdown request, SIGINT or SIGTERM.
+
+    :param database: filename of the JSON database
+    :param path: filename of the Unix socket, the database filename with SOCKET_SUFFIX by default
+    :param kwargs: params of ModelJSON, the journal mode by default, so a flush does not rewrite the whole tree
+    :return: nothing
+    """
+    model = ModelJSON(**{'journal': True} | kwargs)
+    model.open_database(database)  # or FileNotFoundError
+    server = BookmarkServer(model, path or database + SOCKET_SUFFIX)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, server.stopped.set)
+    await server.serve_forever()
+
+
+def main():
+    """Run the server of the database, see the module description.
+
+    :return: nothing
+    """
+    if len(sys.argv) not in (2, 3):
+        print(f'Usage: python {sys.argv[0]} DATABASE [SOCKET]', file=sys.stderr)
+        sys.exit(2)
+    asyncio.run(serve(*sys.argv[1:]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Tests of the batch mode, module batch.py"""
+
+import io
+import os
+import sys
+import json
+
+from batch import Batch, parse_line
+from model_json import ModelJSON
+from model_json import tree_to_image
+
+
+class TestBatch:
+    """Testing class for the batch commands"""
+
+    filename = 'batch_db.json'
+
+    def _create_test_model(self) -> ModelJSON:
+        """Create an empty database."""
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(self.filename)
+        return jm
+
+    def test_parse_line(self):
+        assert parse_line('add Docs roots') == ('add', {'name': 'Docs', 'parent': 'roots'})
+        assert parse_line('add "My docs" roots https://a.com/ "" "a b"') == \
+               ('add', {'name': 'My docs', 'parent': 'roots', 'url': 'https://a.com/', 'icon': '', 'keywords': 'a b'})
+        assert parse_line('modify Docs name=Papers "keywords=a b"') == \
+               ('modify', {'name': 'Docs', 'fields': {'name': 'Papers', 'keywords': 'a b'}})
+        assert parse_line('modify Docs url=') == ('modify', {'name': 'Docs', 'fields': {'url': ''}})  # a blank url
+        assert parse_line('{"cmd": "move", "name": "Docs", "parent": "Folder"}') == \
+               ('move', {'name': 'Docs', 'parent': 'Folder'})
+        assert parse_line('print') == ('print', {})
+        for line in ('frobnicate', 'add Docs', 'delete a b', '{"cmd": "delete"}', '{"cmd": "print", "x": 1}',
+                     '["print"]', '{"cmd": ', 'add "Docs roots', '{"cmd": "delete", "name": ["x"]}',
+                     '{"cmd": "add", "name": "Docs", "parent": "roots", "url": 1}',
+                     '{"cmd": "modify", "name": "Docs", "fields": {"url": null}}', '{"cmd": "print", "depth": [1]}',
+                     'modify Docs url', 'modify Docs name=Papers keywords'):
+            try:
+                parse_line(line)
+            except ValueError as e:
+                print('\nException ValueError raised successfully:', e, file=sys.stderr)
+            else:
+                assert False, f'ValueError is expected for <{line}>'
+
+    def test_run(self):
+        jm = self._create_test_model()
+        html_name = 'batch_export.html'
+        lines = ['# a comment', '',
+                 'add Docs roots',
+                 'add Python Docs https://docs.python.org/ "" lang',
+                 '{"cmd": "add", "name": "Folder 2", "parent": "roots"}',
+                 'move Python "Folder 2"',
+                 'modify Python url=https://python.org name=Py',
+                 'modify Docs url=https://docs.com',
+                 'modify Py name=Docs',
+                 'move Docs Docs',
+                 'delete Nothing',
+                 'delete roots',
+                 'print 1',
+                 f'export netscape {html_name}',
+                 'import chrome not_exist.json']
+        saves = []
+        save_tree = jm._save_tree
+        jm._save_tree = lambda: saves.append(save_tree())  # count the saves
+        output = io.StringIO()
+        assert Batch(jm).run(lines, output) == (13, 6)
+        assert len(saves) == 1  # one save for the batch
+        del jm._save_tree
+
+        results = [json.loads(x) for x in output.getvalue().splitlines()]
+        assert [x['line'] for x in results] == list(range(3, 16))
+        assert [x['ok'] for x in results] == [True] * 5 + [False] * 5 + [True, True, False]
+        assert results[10]['result'] == [[0, 'roots', True], [1, 'Docs', True], [1, 'Folder 2', True]]
+        assert results[9]['error'] == 'Folder <roots> can not be deleted'
+        assert jm.get_node('Py')['url'] == 'https://python.org'
+        assert jm.get_node('Py')['keywords'] == 'lang'
+        assert jm.get_children('Folder 2') == (True, ('Py', ))
+        assert os.path.isfile(html_name)
+        os.remove(html_name)
+
+        # the batch was saved
+        jm_new = ModelJSON()
+        jm_new.open_database(self.filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm.root)
+        jm.delete_database(self.filename)
+
+    def test_import_and_wrong_fields(self):
+        """An import is saved with the batch at its end, wrong fields are an error of the command only."""
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)  # remove the filename if it exists
+        jm = ModelJSON(journal=True)
+        jm.create_database(self.filename)
+        chrome_name = 'batch_import.json'
+        lines = ['add Docs roots',
+                 f'export chrome {chrome_name}',
+                 f'import chrome {chrome_name}',
+                 '{"cmd": "modify", "name": "Docs", "fields": []}',
+                 '{"cmd": "modify", "name": "Docs", "fields": "name"}',
+                 'add After roots']
+        saves = []
+        save_tree = jm._save_tree
+        jm._save_tree = lambda: saves.append(save_tree())  # count the saves
+        output = io.StringIO()
+        assert Batch(jm).run(lines, output) == (6, 2)
+        assert len(saves) == 1  # the import is saved with the batch at its end
+        del jm._save_tree
+        results = [json.loads(x) for x in output.getvalue().splitlines()]
+        assert [x['ok'] for x in results] == [True, True, True, False, False, True]
+        assert results[3]['error'].startswith("Wrong types of the arguments ['fields']")
+        try:
+            Batch(jm).modify('Docs', [])  # the fields are checked by the command too
+        except ValueError as e:
+            assert str(e) == "Fields of the node <Docs> must be an object, not []"
+        else:
+            assert False, 'ValueError is expected'
+        assert not os.path.isfile(jm.journal_name)  # the journal is folded into the saved tree
+        os.remove(chrome_name)
+
+        jm_new = ModelJSON()
+        jm_new.open_database(self.filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm.root)
+        assert jm_new.get_children('roots')[1][-1] == 'After'
+        jm.delete_database(self.filename)
@@ -0,0 +1,67 @@
+"""Tests of the command-line interface, module bm.py"""
+
+import os
+import sys
+import subprocess
+
+import bm
+from model_json import ModelJSON
+from model_lazy import ModelLazyJSON
+
+
+class TestBM:
+    """Testing class for the subcommands"""
+
+    filename = 'bm_db.json'
+
+    def _create_test_database(self):
+        """Create a database with a folder and an url in it."""
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(self.filename)
+        jm.add_nodes([{'name': 'folder', 'parent_name': 'roots'},
+                      {'name': 'URL', 'parent_name': 'folder', 'url': 'www.url.com', 'keywords': 'python docs'}])
+
+    def test_subcommands(self, capsys):
+        self._create_test_database()
+        assert bm.main(['add', self.filename, 'Docs', 'folder', '--url', 'docs.com', '--keywords', 'python']) == 0
+        assert bm.main(['add', self.filename, 'Docs', 'roots']) == 1  # the name exists
+        assert bm.main(['add', self.filename, 'New', 'URL']) == 1  # the parent is not a folder
+        assert bm.main(['search', self.filename, 'pyth']) == 0
+        assert bm.main(['search', self.filename, 'nothing']) == 1
+        assert bm.main(['delete', self.filename, 'folder']) == 1  # not empty
+        assert bm.main(['delete', self.filename, 'URL']) == 0
+        captured = capsys.readouterr()
+        lines = captured.out.splitlines()
+        assert lines[0] == 'Folder/Url <Docs> has been added'
+        assert sorted(lines[1:3]) == ['Docs', 'URL']  # found names
+        assert lines[3:] == ['Bookmark URL has been deleted']
+        assert captured.err.splitlines() == ['Node <Docs> already exists', 'Node <URL> is not a folder',
+                                             'Folder <folder> is not empty and can not be deleted']
+
+        assert bm.main(['print', self.filename, '--depth', '1']) == 0
+        assert capsys.readouterr().out.splitlines() == ['-------- Folder <roots> BEGIN --------',
+                                                        '        -------- Folder <folder> COLLAPSED --------',
+                                                        '-------- Folder <roots> END --------']
+        html_name = 'bm_export.html'
+        assert bm.main(['export', self.filename, 'netscape', html_name]) == 0
+        assert os.path.isfile(html_name)
+        os.remove(html_name)
+        try:
+            bm.main(['print', 'not_exist.json'])
+        except SystemExit as e:
+            assert e.code == 'File <not_exist.json> does not exist'
+        else:
+            assert False, 'SystemExit is expected'
+        ModelLazyJSON().delete_database(self.filename)  # the database and the index of the lazy opening
+
+    def test_lazy_imports(self):
+        """The read-only subcommands do not import the menus and the converters."""
+        self._create_test_database()
+        code = ('import sys, bm; bm.main(["print", sys.argv[1]]); '
+                'print(sorted({"presenter", "converters", "view_interface"} & set(sys.modules)))')
+        result = subprocess.run([sys.executable, '-c', code, self.filename], capture_output=True, text=True,
+                                cwd=os.path.dirname(bm.__file__) or '.', env=os.environ | {'PYTHONPATH': ''})
+        ModelLazyJSON().delete_database(self.filename)  # the database and the index of the lazy opening
+        assert result.stdout.splitlines()[-1] == '[]'
@@ -0,0 +1,236 @@
+"""Tests of the readers of the browser bookmark files."""
+
+import os
+import json
+import sqlite3
+import hashlib
+from datetime import datetime
+
+from converters import chrome_date
+from converters import read_chrome
+from converters import read_netscape
+from converters import read_places
+from converters import read_mozilla
+from converters import write_netscape
+from converters import write_chrome
+from my_nodes import Folder
+from my_nodes import Url
+
+CHROME_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'Bookmarks.json')  # Chrome sample
+PRTIME = 1453447782951728  # 2016-01-22T07:29:42 in microseconds
+
+
+def write_places(filename: str):
+    """Generate a small Firefox places.sqlite database: the tables of the bookmarks with their columns
+    used by the reader, the root folders, tags, a keyword, a separator and a folder read before its parent.
+
+    :param filename: places.sqlite filename
+    :return: nothing
+    """
+    if os.path.isfile(filename):
+        os.remove(filename)
+    conn = sqlite3.connect(filename)
+    conn.executescript("""
+        CREATE TABLE moz_places (id INTEGER PRIMARY KEY, url LONGVARCHAR, title LONGVARCHAR);
+        CREATE TABLE moz_bookmarks (id INTEGER PRIMARY KEY, type INTEGER, fk INTEGER DEFAULT NULL, parent INTEGER,
+                                    position INTEGER, title LONGVARCHAR, dateAdded INTEGER, lastModified INTEGER,
+                                    guid TEXT UNIQUE);
+        CREATE TABLE moz_keywords (id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT UNIQUE, place_id INTEGER);
+        """)
+    conn.executemany('INSERT INTO moz_places VALUES (?, ?, ?)',
+                     [(1, 'https://www.python.org/', 'Python'), (2, 'https://example.com/', None)])
+    folder, url, separator = 2, 1, 3
+    conn.executemany('INSERT INTO moz_bookmarks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+        (1, folder, None, 0, 0, '', PRTIME, PRTIME, 'root________'),
+        (2, folder, None, 1, 0, 'menu', PRTIME, PRTIME, 'menu________'),
+        (3, folder, None, 1, 1, 'toolbar', PRTIME, PRTIME, 'toolbar_____'),
+        (4, folder, None, 1, 2, 'tags', PRTIME, PRTIME, 'tags________'),
+        (5, folder, None, 1, 3, 'unfiled', PRTIME, PRTIME, 'unfiled_____'),
+        (6, folder, None, 1, 4, 'mobile', PRTIME, PRTIME, 'mobile______'),
+        (7, folder, None, 9, 0, 'Nested', PRTIME, 0, 'nested______'),  # its parent has a bigger id
+        (8, url, 2, 7, 0, 'Example', PRTIME, PRTIME, 'example_____'),
+        (9, folder, None, 3, 0, 'Docs', PRTIME, PRTIME, 'docs________'),
+        (10, url, 1, 3, 1, 'Python', PRTIME, PRTIME, 'python______'),
+        (11, folder, None, 4, 0, 'lang', PRTIME, PRTIME, 'tag_lang____'),
+        (12, folder, None, 4, 1, 'python', PRTIME, PRTIME, 'tag_python__'),
+        (13, url, 1, 11, 0, None, PRTIME, PRTIME, 'tagged_1____'),
+        (14, url, 1, 12, 0, None, PRTIME, PRTIME, 'tagged_2____'),
+        (15, separator, None, 2, 0, None, PRTIME, PRTIME, 'separator___'),
+        (16, url, 2, 2, 1, None, PRTIME, PRTIME, 'untitled____'),
+    ])
+    conn.execute("INSERT INTO moz_keywords (keyword, place_id) VALUES ('ex', 2)")
+    conn.commit()
+    conn.close()
+
+
+class TestConverters:
+    """Testing class for the converters module."""
+
+    def test_chrome_date(self):
+        assert chrome_date('13097921382951711') == '2016-01-22T07:29:42'
+        today = datetime.isoformat(datetime.today().replace(microsecond=0))[:10]
+        assert chrome_date('0')[:10] == today  # unknown date
+        assert chrome_date('')[:10] == today
+        assert chrome_date('not a number')[:10] == today
+
+    def test_read_chrome(self):
+        folders = read_chrome(CHROME_FILE)
+        assert [x.name for x in folders] == ['Панель закладок', 'Другие закладки', 'Моб. закладки']
+        nodes = []
+        stack = list(folders)
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(getattr(node, 'children', ()))
+        assert len(nodes) == 169
+        assert all(isinstance(x, Folder | Url) for x in nodes)  # all entries are converted
+        assert all(x.parent_guid == '' for x in nodes)  # the nodes are not in a tree yet
+        url = folders[0].children[0]
+        assert (url.url, url.id_no, url.icon, url.keywords) == ('http://www.electro-mpo.ru/', '185', '', '')
+
+    def test_read_chrome_errors(self):
+        filename = 'not_chrome.json'
+        with open(filename, 'w') as f:
+            json.dump({'children': []}, f)
+        try:
+            read_chrome(filename)
+        except ValueError as e:
+            assert 'no roots' in str(e)
+        else:
+            assert False, 'ValueError is expected'
+        os.remove(filename)
+
+    def test_netscape_round_trip(self):
+        filename = 'netscape.html'
+        root = Folder(name='roots', children=read_chrome(CHROME_FILE))
+        write_netscape(root, filename, lambda folder: folder.children)
+        for chunk_size in (65536, 7):  # small chunks split the tags and the names
+            nodes = read_netscape(filename, chunk_size)
+            assert [x.name for x in nodes] == ['Панель закладок', 'Другие закладки', 'Моб. закладки']
+            stack = [(root.children, nodes)]
+            count = 0
+            while stack:
+                old_list, new_list = stack.pop()
+                assert len(old_list) == len(new_list)
+                for old, new in zip(old_list, new_list):
+                    count += 1
+                    assert type(old) is type(new)
+                    assert (old.name, old.date_added) == (new.name, new.date_added)
+                    if isinstance(old, Folder):
+                        assert old.date_modified == new.date_modified
+                        stack.append((old.children, new.children))
+                    else:
+                        assert (old.url, old.icon, old.keywords) == (new.url, new.icon, new.keywords)
+            assert count == 169
+        os.remove(filename)
+
+    def test_read_netscape(self):
+        filename = 'firefox.html'
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('<!doctype netscape-bookmark-file-1>\n<DL><p>\n'
+                    '<DT><H3 ADD_DATE="1672531200" LAST_MODIFIED="0">Tools &amp; docs</H3>\n'
+                    '<DL><p>\n<DT><A HREF="https://docs.python.org/?a=1&amp;b=2" ADD_DATE="1672531200" '
+                    'SHORTCUTURL="py">Python</A>\n</DL><p>\n'
+                    '<DT><H3 ADD_DATE="1672531200">Empty</H3>\n'
+                    '<DT><A HREF="https://example.com" TAGS="a,b"></A>\n</DL><p>\n')
+        tools, empty, url = read_netscape(filename)
+        assert (tools.name, tools.date_added) == ('Tools & docs', '2023-01-01T00:00:00')
+        python = tools.children[0]
+        assert (python.url, python.keywords) == ('https://docs.python.org/?a=1&b=2', 'py')
+        assert (empty.name, empty.children) == ('Empty', [])  # a folder without the children list
+        assert (url.name, url.url, url.keywords) == ('', 'https://example.com', 'a,b')
+
+        with open(filename, 'w') as f:
+            f.write('<html><body><a href="https://example.com">link</a></body></html>')
+        try:
+            read_netscape(filename)
+        except ValueError as e:
+            assert 'no doctype' in str(e)
+        else:
+            assert False, 'ValueError is expected'
+        os.remove(filename)
+
+    def test_read_places(self):
+        filename = 'places.sqlite'
+        write_places(filename)
+        for batch_size in (10_000, 1):  # the hierarchy does not depend on the batches
+            menu, toolbar, other, mobile = read_places(filename, batch_size)
+            assert [x.name for x in (menu, toolbar, other, mobile)] == ['Bookmarks Menu', 'Bookmarks Toolbar',
+                                                                       'Other Bookmarks', 'Mobile Bookmarks']
+            assert (other.children, mobile.children) == ([], [])
+            untitled, = menu.children  # the separator is skipped
+            assert (untitled.name, untitled.url, untitled.keywords) == ('https://example.com/', 'https://example.com/', 'ex')
+            docs, python = toolbar.children
+            assert (python.url, python.keywords, python.guid) == ('https://www.python.org/', 'lang,python',
+                                                                 'python______')
+            assert (python.id_no, python.date_added, python.parent_guid) == (10, '2016-01-22T07:29:42', '')
+            nested, = docs.children
+            assert (nested.name, nested.children[0].name) == ('Nested', 'Example')
+            today = datetime.isoformat(datetime.today().replace(microsecond=0))[:10]
+            assert nested.date_modified[:10] == today  # unknown date
+        assert [x.name for x in read_mozilla(filename)] == [x.name for x in read_places(filename)]
+
+        with open(filename, 'w') as f:
+            f.write('not a database')
+        try:
+            read_places(filename)
+        except ValueError as e:
+            assert 'not an SQLite database' in str(e)
+        else:
+            assert False, 'ValueError is expected'
+
+        os.remove(filename)
+        conn = sqlite3.connect(filename)
+        conn.execute('CREATE TABLE nodes (name TEXT)')  # an SQLite database without the bookmark tables
+        conn.commit()
+        conn.close()
+        try:
+            read_mozilla(filename)
+        except ValueError as e:
+            assert 'not a Firefox places database' in str(e)
+        else:
+            assert False, 'ValueError is expected'
+        os.remove(filename)
+
+    def test_write_chrome(self):
+        filename = 'chrome_export.json'
+        with open(CHROME_FILE, encoding='utf-8') as f:
+            image = json.load(f)
+        root = Folder(name='roots', children=read_chrome(CHROME_FILE))
+        write_chrome(root, filename, lambda folder: folder.children)
+        with open(filename, encoding='utf-8') as f:
+            new_image = json.load(f)
+        assert new_image['checksum'] == image['checksum'] == '31c06841f7ff934809e08f55f07ce598'  # ids are kept
+        assert new_image['version'] == 1
+
+        def _strip(entry: dict) -> dict:
+            """Remove the dates, the nodes keep the seconds only, and the fields which are not kept"""
+            return {key: [_strip(x) for x in value] if key == 'children' else value for key, value in entry.items()
+                    if key not in ('date_added', 'date_modified', 'date_last_used', 'meta_info')}
+
+        for name in ('bookmark_bar', 'other', 'synced'):
+            assert _strip(new_image['roots'][name]) == _strip(image['roots'][name])
+        bar = new_image['roots']['bookmark_bar']
+        assert (bar['date_added'], bar['date_modified']) == ('13097921382000000', '13148406390000000')
+
+        # other top level nodes go to the bookmark bar, wrong guids and repeated ids are replaced
+        url = Url(name='Python', url='https://www.python.org/', guid='python______', id_no=1,
+                  date_added='2016-01-22T07:29:42')
+        folder = Folder(name='Docs', guid='docs________', id_no='not a number', children=[url])
+        write_chrome(Folder(name='roots', children=[folder]), filename, lambda folder: folder.children)
+        with open(filename, encoding='utf-8') as f:
+            new_image = json.load(f)
+        roots = new_image['roots']
+        assert [roots[x]['name'] for x in roots] == ['Bookmarks bar', 'Other bookmarks', 'Mobile bookmarks']
+        assert [roots[x]['id'] for x in roots] == ['1', '2', '3']
+        docs = roots['bookmark_bar']['children'][0]
+        python = docs['children'][0]
+        assert (docs['id'], python['id'], python['date_added']) == ('4', '5', '13097921382000000')
+        assert len(python['guid']) == 36 and python['guid'] != url.guid
+        checksum = hashlib.md5()
+        for id_no, name, kind in (('1', 'Bookmarks bar', 'folder'), ('4', 'Docs', 'folder'),
+                                  ('5', 'Python', 'url' + url.url), ('2', 'Other bookmarks', 'folder'),
+                                  ('3', 'Mobile bookmarks', 'folder')):
+            checksum.update(id_no.encode() + name.encode('utf-16-le') + kind.encode())
+        assert new_image['checksum'] == checksum.hexdigest()
+        os.remove(filename)
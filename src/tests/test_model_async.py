@@ -0,0 +1,136 @@
+"""Tests of the asynchronous Model interface, module model_async.py"""
+
+import os
+import sys
+import asyncio
+import threading
+
+import exceptions
+from model_async import AsyncModel, ExecutorModel, BlockingModel
+from model_interface import Model
+from model_json import ModelJSON
+from model_json import tree_to_image
+from model_sqlite import ModelSQLite
+
+
+class TestModelAsync:
+    """Testing class for the asynchronous model and its adapter"""
+
+    filename = 'async_db.json'
+
+    def _remove_database(self):
+        """Remove the test database if it exists."""
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_async_model(self):
+        self._remove_database()
+
+        async def _session() -> list:
+            model = AsyncModel(ExecutorModel(ModelJSON()))
+            await model.create_database(self.filename)
+            await model.add_nodes([{'name': 'folder', 'parent_name': 'roots'},
+                                   {'name': 'URL', 'parent_name': 'folder', 'url': 'www.url.com'}])
+            await model.add_node({'name': 'Docs', 'parent_name': 'roots'}, True)
+            await model.move_node('URL', 'Docs')
+            await model.update_node('URL', {'name': 'URL', 'url': 'www.url.org', 'icon': '', 'keywords': 'docs'})
+            assert await model.get_children('Docs') == (True, ('URL', ))
+            assert (await model.get_node('URL'))['url'] == 'www.url.org'
+            assert await model.search('url.org') == ('URL', )
+            try:
+                await model.delete_node('Docs')
+            except exceptions.FolderNotEmpty as e:
+                print('\nException FolderNotEmpty raised successfully:', e, file=sys.stderr)
+            else:
+                assert False, 'FolderNotEmpty is expected'
+            items = [item async for item in model.iter_tree()]
+            assert list((await model.get_subtree()).items()) == items
+            await model.close()
+            return items
+
+        assert asyncio.run(_session()) == [(0, 'roots', True), (1, 'folder', True), (1, 'Docs', True),
+                                           (2, 'URL', False)]
+        jm = ModelJSON()
+        jm.open_database(self.filename)
+        assert jm.get_children('Docs') == (True, ('URL', ))
+        jm.delete_database(self.filename)
+
+    def test_background_save(self):
+        self._remove_database()
+        jm = ModelJSON()
+        executor_model = ExecutorModel(jm)
+        model = Model(BlockingModel(executor_model))
+        model.create_database(self.filename)
+
+        released = threading.Event()
+        save_tree = jm._save_tree
+        jm._save_tree = lambda: (released.wait(10), save_tree())  # a save waiting for the event
+        model.add_node({'name': 'folder', 'parent_name': 'roots'}, True)  # returns before the save
+        assert executor_model.saving
+        assert jm.dirty
+        released.set()
+        assert model.get_children('roots') == (True, ('folder', ))  # the next call waits for the save
+        assert not executor_model.saving
+        assert not jm.dirty
+
+        model.add_nodes({'name': f'url {i}', 'parent_name': 'folder', 'url': f'u{i}.com'} for i in range(3000))
+        assert [x.name for x in model.iter_tree('folder')][-1] == 'url 2999'  # more than one chunk
+        try:
+            model.get_node('nothing')
+        except exceptions.NodeNotExists as e:
+            print('\nException NodeNotExists raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'NodeNotExists is expected'
+        model.close()
+        executor_model.shutdown()
+        del jm._save_tree
+
+        jm_new = ModelJSON()
+        jm_new.open_database(self.filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm.root)
+        jm_new.delete_database(self.filename)
+
+    def test_save_error(self):
+        """An error of a background save is raised by the next change, the flush policy is restored at the end."""
+        self._remove_database()
+        jm = ModelJSON(flush_ops=5, flush_ms=1000)
+        executor_model = ExecutorModel(jm)
+        assert (jm.flush_ops, jm.flush_ms) == (0, 0)  # the worker saves after every change
+        model = Model(BlockingModel(executor_model))
+        model.create_database(self.filename)
+
+        save_tree = jm._save_tree
+        jm._save_tree = lambda: (_ for _ in ()).throw(OSError('disk full'))  # the saves fail
+        model.add_node({'name': 'folder', 'parent_name': 'roots'}, True)  # the change is made, its save fails
+        for _ in range(2):
+            try:
+                model.add_node({'name': 'lost', 'parent_name': 'roots'}, True)  # the save fails again
+            except exceptions.SaveFailed as e:
+                print('\nException SaveFailed raised successfully:', e, file=sys.stderr)
+                assert isinstance(e.error, OSError)
+            else:
+                assert False, 'SaveFailed is expected'
+        jm._save_tree = save_tree
+        model.add_node({'name': 'last', 'parent_name': 'roots'}, True)  # saved again, then the change is made
+        assert model.get_children('roots') == (True, ('folder', 'last'))
+        model.close()  # the changes are saved
+        assert not jm.dirty
+        executor_model.shutdown()
+        assert (jm.flush_ops, jm.flush_ms) == (5, 1000)
+        del jm._save_tree
+        jm.delete_database(self.filename)
+
+    def test_sqlite_thread(self):
+        """The connection of ModelSQLite is made and used in the worker thread only."""
+        filename = 'async_db.sqlite'
+        if os.path.isfile(filename):
+            os.remove(filename)
+        executor_model = ExecutorModel(ModelSQLite())
+        assert not executor_model.background_flush  # SQLite commits every change
+        model = Model(BlockingModel(executor_model))
+        model.create_database(filename)
+        model.add_node({'name': 'folder', 'parent_name': 'roots'}, True)
+        assert list(model.iter_tree()) == [(0, 'roots', True), (1, 'folder', True)]
+        model.close()
+        model.delete_database(filename)
+        executor_model.shutdown()
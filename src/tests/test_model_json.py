@@ -3,16 +3,22 @@
 import json
 import os, os.path
 import sys
+import random
 from datetime import datetime
 
 
 import exceptions
 from model_json import ModelJSON
+from model_json import image_to_tree
+from model_json import tree_to_image
+from model_json import iter_tree_json
+from common import SAVE_CHUNK
 from my_nodes import RootBookmarks
 from my_nodes import Folder
 from my_nodes import Url
+from tests.test_converters import write_places
 
-
+CHROME_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'Bookmarks.json')  # Chrome sample
 
 class TestModulJSON:
     """Testing class for internal and JSON Model class"""
@@ -77,7 +83,7 @@ class TestModulJSON:
                     'children': ['folder'],}
         expected_nodes_list = ['roots', 'folder', 'URL']
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # ---- replace objects with their names ----
         children_list = [x.name for x in node_content['children']]  # get children names
         node_content['children'] = children_list  # put children names instead of objects
@@ -91,7 +97,7 @@ class TestModulJSON:
         assert len(node_content['date_added']) == 19
         assert type(node_content['date_modified']) is str
         assert len(node_content['date_modified']) == 19
-        nodes_list = [x for x in node_content['nodes_dict'].keys()]  # names of the global node list
+        nodes_list = [x for x in self.jm.root.nodes_dict.keys()]  # names of the global node list
         assert set(nodes_list) == set(expected_nodes_list)
 
         # folder <folder> second
@@ -100,7 +106,7 @@ class TestModulJSON:
         expected = {'name': 'folder', 'parent_guid': parent_guid,
                     'children': ['URL'], }
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # ---- replace objects with their names ----
         children_list = [x.name for x in node_content['children']]  # get children names
         node_content['children'] = children_list  # put children names instead of objects
@@ -121,7 +127,7 @@ class TestModulJSON:
         expected = {'name': 'URL', 'parent_guid': parent_guid,
                     'url': 'www.url.com', 'icon': 'ICON', 'keywords': 'old keys', }
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # assert block
         assert node_content['name'] == expected['name']
         assert node_content['parent_guid'] == expected['parent_guid']
@@ -219,7 +225,7 @@ class TestModulJSON:
                     'children': ['URL'], }
         node_name = 'FOLDER'
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # ---- replace objects with their names ----
         children_list = [x.name for x in node_content['children']]  # get children names
         node_content['children'] = children_list  # put children names instead of objects
@@ -248,7 +254,7 @@ class TestModulJSON:
         expected = {'name': 'new_URL', 'parent_guid': parent_guid,
                     'url': 'www.google.com', 'icon': 'new_ICON', 'keywords': 'new keys', }
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # get folder.date_modified stamp
         node_object = self.jm.root.nodes_dict['FOLDER']  # get the roots node instance
         date_modified = node_object.date_modified  # get date_modified field of parent node
@@ -302,13 +308,13 @@ class TestModulJSON:
         # check if URL was deleted from the global node dict
         expected_nodes_list = ['roots', 'folder']  # URL should be deleted
         node_object = self.jm.root.nodes_dict['roots']  # get the roots node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
-        nodes_list = [x for x in node_content['nodes_dict'].keys()]  # names of the global node list
+        node_content = node_object.to_dict()  # local copy of the node's fields
+        nodes_list = [x for x in self.jm.root.nodes_dict.keys()]  # names of the global node list
         assert set(nodes_list) == set(expected_nodes_list)
 
         # check if URL was deleted from the parent children list
         node_object = self.jm.root.nodes_dict['folder']  # get the folder node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         assert node_content['children'] == []  # parent children list is empty
 
         # then delete now empty folder
@@ -318,8 +324,8 @@ class TestModulJSON:
         # check if folder was also deleted
         expected_nodes_list = ['roots']  # folder should be deleted
         node_object = self.jm.root.nodes_dict['roots']  # get the roots node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
-        nodes_list = [x for x in node_content['nodes_dict'].keys()]  # names of the global node list
+        node_content = node_object.to_dict()  # local copy of the node's fields
+        nodes_list = [x for x in self.jm.root.nodes_dict.keys()]  # names of the global node list
         assert set(nodes_list) == set(expected_nodes_list)
 
     def test_delete_database(self):
@@ -387,7 +393,7 @@ class TestModulJSON:
                     'children': ['folder'],}
         expected_nodes_list = ['roots', 'folder', 'URL']
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # ---- replace objects with their names ----
         children_list = [x.name for x in node_content['children']]  # get children names
         node_content['children'] = children_list  # put children names instead of objects
@@ -401,7 +407,7 @@ class TestModulJSON:
         assert len(node_content['date_added']) == 19
         assert type(node_content['date_modified']) is str
         assert len(node_content['date_modified']) == 19
-        nodes_list = [x for x in node_content['nodes_dict'].keys()]  # names of the global node list
+        nodes_list = [x for x in self.jm.root.nodes_dict.keys()]  # names of the global node list
         assert set(nodes_list) == set(expected_nodes_list)
 
         # folder <folder> second
@@ -410,7 +416,7 @@ class TestModulJSON:
         expected = {'name': 'folder', 'parent_guid': parent_guid,
                     'children': ['URL'], }
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # ---- replace objects with their names ----
         children_list = [x.name for x in node_content['children']]  # get children names
         node_content['children'] = children_list  # put children names instead of objects
@@ -431,7 +437,7 @@ class TestModulJSON:
         expected = {'name': 'URL', 'parent_guid': parent_guid,
                     'url': 'www.url.com', 'icon': 'ICON', 'keywords': 'old keys', }
         node_object = self.jm.root.nodes_dict[node_name]  # get the node instance
-        node_content = node_object.__dict__.copy()  # local copy of the node's dict
+        node_content = node_object.to_dict()  # local copy of the node's fields
         # assert block
         assert node_content['name'] == expected['name']
         assert node_content['parent_guid'] == expected['parent_guid']
@@ -484,3 +490,721 @@ class TestModulJSON:
         assert data == ()  # empty tuple
 
         self.jm.delete_database(filename)  # delete the test database
+
+    def test_page_and_fields(self):
+        """Test of a page of children and the projection of the node fields."""
+        filename = 'database.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        self.jm.create_database(filename)  # create an empty db
+        self.jm.add_nodes([{'name': 'folder', 'parent_name': 'roots'}] +
+                          [{'name': f'URL_{i}', 'parent_name': 'folder', 'url': f'u{i}.com'} for i in range(5)])
+
+        # pages of the children
+        assert self.jm.get_children('folder', 0, 2) == (True, ('URL_0', 'URL_1'))
+        assert self.jm.get_children('folder', 3) == (True, ('URL_3', 'URL_4'))
+        assert self.jm.get_children('folder', 4, 10) == (True, ('URL_4', ))
+        assert self.jm.get_children('folder', 5, 1) == (True, ())
+        assert self.jm.get_children('folder', limit=0) == (True, ())
+        assert self.jm.get_children('URL_0', 1, 1) == (False, ())
+        for offset, limit in ((-1, None), (0, -1)):
+            try:
+                self.jm.get_children('folder', offset, limit)
+            except ValueError as e:
+                print('\nException ValueError raised successfully:', e, file=sys.stderr)
+            else:
+                assert False, 'ValueError is expected'
+
+        # the requested fields in their order, the fields the node does not have are omitted
+        folder = self.jm.get_node('folder')
+        assert self.jm.get_node('folder', ('guid', 'name')) == {'guid': folder['guid'], 'name': 'folder'}
+        assert self.jm.get_node('folder', ['children', 'url']) == {'children': folder['children']}
+        assert self.jm.get_node('URL_1', iter(['url', 'children'])) == {'url': 'u1.com'}
+        assert self.jm.get_node('URL_1', ()) == {}
+        try:
+            self.jm.get_node('not exist', ('name', ))
+        except exceptions.NodeNotExists as e:
+            print('\nException NodeNotExist raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'NodeNotExists is expected'
+
+        self.jm.delete_database(filename)  # delete the test database
+
+    def test_iter_tree(self):
+        """Test of the traversal: orders, depth limit, start node and a deep tree without recursion."""
+        filename = 'iter_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        jm.add_nodes([{'name': 'A', 'parent_name': 'roots'},
+                      {'name': 'A1', 'parent_name': 'A', 'url': 'https://a1.com/'},
+                      {'name': 'B', 'parent_name': 'A'},
+                      {'name': 'B1', 'parent_name': 'B', 'url': 'https://b1.com/'},
+                      {'name': 'C', 'parent_name': 'roots'},
+                      {'name': 'R1', 'parent_name': 'roots', 'url': 'https://r1.com/'}])
+
+        assert list(jm.iter_tree()) == [(0, 'roots', True), (1, 'A', True), (2, 'A1', False), (2, 'B', True),
+                                        (3, 'B1', False), (1, 'C', True), (1, 'R1', False)]
+        assert [x.name for x in jm.iter_tree(order='bfs')] == ['roots', 'A', 'C', 'R1', 'A1', 'B', 'B1']
+        assert list(jm.iter_tree(max_depth=1)) == [(0, 'roots', True), (1, 'A', True), (1, 'C', True),
+                                                   (1, 'R1', False)]
+        assert [x.name for x in jm.iter_tree('A', 'bfs', max_depth=1)] == ['A', 'A1', 'B']
+        assert list(jm.iter_tree('B1')) == [(0, 'B1', False)]
+        try:
+            jm.iter_tree('not exist')
+        except exceptions.NodeNotExists:
+            pass
+        else:
+            assert False, 'NodeNotExists is expected'
+        try:
+            jm.iter_tree(order='random')
+        except ValueError:
+            pass
+        else:
+            assert False, 'ValueError is expected'
+
+        # a chain of folders deeper than the recursion limit, in the memory only: the JSON encoder is recursive
+        depth = sys.getrecursionlimit() + 100
+        jm.root.add_nodes({'name': f'D{i}', 'parent_name': f'D{i - 1}' if i else 'roots'} for i in range(depth))
+        items = list(jm.iter_tree('D0'))
+        assert len(items) == depth and items[-1] == (depth - 1, f'D{depth - 1}', True)
+        assert list(jm.get_subtree('D0').items()) == items
+        jm.delete_database(filename)
+
+    def test_get_subtree(self):
+        """Test of the subtree at once: the flat lists, the depth limit and the field columns."""
+        filename = 'subtree_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        jm.add_nodes([{'name': 'A', 'parent_name': 'roots'},
+                      {'name': 'A1', 'parent_name': 'A', 'url': 'https://a1.com/'},
+                      {'name': 'B', 'parent_name': 'A'},
+                      {'name': 'B1', 'parent_name': 'B', 'url': 'https://b1.com/'},
+                      {'name': 'R1', 'parent_name': 'roots', 'url': 'https://r1.com/'}])
+
+        subtree = jm.get_subtree()
+        assert subtree == (['roots', 'A', 'A1', 'B', 'B1', 'R1'], [-1, 0, 1, 1, 3, 0],
+                           [True, True, False, True, False, False], {})
+        assert list(subtree.items()) == list(jm.iter_tree())
+        assert [subtree.names[i] for i in subtree.children(1)] == ['A1', 'B']
+        assert subtree.children(2) == []
+        assert jm.get_subtree('A', max_depth=1).names == ['A', 'A1', 'B']
+        assert jm.get_subtree('B1', max_depth=0).names == ['B1']
+
+        # a column of values for every field, None for the nodes without the field
+        subtree = jm.get_subtree('A', fields=['url', 'children', 'guid'])
+        assert subtree.fields['url'] == [None, 'https://a1.com/', None, 'https://b1.com/']
+        assert subtree.fields['children'] == [['A1', 'B'], None, ['B1'], None]
+        for i, name in enumerate(subtree.names):
+            assert subtree.node(i) == jm.get_node(name, ('url', 'children', 'guid'))
+        try:
+            jm.get_subtree('not exist')
+        except exceptions.NodeNotExists as e:
+            print('\nException NodeNotExist raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'NodeNotExists is expected'
+        jm.delete_database(filename)
+
+    def test_move_node(self):
+        """Test of the moving: the children lists, the dates, the errors and the journal replay."""
+        filename = 'move_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON(journal=True)
+        jm.create_database(filename)
+        jm.add_nodes([{'name': 'A', 'parent_name': 'roots'},
+                      {'name': 'B', 'parent_name': 'A'},
+                      {'name': 'URL', 'parent_name': 'B', 'url': 'www.url.com'},
+                      {'name': 'C', 'parent_name': 'roots'}])
+        for name in ('A', 'C'):
+            jm.root.nodes_dict[name].date_modified = '2000-01-01T00:00:00'  # old dates of the folders
+        jm.move_node('B', 'C')
+        assert jm.get_children('A') == (True, ())
+        assert jm.get_children('C') == (True, ('B', ))
+        assert jm.get_node('B')['parent_guid'] == jm.get_node('C')['guid']
+        assert jm.get_node('A')['date_modified'] == jm.get_node('C')['date_modified'] != '2000-01-01T00:00:00'
+        jm.move_node('URL', 'roots')
+        assert jm.get_children('roots') == (True, ('A', 'C', 'URL'))
+        assert jm.root.check_index()
+
+        image = tree_to_image(jm.root)
+        for name, parent_name, error in (('A', 'not exist', exceptions.NodeNotExists),
+                                         ('not exist', 'A', exceptions.NodeNotExists),
+                                         ('A', 'URL', exceptions.FolderNotExist),
+                                         ('C', 'C', exceptions.NodeNotMovable),
+                                         ('C', 'B', exceptions.NodeNotMovable),
+                                         ('roots', 'A', exceptions.NodeNotMovable)):
+            try:
+                jm.move_node(name, parent_name)
+            except error as e:
+                print('\nException raised successfully:', e, file=sys.stderr)
+            else:
+                assert False, f'{error.__name__} is expected'
+        assert tree_to_image(jm.root) == image
+
+        # the journal replays the moves
+        jm_new = ModelJSON(journal=True)
+        jm_new.open_database(filename)
+        assert tree_to_image(jm_new.root) == image
+        jm.delete_database(filename)
+
+    def test_journal(self):
+        """Test of the journal mode: append, replay and compaction."""
+        filename = 'journal_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON(journal=True)  # journaled JSON Model instance
+        jm.create_database(filename)  # create an empty db
+        with open(filename) as f:
+            snapshot = f.read()  # image of the empty tree
+
+        # add a folder, an url, modify and delete nodes
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        jm.add_node({'name': 'URL', 'parent_name': 'folder',
+                     'url': 'www.url.com', 'icon': 'ICON', 'keywords': 'old keys'}, False)
+        jm.add_node({'name': 'URL_2', 'parent_name': 'folder',
+                     'url': 'www.url.com', 'icon': 'ICON', 'keywords': 'old keys'}, False)
+        jm.update_node('URL', {'name': 'new_URL', 'url': 'www.google.com', 'icon': 'ICON', 'keywords': 'keys'})
+        jm.delete_node('URL_2')
+
+        # the snapshot is untouched, mutations are in the journal
+        with open(filename) as f:
+            assert f.read() == snapshot
+        with open(jm.journal_name) as f:
+            ops = [json.loads(line)['op'] for line in f]
+        assert ops == ['base', 'add', 'add', 'add', 'update', 'delete']  # the hash of the snapshot first
+
+        # replay the journal on top of the snapshot
+        jm_new = ModelJSON(journal=True)
+        jm_new.open_database(filename)
+        assert set(jm_new.root.nodes_dict.keys()) == {'roots', 'folder', 'new_URL'}
+        assert jm_new.get_children('folder') == (True, ('new_URL',))
+        assert jm_new.get_node('new_URL')['url'] == 'www.google.com'
+        assert jm_new.get_node('new_URL')['guid'] == jm.get_node('new_URL')['guid']
+        assert jm_new.get_node('folder')['date_modified'] == jm.get_node('folder')['date_modified']
+
+        # the journal of a compaction interrupted before the journal removing is not replayed
+        jm_new.update_node('new_URL', {'name': 'B'})
+        jm_new.add_node({'name': 'new_URL', 'parent_name': 'folder', 'url': 'www.url.com'}, False)
+        jm_new.move_node('B', 'roots')
+        jm_new._save_tree()  # the records are in the snapshot, the journal is left
+        assert os.path.isfile(jm_new.journal_name)
+        jm_old = ModelJSON(journal=True)
+        jm_old.open_database(filename)
+        assert tree_to_image(jm_old.root) == tree_to_image(jm_new.root)
+        assert jm_old.root.check_index()
+        assert not os.path.isfile(jm_new.journal_name)  # the stale journal is removed
+        jm_new.delete_node('new_URL')  # a new journal for the new snapshot
+        jm_old.open_database(filename)
+        assert jm_old.get_children('folder') == (True, ())
+        assert jm_old.get_children('roots') == (True, ('folder', 'B'))
+
+        # compaction of the journal exceeding the limit
+        jm_new.journal_limit = 0
+        jm_new.add_node({'name': 'folder_2', 'parent_name': 'roots', }, True)
+        assert not os.path.isfile(jm_new.journal_name)
+        jm_old = ModelJSON()
+        jm_old.open_database(filename)
+        assert jm_old.get_children('roots') == (True, ('folder', 'B', 'folder_2'))
+
+        jm_new.delete_database(filename)
+        assert not os.path.isfile(filename)
+
+    def test_add_nodes(self):
+        """Test of the bulk adding: parents of the batch, one save, atomic errors and the journal."""
+        filename = 'bulk_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        jm.search('folder')  # build the search index, it is updated by the batch
+
+        def _attr_dicts():
+            """A generator of the batch, the parent of the url is added before it"""
+            yield {'name': 'Docs', 'parent_name': 'folder'}
+            yield {'name': 'Python', 'parent_name': 'Docs', 'url': 'https://docs.python.org/', 'keywords': 'lang'}
+            yield {'name': '', 'parent_name': 'roots', 'url': 'https://example.com/'}  # named by its new guid
+
+        saves = []
+        save_tree = jm._save_tree
+        jm._save_tree = lambda: saves.append(save_tree())  # count the saves
+        jm.add_nodes(_attr_dicts())
+        assert len(saves) == 1
+        del jm._save_tree
+        assert jm.get_children('Docs') == (True, ('Python', ))
+        result, children = jm.get_children('roots')
+        assert children[0] == 'folder' and jm.get_node(children[1])['guid'] == children[1]
+        docs, python = jm.get_node('Docs'), jm.get_node('Python')
+        assert python['parent_guid'] == docs['guid']
+        assert python['date_added'] == docs['date_added'] == docs['date_modified']  # one datetime for the batch
+        assert jm.search('lang') == ('Python', )
+        assert jm.root.check_index()
+        jm_new = ModelJSON()
+        jm_new.open_database(filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm.root)
+
+        # either all the nodes are added or none of them
+        image = tree_to_image(jm.root)
+        for attr_dicts, error in (
+                ([{'name': 'New', 'parent_name': 'roots'}, {'name': 'URL', 'parent_name': 'No folder', 'url': ''}],
+                 exceptions.NodeNotExists),
+                ([{'name': 'New', 'parent_name': 'roots'}, {'name': 'URL', 'parent_name': 'Python', 'url': ''}],
+                 exceptions.FolderNotExist),
+                ([{'name': 'New', 'parent_name': 'roots'}, {'name': 'New', 'parent_name': 'folder'}],
+                 exceptions.NodeExists),
+                ([{'name': 'New', 'parent_name': 'roots'}, {'name': 'Docs', 'parent_name': 'roots'}],
+                 exceptions.NodeExists)):
+            try:
+                jm.add_nodes(attr_dicts)
+            except error:
+                pass
+            else:
+                assert False, f'{error.__name__} is expected'
+            assert 'New' not in jm.root.nodes_dict
+            assert tree_to_image(jm.root) == image
+        assert not jm.dirty
+
+        # the journal keeps the batch in one record
+        jm.delete_database(filename)
+        jm = ModelJSON(journal=True)
+        jm.create_database(filename)
+        jm.add_nodes([{'name': 'folder', 'parent_name': 'roots', }])
+        jm.add_nodes(_attr_dicts())
+        with open(jm.journal_name) as f:
+            assert [json.loads(line)['op'] for line in f] == ['base', 'add_nodes', 'add_nodes']
+        jm_new = ModelJSON(journal=True)
+        jm_new.open_database(filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm.root)
+        assert jm_new.root.check_index()
+        jm.delete_database(filename)
+
+    def test_flush_policy(self):
+        """Test of the atomic saving, deferred flushes and transactions."""
+        filename = 'flush_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+
+        def _saved_names() -> set:
+            """Names of the nodes on the disk"""
+            jm_disk = ModelJSON()
+            jm_disk.open_database(filename)
+            return set(jm_disk.root.nodes_dict.keys())
+
+        # flush every 2 mutations
+        jm = ModelJSON(flush_ops=2)
+        jm.create_database(filename)  # create an empty db
+        assert not os.path.isfile(filename + '.tmp')  # the temporary file was renamed
+        jm.add_node({'name': 'folder_1', 'parent_name': 'roots', }, True)
+        assert jm.dirty
+        assert _saved_names() == {'roots'}
+        jm.add_node({'name': 'folder_2', 'parent_name': 'roots', }, True)
+        assert not jm.dirty
+        assert _saved_names() == {'roots', 'folder_1', 'folder_2'}
+
+        # flush on close only
+        jm.flush_ops = 0
+        jm.add_node({'name': 'folder_3', 'parent_name': 'roots', }, True)
+        assert _saved_names() == {'roots', 'folder_1', 'folder_2'}
+        jm.close()
+        assert _saved_names() == {'roots', 'folder_1', 'folder_2', 'folder_3'}
+
+        # flush if the time has passed
+        jm.flush_ms = 1
+        jm._last_flush -= 1  # the last flush was a second ago
+        jm.delete_node('folder_3')
+        assert not jm.dirty
+        assert _saved_names() == {'roots', 'folder_1', 'folder_2'}
+
+        # many mutations share one flush within a transaction
+        jm.flush_ops, jm.flush_ms = 1, 0
+        with jm.transaction():
+            jm.add_node({'name': 'URL_1', 'parent_name': 'folder_1', 'url': 'www.url.com'}, False)
+            with jm.transaction():  # nested transaction does not flush
+                jm.add_node({'name': 'URL_2', 'parent_name': 'folder_1', 'url': 'www.url.com'}, False)
+            assert jm.dirty
+            assert _saved_names() == {'roots', 'folder_1', 'folder_2'}
+        assert not jm.dirty
+        assert _saved_names() == {'roots', 'folder_1', 'folder_2', 'URL_1', 'URL_2'}
+
+        # journal mode flushes the pending records at once
+        jm = ModelJSON(journal=True, flush_ops=0)
+        jm.open_database(filename)
+        jm.add_node({'name': 'URL_3', 'parent_name': 'folder_2', 'url': 'www.url.com'}, False)
+        assert not os.path.isfile(jm.journal_name)
+        jm.close()
+        with open(jm.journal_name) as f:
+            assert len(f.readlines()) == 2  # the hash of the database file and the record
+        assert 'URL_3' in _saved_names()
+
+        jm.delete_database(filename)
+
+    def test_snapshot(self):
+        """Test of the binary snapshot cache: writing, using, invalidation and the json fallback."""
+        filename = 'snapshot_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON(snapshot=True)
+        jm.create_database(filename)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        jm.add_node({'name': 'URL', 'parent_name': 'folder', 'url': 'www.url.com', 'keywords': 'keys'}, False)
+        jm.add_node({'name': 'folder_2', 'parent_name': 'folder', }, True)
+        assert os.path.isfile(jm.snapshot_name)  # written after the saving
+
+        # the tree rebuilt from the snapshot is the same as the decoded one
+        jm_new = ModelJSON(snapshot=True)
+        jm_new.tree_name = filename
+        assert jm_new._read_snapshot(open(filename, 'rb').read()) is not None  # the snapshot is valid
+        jm_new.open_database(filename)
+        jm_old = ModelJSON()
+        jm_old.open_database(filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm_old.root)
+        assert jm_new.root.nodes_dict.keys() == jm_old.root.nodes_dict.keys()
+        assert jm_new.root.guid_dict.keys() == jm_old.root.guid_dict.keys()
+        assert jm_new.root.check_index()
+
+        # a changed database file invalidates the snapshot
+        jm_old.add_node({'name': 'URL_2', 'parent_name': 'roots', 'url': 'www.url.com'}, False)
+        assert jm_new._read_snapshot(open(filename, 'rb').read()) is None
+        jm_new.open_database(filename)
+        assert 'URL_2' in jm_new.root.nodes_dict
+        assert jm_new._read_snapshot(open(filename, 'rb').read()) is not None  # written after the loading
+
+        # a broken snapshot falls back to json
+        with open(jm_new.snapshot_name, 'wb') as f:
+            f.write(b'broken')
+        jm_new.open_database(filename)
+        assert set(jm_new.root.nodes_dict.keys()) == {'roots', 'folder', 'URL', 'folder_2', 'URL_2'}
+
+        jm_new.delete_database(filename)
+        assert not os.path.isfile(jm_new.snapshot_name)
+
+    def test_search(self):
+        """Test of the search index: ranking, prefixes, limit and the sync with the mutations."""
+        filename = 'search_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        jm.add_node({'name': 'News', 'parent_name': 'roots', }, True)
+        jm.add_node({'name': 'Daily paper', 'parent_name': 'News', 'url': 'https://www.news.com/daily',
+                     'keywords': 'politics'}, False)
+        jm.add_node({'name': 'Python docs', 'parent_name': 'roots', 'url': 'https://docs.python.org',
+                     'keywords': 'news'}, False)
+        assert jm.root.search_index is None  # built at the first search
+
+        # the name match is the best, then keywords, then url; the last word is a prefix
+        assert jm.search('news') == ('News', 'Python docs', 'Daily paper')
+        assert jm.search('NEWS', limit=1) == ('News', )
+        assert jm.search('pyth') == ('Python docs', )
+        assert jm.search('daily pol') == ('Daily paper', )  # all words should match
+        assert jm.search('daily python') == ()
+        assert jm.search('') == ()
+        assert jm.search('roots') == ()  # the root is not searchable
+
+        # the index follows the mutations
+        jm.add_node({'name': 'Pythonic', 'parent_name': 'News', 'url': 'https://pythonic.org'}, False)
+        assert jm.search('python') == ('Python docs', 'Pythonic')
+        jm.update_node('Python docs', {'name': 'Docs', 'keywords': ''})
+        assert jm.search('news') == ('News', 'Daily paper')
+        assert jm.search('docs') == ('Docs', )
+        try:
+            jm.update_node('Docs', {'name': 'Papers', 'url': 'https://papers.org', 'unknown': ''})
+        except TypeError as e:
+            print('\nException TypeError raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'TypeError is expected'
+        assert jm.search('docs') == ('Docs', )  # nothing is changed, the node is still indexed
+        assert jm.get_node('Docs')['url'] == 'https://docs.python.org'
+        jm.delete_node('Pythonic')
+        assert jm.search('pythonic') == ()
+        assert 'pythonic' not in jm.root.search_index.vocabulary
+
+        jm.delete_database(filename)
+
+    def test_convert_chrome(self):
+        """Test of the Chrome bookmark file import."""
+        filename = 'chrome_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON(journal=True)
+        jm.create_database(filename)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)  # a pending record of the journal
+        assert jm.convert_chrome(CHROME_FILE) == (True, '')
+        assert len(jm.root.nodes_dict) == 169 + 2  # with <roots> and <folder>
+        assert jm.get_children('roots') == (True, ('folder', 'Панель закладок', 'Другие закладки', 'Моб. закладки'))
+        bar = jm.get_node('Панель закладок')
+        assert bar['guid'] == '0bc5d13f-2cba-5d74-951f-3f233fe6c908'  # guids are kept
+        assert (bar['id_no'], bar['date_added'], bar['date_modified']) == ('1', '2016-01-22T07:29:42',
+                                                                          '2017-08-28T15:06:30')
+        url = jm.get_node(bar['children'][0])
+        assert url['url'] == 'http://www.electro-mpo.ru/'
+        assert (url['parent_guid'], url['date_added']) == (bar['guid'], '2010-11-07T06:55:02')
+        assert jm.root.check_index()
+
+        # the tree was saved once, the journal was folded into the snapshot
+        assert not jm.dirty
+        assert not os.path.isfile(jm.journal_name)
+        jm_new = ModelJSON()
+        jm_new.open_database(filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm.root)
+
+        # the second import gets new names and guids, it is flushed by the flush policy
+        jm.flush_ops = 0  # at the closing only
+        assert jm.convert_chrome(CHROME_FILE) == (True, '')
+        assert jm.dirty
+        jm.close()
+        assert not jm.dirty
+        jm_new.open_database(filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(jm.root)
+        assert len(jm.root.nodes_dict) == 2 * 169 + 2
+        assert jm.get_node('Панель закладок (1)')['guid'] != bar['guid']
+        assert jm.root.check_index()
+
+        # wrong files
+        assert jm.convert_chrome('not_exists.json') == (False, 'File <not_exists.json> does not exist')
+        result, message = jm.convert_chrome(filename)  # not a Chrome file
+        assert result is False
+        assert message.startswith(f'File <{filename}> is not a Chrome bookmark file')
+
+        jm.delete_database(filename)
+
+    def test_netscape(self):
+        """Test of the Netscape bookmark file export and import."""
+        filename = 'netscape_db.json'
+        html_name = 'netscape_db.html'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        assert jm.convert_chrome(CHROME_FILE) == (True, '')
+        assert jm.export_netscape(html_name) == (True, '')
+        urls = {name: getattr(node, 'url', None) for name, node in jm.root.nodes_dict.items()}
+        jm.delete_database(filename)
+
+        jm.create_database(filename)
+        assert jm.convert_mozilla(html_name) == (True, '')
+        assert len(jm.root.nodes_dict) == 169 + 1
+        assert jm.get_children('roots') == (True, ('Панель закладок', 'Другие закладки', 'Моб. закладки'))
+        bar = jm.get_node('Панель закладок')
+        assert (bar['date_added'], bar['date_modified']) == ('2016-01-22T07:29:42', '2017-08-28T15:06:30')
+        url = jm.get_node(bar['children'][0])
+        assert (url['url'], url['parent_guid'], url['date_added']) == ('http://www.electro-mpo.ru/', bar['guid'],
+                                                                      '2010-11-07T06:55:02')
+        assert jm.root.check_index()
+        assert {name: getattr(node, 'url', None) for name, node in jm.root.nodes_dict.items()} == urls
+
+        # wrong files
+        assert jm.convert_mozilla('not_exists.html') == (False, 'File <not_exists.html> does not exist')
+        result, message = jm.convert_mozilla(filename)  # not a bookmark HTML file
+        assert result is False
+        assert message.startswith(f'File <{filename}> is not a Mozilla bookmark file')
+        result, message = jm.export_netscape(os.path.join('not_exists', html_name))
+        assert result is False
+        assert message.startswith(f'File <{os.path.join("not_exists", html_name)}> can not be written')
+
+        os.remove(html_name)
+        jm.delete_database(filename)
+
+    def test_export_chrome(self):
+        """Test of the Chrome bookmark file export."""
+        filename = 'chrome_export_db.json'
+        chrome_name = 'chrome_export.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        assert jm.convert_chrome(CHROME_FILE) == (True, '')
+        nodes = {name: getattr(node, 'url', None) for name, node in jm.root.nodes_dict.items()}
+        assert jm.export_chrome(chrome_name) == (True, '')
+        jm.delete_database(filename)
+
+        jm.create_database(filename)
+        assert jm.convert_chrome(chrome_name) == (True, '')  # the exported file is a Chrome bookmark file
+        assert {name: getattr(node, 'url', None) for name, node in jm.root.nodes_dict.items()} == nodes
+        assert jm.get_node('Панель закладок')['guid'] == '0bc5d13f-2cba-5d74-951f-3f233fe6c908'
+        result, message = jm.export_chrome(os.path.join('not_exists', chrome_name))
+        assert result is False
+        assert message.startswith(f'File <{os.path.join("not_exists", chrome_name)}> can not be written')
+        os.remove(chrome_name)
+        jm.delete_database(filename)
+
+    def test_convert_places(self):
+        """Test of the Firefox places.sqlite import."""
+        filename = 'places_db.json'
+        places_name = 'places.sqlite'
+        write_places(places_name)
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON(journal=True)
+        jm.create_database(filename)
+        assert jm.convert_mozilla(places_name) == (True, '')
+        assert jm.get_children('roots') == (True, ('Bookmarks Menu', 'Bookmarks Toolbar', 'Other Bookmarks',
+                                                   'Mobile Bookmarks'))
+        assert jm.get_children('Docs') == (True, ('Nested', ))
+        python = jm.get_node('Python')
+        assert (python['guid'], python['keywords']) == ('python______', 'lang,python')
+        assert python['parent_guid'] == jm.get_node('Bookmarks Toolbar')['guid']
+        assert len(jm.root.nodes_dict) == 9 + 1
+        assert jm.root.check_index()
+        assert not jm.dirty  # the tree was saved once
+        assert not os.path.isfile(jm.journal_name)
+        os.remove(places_name)
+        jm.delete_database(filename)
+
+    def test_name_allocator(self):
+        """Test of the allocator of the duplicate names: the same names as the linear probing."""
+        def _probe(name: str, used) -> str:
+            """The linear probing of the names, the reference scheme"""
+            i = 1
+            new_name = name
+            while new_name in used:
+                new_name = f'{name} ({i})'
+                i += 1
+            return new_name
+
+        root = RootBookmarks()
+        root.nodes_dict['roots'] = root
+        root.add_node({'name': 'a (1)', 'parent_name': 'roots'}, True)  # a suffixed name added explicitly
+        rng = random.Random(5)
+        for _ in range(2000):
+            names = [x for x in root.nodes_dict if x != 'roots']
+            action = rng.random()
+            if action < 0.6 or not names:
+                base = rng.choice(('a', 'b', 'a (1)', 'New Tab'))
+                name = root.duplicate_name(base)
+                assert name == _probe(base, root.nodes_dict)
+                root.add_node({'name': name, 'parent_name': 'roots'}, True)
+            elif action < 0.8:
+                root.delete_node(rng.choice(names))
+            else:
+                name = rng.choice(names)
+                new_name = _probe(rng.choice(('a', 'b', 'c')), root.nodes_dict)
+                root.update_node(name, {'name': new_name})
+        assert root.check_index()
+
+        # a new allocator of a loaded tree learns the names on demand
+        root = image_to_tree(tree_to_image(root))
+        for base in ('a', 'b', 'New Tab'):
+            assert root.duplicate_name(base) == _probe(base, root.nodes_dict)
+
+    def test_guid_index(self):
+        """Test of the guid index maintained by the tree mutations."""
+        filename = 'guid_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        jm.add_node({'name': 'URL', 'parent_name': 'folder', 'url': 'www.url.com'}, False)
+        folder = jm.root.nodes_dict['folder']
+        url = jm.root.nodes_dict['URL']
+        assert jm.root.guid_dict == {jm.root.guid: jm.root, folder.guid: folder, url.guid: url}
+        assert jm.root.get_parent('URL') is folder
+        assert jm.root.get_parent('folder') is jm.root
+        assert jm.root.check_index()
+
+        # rename and guid changing
+        jm.update_node('folder', {'name': 'FOLDER', 'guid': 'new-guid'})
+        assert jm.root.guid_dict['new-guid'] is folder
+        assert jm.root.get_parent('URL') is folder
+        assert jm.root.check_index()
+
+        # deleting
+        jm.delete_node('URL')
+        assert url.guid not in jm.root.guid_dict
+        assert jm.root.check_index()
+
+        # opening
+        jm_new = ModelJSON()
+        jm_new.open_database(filename)
+        assert set(jm_new.root.guid_dict.keys()) == {jm.root.guid, 'new-guid'}
+        assert jm_new.root.check_index()
+
+        # broken index
+        del jm_new.root.guid_dict['new-guid']
+        try:
+            jm_new.root.check_index()
+        except AssertionError as e:
+            print('\nException AssertionError raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'inconsistency is not detected'
+        jm.delete_database(filename)
+
+    def test_image_to_tree(self):
+        """Test of the iterative loader and the fast constructor path."""
+        date = '2023-03-04T20:09:49'
+        # a chain of folders deeper than the recursion limit
+        depth = sys.getrecursionlimit() * 2
+        image = {'children': [], 'date_added': date, 'date_modified': date, 'guid': 'root-guid',
+                 'parent_guid': '', 'name': 'roots'}
+        children, parent_guid = image['children'], 'root-guid'
+        for i in range(depth):
+            folder = {'children': [], 'date_modified': date, 'id_no': i, 'date_added': date,
+                      'guid': f'guid {i}', 'parent_guid': parent_guid, 'name': f'folder {i}'}
+            children.append(folder)
+            children, parent_guid = folder['children'], folder['guid']
+        children.append({'url': 'www.url.com', 'icon': '', 'keywords': '', 'id_no': 0, 'date_added': date,
+                         'guid': 'url-guid', 'parent_guid': parent_guid, 'name': 'URL'})
+
+        root = image_to_tree(image)
+        assert len(root.nodes_dict) == depth + 2
+        assert root.guid == 'root-guid'
+        assert root.get_parent('URL') is root.nodes_dict[f'folder {depth - 1}']
+        assert root.check_index()
+
+        # fields from the file are kept, the defaults are not evaluated
+        folder = root.nodes_dict['folder 0']
+        assert isinstance(folder, Folder)
+        assert (folder.date_added, folder.date_modified, folder.guid) == (date, date, 'guid 0')
+        assert isinstance(root.nodes_dict['URL'], Url)
+
+        # empty fields get the default values through the constructor
+        url = Url.from_dict({'url': 'www.url.com', 'icon': '', 'keywords': '', 'id_no': 0, 'date_added': '',
+                             'guid': '', 'parent_guid': '', 'name': ''})
+        assert len(url.guid) == 36
+        assert url.name == url.guid
+        assert len(url.date_added) == 19
+        try:
+            Folder.from_dict({'children': [], 'date_modified': date, 'id_no': 0, 'date_added': date,
+                              'guid': 'guid', 'parent_guid': '', 'wrong': 'name'})
+        except TypeError as e:
+            print('\nException TypeError raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'wrong field is not detected'
+
+    def test_tree_to_image(self):
+        """Test of the serializer, the file is the same as encoded node by node."""
+        filename = 'image_db.json'
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(filename)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        jm.add_node({'name': 'Папка', 'parent_name': 'folder', }, True)  # non-ascii name
+        jm.add_node({'name': 'URL', 'parent_name': 'Папка', 'url': 'www.url.com'}, False)
+        jm.add_node({'name': 'URL_2', 'parent_name': 'roots', 'url': 'www.url.com'}, False)
+
+        image = tree_to_image(jm.root)
+        assert image['children'][0]['children'][0]['children'][0]['name'] == 'URL'
+        assert isinstance(image['children'][1], dict)
+        expected = json.dumps(jm.root, default=lambda obj: obj.to_dict())  # encoding node by node
+        with open(filename) as f:
+            assert f.read() == expected
+        jm.delete_database(filename)
+
+    def test_iter_tree_json(self):
+        """Test of the encoder by pieces, the text is the same as of the image."""
+        jm = ModelJSON()
+        assert ''.join(iter_tree_json(jm.root)) == json.dumps(tree_to_image(jm.root))  # empty tree
+        attr_dicts = [{'name': 'empty', 'parent_name': 'roots'}, {'name': 'folder', 'parent_name': 'roots'}]
+        attr_dicts += [{'name': f'url {i}', 'parent_name': 'folder', 'url': f'u{i}.com'}
+                       for i in range(2 * SAVE_CHUNK)]  # the chunk is full at the end of the folder
+        attr_dicts += [{'name': 'Папка', 'parent_name': 'folder'}, {'name': 'last', 'parent_name': 'roots', 'url': 'a'}]
+        jm.root.add_nodes(attr_dicts)
+        pieces = list(iter_tree_json(jm.root))
+        assert ''.join(pieces) == json.dumps(tree_to_image(jm.root))
+        assert max(len(x) for x in pieces) < SAVE_CHUNK * 300  # no piece of the whole folder
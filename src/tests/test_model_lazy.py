@@ -0,0 +1,133 @@
+"""Tests of the lazy Model module implementation for huge JSON databases."""
+
+import os
+import sys
+
+import exceptions
+from common import TEMP_SUFFIX
+from model_json import ModelJSON
+from model_lazy import ModelLazyJSON
+from model_lazy import build_index
+
+
+class TestModelLazyJSON:
+    """Testing class for the lazy JSON Model class"""
+
+    filename = 'lazy_db.json'
+
+    def _create_test_database(self) -> ModelJSON:
+        """Create a database with nested folders and urls, names with escaped characters."""
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(self.filename)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        jm.add_node({'name': 'Папка "1"', 'parent_name': 'folder', }, True)
+        jm.add_node({'name': 'URL', 'parent_name': 'Папка "1"', 'url': 'www.url.com/{"url": }',
+                     'icon': 'ICON', 'keywords': '"name": "x"}'}, False)
+        jm.add_node({'name': 'empty', 'parent_name': 'folder', }, True)
+        jm.add_node({'name': 'URL_2', 'parent_name': 'folder', 'url': 'www.url.com'}, False)
+        jm.add_node({'name': 'URL_3', 'parent_name': 'roots', 'url': 'www.url.com'}, False)
+        return jm
+
+    def test_build_index(self):
+        self._create_test_database()
+        with open(self.filename, 'rb') as f:
+            index = build_index(f.read())
+        assert set(index.keys()) == {'roots', 'folder', 'Папка "1"', 'URL', 'empty', 'URL_2', 'URL_3'}
+        assert index['roots'][5] == ['folder', 'URL_3']
+        assert index['folder'][5] == ['Папка "1"', 'empty', 'URL_2']
+        assert index['empty'][5] == []
+        assert index['URL'][4] == 'Папка "1"'
+        assert index['URL'][5] is None
+        try:
+            build_index(b'{"children": [')
+        except ValueError as e:
+            print('\nException ValueError raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'broken file is not detected'
+        os.remove(self.filename)
+
+    def test_lazy_reading(self):
+        jm = self._create_test_database()
+        lm = ModelLazyJSON(cache_size=2)
+        lm.open_database(self.filename)
+        assert lm.lazy
+        assert os.path.isfile(lm.index_name)
+        assert not os.path.isfile(lm.index_name + TEMP_SUFFIX)  # the index is renamed into place
+        for name in jm.root.nodes_dict:
+            assert lm.get_children(name) == jm.get_children(name)
+        for order in ('dfs', 'bfs'):
+            assert list(lm.iter_tree(order=order)) == list(jm.iter_tree(order=order))
+        assert list(lm.iter_tree('folder', max_depth=1)) == list(jm.iter_tree('folder', max_depth=1))
+        assert lm.cache == {}  # children lists and the traversal come from the index
+        for name in jm.root.nodes_dict:
+            assert lm.get_node(name) == jm.get_node(name)
+        assert len(lm.cache) == 2  # cold folders were evicted
+        assert list(lm.cache.keys()) == ['folder', 'roots']  # URL_2 and URL_3 are in their parent folders
+        try:
+            lm.get_node('not exist')
+        except exceptions.NodeNotExists as e:
+            print('\nException NodeNotExist raised successfully:', e, file=sys.stderr)
+        lm.close()
+
+        # the index is reused while the database is not changed
+        index_time = os.stat(lm.index_name).st_mtime_ns
+        lm.open_database(self.filename)
+        assert os.stat(lm.index_name).st_mtime_ns == index_time
+        assert lm.get_children('folder') == (True, ('Папка "1"', 'empty', 'URL_2'))
+        lm.close()
+
+        # the index is rebuilt after the database was changed
+        jm.open_database(self.filename)
+        jm.add_node({'name': 'URL_4', 'parent_name': 'empty', 'url': 'www.url.com'}, False)
+        lm.open_database(self.filename)
+        assert lm.get_children('empty') == (True, ('URL_4', ))
+        lm.delete_database(self.filename)
+        assert not os.path.isfile(lm.index_name)
+
+    def test_page_and_fields(self):
+        jm = self._create_test_database()
+        lm = ModelLazyJSON()
+        lm.open_database(self.filename)
+        for name in jm.root.nodes_dict:
+            assert lm.get_children(name, 1, 1) == jm.get_children(name, 1, 1)
+            assert lm.get_node(name, ('name', 'children')) == jm.get_node(name, ('name', 'children'))
+        assert lm.cache == {}  # the names and the children come from the index
+        try:
+            lm.get_children('folder', 0, -1)
+        except ValueError as e:
+            print('\nException ValueError raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'ValueError is expected'
+        for name in jm.root.nodes_dict:
+            assert lm.get_node(name, ('url', 'guid', 'children')) == jm.get_node(name, ('url', 'guid', 'children'))
+        assert lm.cache  # the other fields are decoded
+        lm.close()
+
+        lm = ModelLazyJSON()
+        lm.open_database(self.filename)
+        assert lm.get_subtree(fields=('name', 'children')) == jm.get_subtree(fields=('name', 'children'))
+        assert lm.cache == {}  # the subtree of the names comes from the index
+        assert lm.get_subtree('folder', 1, ('url', 'guid')) == jm.get_subtree('folder', 1, ('url', 'guid'))
+        lm.delete_database(self.filename)
+
+    def test_lazy_writing(self):
+        self._create_test_database()
+        lm = ModelLazyJSON()
+        lm.open_database(self.filename)
+        lm.update_node('URL_2', {'name': 'new_URL'})  # the whole tree is loaded
+        assert not lm.lazy
+        assert lm.get_children('folder') == (True, ('Папка "1"', 'empty', 'new_URL'))
+        jm = ModelJSON()
+        jm.open_database(self.filename)
+        assert 'new_URL' in jm.root.nodes_dict
+
+        # a database with a journal is loaded as a whole
+        jm = ModelJSON(journal=True)
+        jm.open_database(self.filename)
+        jm.delete_node('new_URL')
+        lm.open_database(self.filename)
+        assert not lm.lazy
+        assert lm.get_children('folder') == (True, ('Папка "1"', 'empty'))
+        lm.delete_database(self.filename)
@@ -0,0 +1,350 @@
+"""Tests of Model module implementation with SQLite storage."""
+
+import os
+import sys
+import json
+import hashlib
+import sqlite3
+
+import exceptions
+from model_json import ModelJSON
+from model_sqlite import ModelSQLite
+from model_sqlite import migrate_json
+from tests.test_converters import write_places
+
+
+class TestModelSQLite:
+    """Testing class for SQLite Model class"""
+
+    sm = ModelSQLite()  # SQLite Model instance
+
+    def _create_test_database(self, filename: str):
+        """Create a database with a folder and an url in it."""
+        if os.path.isfile(filename):
+            os.remove(filename)  # remove the filename if it exists
+        self.sm.create_database(filename)  # create an empty db
+        self.sm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        self.sm.add_node({'name': 'URL', 'parent_name': 'folder',
+                          'url': 'www.url.com', 'icon': 'ICON', 'keywords': 'old keys'}, False)
+
+    def test_create_database(self):
+        filename = 'new_db.sqlite'
+        if not os.path.isfile(filename):
+            open(filename, 'w').close()  # create this file
+        # check exception if input filename already exists
+        try:
+            self.sm.create_database(filename)
+        except FileExistsError as e:
+            print('\nException FileExistsError raised successfully', e, file=sys.stderr)
+        os.remove(filename)  # delete this file
+
+        self.sm.create_database(filename)
+        assert os.path.isfile(filename)
+        assert self.sm.get_children('roots') == (True, ())
+        self.sm.delete_database(filename)
+        assert not os.path.isfile(filename)
+
+    def test_add_get_node(self):
+        filename = 'database.sqlite'
+        self._create_test_database(filename)
+
+        roots = self.sm.get_node('roots')
+        assert roots['children'] == ['folder']
+        assert roots['parent_guid'] == ''
+
+        folder = self.sm.get_node('folder')
+        assert list(folder.keys()) == ['children', 'date_modified', 'id_no', 'date_added', 'guid',
+                                       'parent_guid', 'name']
+        assert folder['children'] == ['URL']
+        assert folder['parent_guid'] == roots['guid']
+        assert len(folder['guid']) == 36
+        assert len(folder['date_added']) == 19
+
+        url = self.sm.get_node('URL')
+        assert list(url.keys()) == ['url', 'icon', 'keywords', 'id_no', 'date_added', 'guid',
+                                    'parent_guid', 'name']
+        assert url['parent_guid'] == folder['guid']
+        assert (url['url'], url['icon'], url['keywords']) == ('www.url.com', 'ICON', 'old keys')
+
+        # only the requested fields, as the JSON model returns them
+        assert self.sm.get_node('URL', ('url', 'name', 'children')) == {'url': 'www.url.com', 'name': 'URL'}
+        assert self.sm.get_node('folder', ['children', 'guid', 'url']) == {'children': ['URL'],
+                                                                           'guid': folder['guid']}
+        assert self.sm.get_node('roots', ('is_folder', 'id_no')) == {}  # not the fields of the roots
+        assert self.sm.get_node('roots', ('date_modified', )) == {'date_modified': roots['date_modified']}
+
+        try:
+            self.sm.get_node('not exist')
+        except exceptions.NodeNotExists as e:
+            print('\nException NodeNotExist raised successfully:', e, file=sys.stderr)
+        try:
+            self.sm.add_node({'name': 'URL', 'parent_name': 'roots', 'url': 'www.url.org'}, False)
+        except exceptions.NodeExists as e:
+            print('\nException NodeExists raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'NodeExists is expected'
+        assert self.sm.get_children('roots') == (True, ('folder', ))
+        self.sm.delete_database(filename)
+
+    def test_get_children(self):
+        filename = 'database.sqlite'
+        self._create_test_database(filename)
+        for i in range(2, 4):
+            self.sm.add_node({'name': f'URL_{i}', 'parent_name': 'folder', 'url': 'www.url.com'}, False)
+        assert self.sm.get_children('folder') == (True, ('URL', 'URL_2', 'URL_3'))
+        assert self.sm.get_children('URL') == (False, ())
+        assert self.sm.get_children('folder', 1) == (True, ('URL_2', 'URL_3'))
+        assert self.sm.get_children('folder', 1, 1) == (True, ('URL_2', ))
+        assert self.sm.get_children('folder', 0, 0) == (True, ())
+        assert self.sm.get_children('folder', 5, 2) == (True, ())
+        try:
+            self.sm.get_children('folder', -1)
+        except ValueError as e:
+            print('\nException ValueError raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'ValueError is expected'
+        try:
+            self.sm.get_children('not exist')
+        except exceptions.NodeNotExists as e:
+            print('\nException NodeNotExist raised successfully:', e, file=sys.stderr)
+        self.sm.delete_database(filename)
+
+    def test_iter_tree(self):
+        filename = 'database.sqlite'
+        self._create_test_database(filename)
+        self.sm.add_nodes([{'name': 'sub', 'parent_name': 'folder'},
+                           {'name': 'URL_2', 'parent_name': 'sub', 'url': 'www.url.com'},
+                           {'name': 'URL_3', 'parent_name': 'roots', 'url': 'www.url.com'}])
+        assert list(self.sm.iter_tree()) == [(0, 'roots', True), (1, 'folder', True), (2, 'URL', False),
+                                             (2, 'sub', True), (3, 'URL_2', False), (1, 'URL_3', False)]
+        assert [x.name for x in self.sm.iter_tree(order='bfs')] == ['roots', 'folder', 'URL_3', 'URL', 'sub', 'URL_2']
+        assert [x.name for x in self.sm.iter_tree('folder', max_depth=1)] == ['folder', 'URL', 'sub']
+        subtree = self.sm.get_subtree(fields=('url', 'name', 'children', 'date_modified'))
+        assert list(subtree.items()) == list(self.sm.iter_tree())
+        assert subtree.parents == [-1, 0, 1, 1, 3, 0]
+        for i, name in enumerate(subtree.names):
+            assert subtree.node(i) == self.sm.get_node(name, ('url', 'name', 'children', 'date_modified'))
+        assert self.sm.get_subtree('folder', max_depth=1) == (['folder', 'URL', 'sub'], [-1, 0, 0],
+                                                              [True, False, True], {})
+        try:
+            self.sm.iter_tree('not exist')
+        except exceptions.NodeNotExists as e:
+            print('\nException NodeNotExist raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'NodeNotExists is expected'
+        self.sm.delete_database(filename)
+
+    def test_update_node(self):
+        filename = 'database.sqlite'
+        self._create_test_database(filename)
+        self.sm.update_node('folder', {'name': 'FOLDER'})
+        assert self.sm.get_children('roots') == (True, ('FOLDER', ))
+        self.sm.update_node('URL', {'name': 'new_URL', 'url': 'www.google.com', 'icon': 'new_ICON',
+                                    'keywords': 'new keys'})
+        url = self.sm.get_node('new_URL')
+        assert (url['url'], url['icon'], url['keywords']) == ('www.google.com', 'new_ICON', 'new keys')
+        assert self.sm.get_children('FOLDER') == (True, ('new_URL', ))
+        try:
+            self.sm.update_node('new_URL', {'name': 'FOLDER'})  # rename to an existing name
+        except exceptions.NodeExists as e:
+            print('\nException NodeExists raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'NodeExists is expected'
+        assert self.sm.get_children('FOLDER') == (True, ('new_URL', ))  # the update is rolled back
+
+        # a new guid of a folder is set to its children, the parent guid is not updated
+        self.sm.update_node('FOLDER', {'name': 'FOLDER', 'guid': 'new guid', 'parent_guid': 'wrong parent'})
+        assert self.sm.get_node('FOLDER')['guid'] == 'new guid'
+        assert self.sm.get_node('new_URL')['parent_guid'] == 'new guid'
+        assert self.sm.get_children('FOLDER') == (True, ('new_URL', ))
+        assert self.sm.get_children('roots') == (True, ('FOLDER', ))
+        try:
+            self.sm.update_node('new_URL', {'guid': 'new guid'})  # the guid of the folder
+        except sqlite3.IntegrityError as e:
+            print('\nException IntegrityError raised successfully:', e, file=sys.stderr)
+        else:
+            assert False, 'IntegrityError is expected'
+        assert self.sm.get_node('new_URL')['guid'] != 'new guid'  # the update is rolled back
+        self.sm.delete_database(filename)
+
+    def test_delete_node(self):
+        filename = 'database.sqlite'
+        self._create_test_database(filename)
+        try:
+            self.sm.delete_node('folder')
+        except exceptions.FolderNotEmpty as e:
+            print('\nException FolderNotEmpty raised successfully:', e, file=sys.stderr)
+        self.sm.delete_node('URL')
+        assert self.sm.get_children('folder') == (True, ())
+        self.sm.delete_node('folder')
+        assert self.sm.get_children('roots') == (True, ())
+        self.sm.delete_database(filename)
+
+    def test_move_node(self):
+        filename = 'database.sqlite'
+        self._create_test_database(filename)
+        self.sm.add_nodes([{'name': 'A', 'parent_name': 'roots'}, {'name': 'B', 'parent_name': 'A'}])
+        self.sm.move_node('folder', 'B')
+        assert self.sm.get_children('roots') == (True, ('A', ))
+        assert self.sm.get_children('B') == (True, ('folder', ))
+        self.sm.move_node('URL', 'roots')
+        assert self.sm.get_children('roots') == (True, ('A', 'URL'))  # the moved node is the last one
+        assert self.sm.get_node('URL')['parent_guid'] == self.sm.get_node('roots')['guid']
+        for name, parent_name, error in (('A', 'not exist', exceptions.NodeNotExists),
+                                         ('A', 'URL', exceptions.FolderNotExist),
+                                         ('A', 'folder', exceptions.NodeNotMovable),
+                                         ('roots', 'A', exceptions.NodeNotMovable)):
+            try:
+                self.sm.move_node(name, parent_name)
+            except error as e:
+                print('\nException raised successfully:', e, file=sys.stderr)
+            else:
+                assert False, f'{error.__name__} is expected'
+        self.sm.delete_database(filename)
+
+    def test_add_nodes(self):
+        filename = 'bulk_db.sqlite'
+        self._create_test_database(filename)
+        self.sm.add_nodes(x for x in ({'name': 'Docs', 'parent_name': 'folder'},
+                                      {'name': 'Python', 'parent_name': 'Docs', 'url': 'https://docs.python.org/',
+                                       'guid': self.sm.get_node('URL')['guid']}))  # the guid is in use
+        assert self.sm.get_children('folder') == (True, ('URL', 'Docs'))
+        docs, python = self.sm.get_node('Docs'), self.sm.get_node('Python')
+        assert python['parent_guid'] == docs['guid']
+        assert python['guid'] != self.sm.get_node('URL')['guid']
+        assert (python['url'], python['icon'], python['keywords']) == ('https://docs.python.org/', '', '')
+        for attr_dicts, error in (([{'name': 'New', 'parent_name': 'roots'}, {'name': 'X', 'parent_name': 'No'}],
+                                   exceptions.NodeNotExists),
+                                  ([{'name': 'New', 'parent_name': 'roots'}, {'name': 'X', 'parent_name': 'URL'}],
+                                   exceptions.FolderNotExist),
+                                  ([{'name': 'New', 'parent_name': 'roots'}, {'name': 'New', 'parent_name': 'Docs'}],
+                                   exceptions.NodeExists),
+                                  ([{'name': 'New', 'parent_name': 'roots'}, {'name': 'URL', 'parent_name': 'Docs'}],
+                                   exceptions.NodeExists)):
+            try:
+                self.sm.add_nodes(attr_dicts)
+            except error:
+                pass
+            else:
+                assert False, f'{error.__name__} is expected'
+            assert self.sm.conn.execute('SELECT COUNT(*) FROM nodes').fetchone()[0] == 5  # nothing is added
+        self.sm.delete_database(filename)
+
+    def test_search(self):
+        filename = 'search_db.sqlite'
+        self._create_test_database(filename)
+        self.sm.add_node({'name': 'Python docs', 'parent_name': 'roots', 'url': 'https://docs.python.org',
+                          'keywords': 'url'}, False)
+        assert self.sm.search('url') == ('URL', 'Python docs')  # the name match is the best
+        assert self.sm.search('url', limit=1) == ('URL', )
+        assert self.sm.search('PYTHON docs') == ('Python docs', )
+        assert self.sm.search('old python') == ()  # all words should match
+        assert self.sm.search('roots') == ()  # the root is not searchable
+        self.sm.delete_database(filename)
+
+    def test_convert_chrome(self):
+        filename = 'chrome_db.sqlite'
+        self._create_test_database(filename)
+        chrome_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'Bookmarks.json')
+        assert self.sm.convert_chrome(chrome_file) == (True, '')
+        assert self.sm.convert_chrome(chrome_file) == (True, '')  # the second import gets new names and guids
+        assert self.sm.get_children('roots') == (True, ('folder', 'Панель закладок', 'Другие закладки',
+                                                        'Моб. закладки', 'Панель закладок (1)',
+                                                        'Другие закладки (1)', 'Моб. закладки (1)'))
+        bar = self.sm.get_node('Панель закладок')
+        assert bar['guid'] == '0bc5d13f-2cba-5d74-951f-3f233fe6c908'  # guids are kept
+        assert self.sm.get_node('Панель закладок (1)')['guid'] != bar['guid']
+        url = self.sm.get_node(bar['children'][0])
+        assert (url['url'], url['parent_guid']) == ('http://www.electro-mpo.ru/', bar['guid'])
+        assert self.sm.conn.execute('SELECT COUNT(*) FROM nodes').fetchone()[0] == 2 * 169 + 3
+        assert self.sm.convert_chrome('not_exists.json') == (False, 'File <not_exists.json> does not exist')
+        self.sm.delete_database(filename)
+
+    def test_netscape(self):
+        filename = 'netscape_db.sqlite'
+        html_name = 'netscape_db.html'
+        self._create_test_database(filename)
+        assert self.sm.export_netscape(html_name) == (True, '')
+        assert self.sm.convert_mozilla(html_name) == (True, '')  # import the exported tree
+        assert self.sm.get_children('roots') == (True, ('folder', 'folder (1)'))
+        url = self.sm.get_node('URL (1)')
+        assert (url['url'], url['icon'], url['keywords']) == ('www.url.com', 'ICON', 'old keys')
+        assert url['parent_guid'] == self.sm.get_node('folder (1)')['guid']
+        result, message = self.sm.convert_mozilla(filename)  # not a bookmark HTML file
+        assert result is False
+        assert message.startswith(f'File <{filename}> is not a Mozilla bookmark file')
+        os.remove(html_name)
+        self.sm.delete_database(filename)
+
+    def test_convert_places(self):
+        filename = 'places_db.sqlite'
+        places_name = 'places.sqlite'
+        write_places(places_name)
+        self._create_test_database(filename)
+        assert self.sm.convert_mozilla(places_name) == (True, '')
+        assert self.sm.get_children('Bookmarks Toolbar') == (True, ('Docs', 'Python'))
+        nested = self.sm.get_node('Nested')
+        assert (nested['children'], nested['parent_guid']) == (['Example'], 'docs________')
+        assert self.sm.conn.execute('SELECT COUNT(*) FROM nodes').fetchone()[0] == 9 + 3
+        os.remove(places_name)
+        self.sm.delete_database(filename)
+
+    def test_export_chrome(self):
+        filename = 'chrome_export.sqlite'
+        chrome_name = 'chrome_export.json'
+        self._create_test_database(filename)
+        chrome_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'Bookmarks.json')
+        assert self.sm.convert_chrome(chrome_file) == (True, '')
+        assert self.sm.export_chrome(chrome_name) == (True, '')
+        with open(chrome_name, encoding='utf-8') as f:
+            image = json.load(f)
+        assert image['roots']['bookmark_bar']['children'][-1]['name'] == 'folder'  # a top level node of the tree
+        checksum = hashlib.md5()
+        stack = [image['roots'][x] for x in ('synced', 'other', 'bookmark_bar')]
+        count = 0
+        while stack:  # the file order
+            entry = stack.pop()
+            count += 1
+            kind = 'url' + entry['url'] if entry['type'] == 'url' else 'folder'
+            checksum.update(entry['id'].encode() + entry['name'].encode('utf-16-le') + kind.encode())
+            stack.extend(reversed(entry.get('children', [])))
+        assert image['checksum'] == checksum.hexdigest()
+        assert count == 169 + 2  # with <folder> and <URL>
+        os.remove(chrome_name)
+        self.sm.delete_database(filename)
+
+    def test_open_database(self):
+        filename = 'database.sqlite'
+        try:
+            self.sm.open_database('no_exist')
+        except FileNotFoundError as e:
+            print('\nException FileNotFoundError raised successfully:', e, file=sys.stderr)
+        assert not os.path.isfile('no_exist')
+        self._create_test_database(filename)
+        self.sm.close()
+        sm = ModelSQLite()
+        sm.open_database(filename)
+        assert sm.get_children('folder') == (True, ('URL', ))
+        sm.delete_database(filename)
+
+    def test_migrate_json(self):
+        json_name, sqlite_name = 'migrate.json', 'migrate.sqlite'
+        for filename in (json_name, sqlite_name):
+            if os.path.isfile(filename):
+                os.remove(filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(json_name)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots', }, True)
+        jm.add_node({'name': 'URL', 'parent_name': 'folder', 'url': 'www.url.com'}, False)
+        jm.add_node({'name': 'folder_2', 'parent_name': 'roots', }, True)
+
+        migrate_json(json_name, sqlite_name)
+
+        sm = ModelSQLite()
+        sm.open_database(sqlite_name)
+        assert sm.get_children('roots') == (True, ('folder', 'folder_2'))
+        assert sm.get_children('folder') == (True, ('URL', ))
+        assert sm.get_node('URL')['guid'] == jm.get_node('URL')['guid']
+        assert sm.get_node('roots')['guid'] == jm.root.guid
+        sm.delete_database(sqlite_name)
+        jm.delete_database(json_name)
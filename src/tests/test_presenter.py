@@ -2,15 +2,39 @@
 
 import os
 import sys
+import typing as t
 from unittest import mock
 
 import exceptions as e
 from view_interface import View
 from model_interface import Model
 from presenter import Presenter
+from traversal import TreeItem, Subtree
 
-from common import VALID_CHARS
-from common import Field
+from common import VALID_CHARS, URL_FIELDS, FOLDER_FIELDS
+from common import Field, MenuItem
+
+
+def _subtree(name: str, attr_dict: dict, children: tuple[str, ...] | None = None) -> Subtree:
+    """Make a subtree of a node and its children as get_subtree(name, max_depth=1) returns it.
+
+    :param name: name of the node
+    :param attr_dict: fields of the node, they are not in the subtree, see _get_node()
+    :param children: names of the children of a folder, None for an url
+    :return: the subtree
+    """
+    is_folder = children is not None
+    children = children or ()
+    return Subtree([name, *children], [-1] + [0] * len(children), [is_folder] + [False] * len(children), {})
+
+
+def _get_node(attr_dict: dict) -> t.Callable[[str, t.Iterable[str]], dict]:
+    """Make a mock of get_node(name, fields) which returns the requested fields of the node.
+
+    :param attr_dict: fields of the node
+    :return: the side effect of the mock
+    """
+    return lambda name, fields: {key: attr_dict[key] for key in fields if key in attr_dict}
 
 class TestPresenter:
     """Testing class for a Presenter module."""
@@ -152,6 +176,135 @@ class TestPresenter:
         assert self.pres.view.output_string.call_args.args == (exp_str,)
         assert result is False  # error
 
+    def test_convert_tree(self):
+        # ---- a successful case ----
+        chrome_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'Bookmarks.json')
+        tree_name = 'Converted database'  # correct name of a new database
+        self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
+        self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
+        self.pres.view.main_header = "TEST HEADER CONVERT TREE"  # set a mocking method header
+        self.pres.view.input_line.side_effect = [chrome_file, tree_name]  # source filename, then the tree name
+        self.pres.view.select_line.return_value = 0  # Chrome format
+        self.pres.model.convert_chrome.return_value = (True, '')
+
+        result = self.pres.convert_tree()  # test of the method
+
+        assert self.pres.view.input_line.call_args_list[0].args == ("Input the filename of the browser bookmarks",)
+        assert self.pres.model.create_database.call_args.args == (tree_name,)
+        assert self.pres.view.select_line.call_args.args == (tuple(x.descr for x in self.pres.CONVERT_MENU),)
+        assert self.pres.model.convert_chrome.call_args.args == (chrome_file,)
+        assert self.pres.view.output_string.call_args.args == (f'File <{chrome_file}> has been converted {chr(10)}',)
+        assert result is True
+
+        # ---- a conversion error ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.view.input_line.side_effect = [chrome_file, tree_name]
+        self.pres.model.convert_chrome.return_value = (False, 'error message')
+
+        result = self.pres.convert_tree()  # test of the method
+
+        assert self.pres.view.output_string.call_args.args == (f'error message {chr(10)}',)
+        assert result is False
+
+        # ---- the source file does not exist ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.model.cwd = os.getcwd()
+        self.pres.view.input_line.side_effect = ['not_exists.json']
+
+        result = self.pres.convert_tree()  # test of the method
+
+        assert self.pres.model.create_database.call_count == 0
+        assert self.pres.view.output_string.call_args.args == (
+            f'File <not_exists.json> does not exist in the work directory {os.getcwd()}{chr(10)}',)
+        assert result is False
+
+        # ---- a break of the format selection ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.view.input_line.side_effect = [chrome_file, tree_name]
+        self.pres.view.select_line.return_value = None  # EOF break
+
+        result = self.pres.convert_tree()  # test of the method
+
+        assert self.pres.model.create_database.call_count == 1
+        assert self.pres.model.convert_chrome.call_count == 0
+        assert result is True  # the new tree is empty
+
+    def test_export_tree(self):
+        # ---- a successful case ----
+        filename = 'exported.html'  # the file does not exist
+        if os.path.isfile(filename):
+            os.remove(filename)
+        self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
+        self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
+        self.pres.view.main_header = "TEST HEADER EXPORT TREE"  # set a mocking method header
+        self.pres.view.input_line.return_value = filename
+        self.pres.view.select_line.return_value = 1  # Netscape format
+        self.pres.model.export_netscape.return_value = (True, '')
+
+        result = self.pres.export_tree()  # test of the method
+
+        assert self.pres.view.input_line.call_args.args == ("Input the filename of the exported bookmarks",)
+        assert self.pres.view.input_yes_or_no.call_count == 0  # nothing to overwrite
+        assert self.pres.view.select_line.call_args.args == (tuple(x.descr for x in self.pres.EXPORT_MENU),)
+        assert self.pres.model.export_netscape.call_args.args == (filename,)
+        assert self.pres.view.output_string.call_args.args == (f'The tree has been exported to <{filename}> {chr(10)}',)
+        assert result is True
+
+        # ---- an existing file is kept ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        with open(filename, 'w'):
+            pass
+        self.pres.view.input_yes_or_no.return_value = False
+
+        result = self.pres.export_tree()  # test of the method
+
+        assert self.pres.view.input_yes_or_no.call_args.args == (
+            f'Do you want to overwrite file <{filename}>? (Yes/No)',)
+        assert self.pres.model.export_netscape.call_count == 0
+        assert self.pres.view.output_string.call_args.args == (f'Keep an existing file <{filename}> {chr(10)}',)
+        assert result is False
+
+        # ---- an existing file is overwritten with an error ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.view.input_yes_or_no.return_value = True
+        self.pres.model.export_netscape.return_value = (False, 'error message')
+
+        result = self.pres.export_tree()  # test of the method
+
+        assert self.pres.model.export_netscape.call_args.args == (filename,)
+        assert self.pres.view.output_string.call_args.args == (f'error message {chr(10)}',)
+        assert result is False
+        os.remove(filename)
+
+        # ---- a break of the filename input ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.view.input_line.return_value = None  # EOF break
+
+        result = self.pres.export_tree()  # test of the method
+
+        assert self.pres.view.select_line.call_count == 0
+        assert self.pres.model.export_netscape.call_count == 0
+        assert result is False
+
+        # ---- Chrome format ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.view.input_line.return_value = filename
+        self.pres.view.select_line.return_value = 0  # Chrome format
+        self.pres.model.export_chrome.return_value = (True, '')
+
+        result = self.pres.export_tree()  # test of the method
+
+        assert self.pres.model.export_chrome.call_args.args == (filename,)
+        assert self.pres.model.export_netscape.call_count == 0
+        assert result is True
+
     def test_add_bookmark_folder(self):
         # ---- common params ----
         new_node = 'New folder'  # correct name of a new folder
@@ -279,10 +432,9 @@ class TestPresenter:
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_none  # 1 call
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict)  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_fields params
         self.pres.view.select_field.return_value = selected_field
         # edit_field params
@@ -291,8 +443,8 @@ class TestPresenter:
         result = self.pres.modify_bookmark()  # test of the method
 
         assert self.pres.view.output_header.call_args.args == (self.pres.view.main_header, )
-        assert self.pres.model.get_children.call_args.args == ('roots', )
-        assert self.pres.model.get_node.call_args.args == ('roots', )
+        assert self.pres.model.get_subtree.call_args == mock.call('roots', max_depth=1)  # no fields of the children
+        assert self.pres.model.get_node.call_args == mock.call('roots', URL_FIELDS)
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots', )
         assert self.pres.view.edit_field.call_args.args == (editing_field, )
         assert self.pres.model.update_node.call_args.args == ('roots', new_filtered_attrs, )
@@ -304,10 +456,9 @@ class TestPresenter:
         # mock methods
         self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
         self.pres.model.reset_mock(return_value=True)
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_none  # 1 call
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict)  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_fields params
         self.pres.view.select_field.return_value = selected_field
         # edit_field params
@@ -315,8 +466,7 @@ class TestPresenter:
 
         result = self.pres.modify_bookmark()  # test of the method
 
-        assert self.pres.model.get_children.call_args.args == ('roots', )
-        assert self.pres.model.get_node.call_args.args == ('roots', )
+        assert self.pres.model.get_subtree.call_args.args == ('roots', )
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots', )
         assert self.pres.view.edit_field.call_args.args == (editing_field, )
         assert result is False
@@ -325,17 +475,15 @@ class TestPresenter:
         # mock methods
         self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
         self.pres.model.reset_mock(return_value=True)
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_none  # 1 call
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict)  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_fields params
         self.pres.view.select_field.return_value = "None", 'wrong selection'  # internal error
 
         result = self.pres.modify_bookmark()  # test of the method
 
-        assert self.pres.model.get_children.call_args.args == ('roots', )
-        assert self.pres.model.get_node.call_args.args == ('roots', )
+        assert self.pres.model.get_subtree.call_args.args == ('roots', )
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots', )
         # assert self.pres.view.edit_field.call_args.args == (editing_field, )
         assert self.pres.view.output_string.call_args.args == \
@@ -347,45 +495,24 @@ class TestPresenter:
         # mock methods
         self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
         self.pres.model.reset_mock(return_value=True)
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_none  # 1 call
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict)  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_fields params
         self.pres.view.select_field.return_value = None, ''  # EOF was entered
 
         result = self.pres.modify_bookmark()  # test of the method
 
-        assert self.pres.model.get_children.call_args.args == ('roots',)
-        assert self.pres.model.get_node.call_args.args == ('roots',)
+        assert self.pres.model.get_subtree.call_args.args == ('roots',)
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots',)
         assert result is False
 
-        # modify an url with internal error <node does not exist> at get_node
-        # mock methods
-        self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
-        self.pres.model.reset_mock(return_value=True)
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_none  # 1 call
-        # get_node params
-        self.pres.model.get_node.side_effect = e.NodeNotExists('not exist')
-        # switch next traceback output to stderr
-        temp = sys.stdout
-        sys.stdout = sys.stderr
-        print()
-        try:
-            result = self.pres.modify_bookmark()  # test of the method
-        except SystemExit as exc:
-            assert type(exc) == SystemExit
-            assert exc.code == 1
-        sys.stdout = temp  # restore stdout
-
-        # modify an url with internal error <node does not exist> at get_children
+        # modify an url with internal error <node does not exist> at get_subtree
         # mock methods
         self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
         self.pres.model.reset_mock(side_effect=True)
-        # get_children params
-        self.pres.model.get_children.side_effect = e.NodeNotExists('not exist')  # 1 call
+        # get_subtree params
+        self.pres.model.get_subtree.side_effect = e.NodeNotExists('not exist')  # 1 call
 
         result = self.pres.modify_bookmark()  # test of the method
 
@@ -415,12 +542,12 @@ class TestPresenter:
         self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
         self.pres.model.reset_mock(side_effect=True)
         # self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.side_effect = [get_children_folder, e.NodeNotExists('forced return')]  # 1 call
+        # get_subtree params
+        self.pres.model.get_subtree.side_effect = [_subtree('roots', attr_dict, get_children_folder[1]),
+                                                   e.NodeNotExists('forced return')]  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = (False, 1)  # modify current folder
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
         # select_field params
         self.pres.view.select_field.return_value = (True, 'name')
         # edit_field params
@@ -430,9 +557,9 @@ class TestPresenter:
 
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
-        assert self.pres.model.get_node.call_args.args == ('roots', )
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots', )
         assert self.pres.view.edit_field.call_args.args == (editing_field, )
+        assert self.pres.model.get_node.call_args == mock.call('roots', FOLDER_FIELDS)  # the folder fields only
         assert self.pres.model.update_node.call_args.args == ('roots', new_filtered_attrs)
         assert self.pres.view.output_string.call_args.args == (f'Node <forced return> does not exist {chr(10)}', )
         assert result is False
@@ -456,12 +583,12 @@ class TestPresenter:
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.side_effect = [get_children_folder, e.NodeNotExists('forced return')]  # 2 calls
+        # get_subtree params
+        self.pres.model.get_subtree.side_effect = [_subtree('roots', attr_dict, get_children_folder[1]),
+                                                   e.NodeNotExists('forced return')]  # 2 calls
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = (False, 1)  # modify current folder
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
         # select_field params
         self.pres.view.select_field.return_value = (True, 'name')
 
@@ -469,7 +596,6 @@ class TestPresenter:
 
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
-        assert self.pres.model.get_node.call_args.args == ('roots',)
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots',)
         assert self.pres.view.output_string.call_args_list == \
                [((f'Node <roots> can not be renamed. {chr(10)}', ), ),
@@ -493,12 +619,11 @@ class TestPresenter:
         self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
         self.pres.model.reset_mock(side_effect=True)
         # self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_folder  # 1 call
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict, get_children_folder[1])  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = (False, 1)  # modify current folder
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
         # select_field params
         self.pres.view.select_field.return_value = (True, 'name')
         # edit_field params
@@ -508,7 +633,6 @@ class TestPresenter:
 
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
-        assert self.pres.model.get_node.call_args.args == ('roots',)
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots',)
         assert self.pres.view.edit_field.call_args.args == (editing_field,)
         assert result is False
@@ -530,12 +654,11 @@ class TestPresenter:
         self.pres.view.reset_mock(return_value=True)  # reset side_effect from the previous case
         self.pres.model.reset_mock(side_effect=True)
         # self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_folder  # 1 call
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict, get_children_folder[1])  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = (False, 1)  # modify current folder
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
         # select_field params
         self.pres.view.select_field.return_value = (None, '')
         # edit_field params
@@ -545,7 +668,6 @@ class TestPresenter:
 
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
-        assert self.pres.model.get_node.call_args.args == ('roots',)
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots',)
         # assert self.pres.view.edit_field.call_args.args == (editing_field,)
         assert result is False
@@ -569,12 +691,12 @@ class TestPresenter:
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.side_effect = [get_children_folder, e.NodeNotExists('forced return')]  # 2 calls
+        # get_subtree params
+        self.pres.model.get_subtree.side_effect = [_subtree('roots', attr_dict, get_children_folder[1]),
+                                                   e.NodeNotExists('forced return')]  # 2 calls
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = (False, 1)  # modify current folder
-        # get_node params
-        self.pres.model.get_node.return_value = attr_dict
         # select_field params
         self.pres.view.select_field.return_value = (False, '')
 
@@ -584,10 +706,9 @@ class TestPresenter:
             print('\nException IndexError raised successfully:', e, file=sys.stderr)
 
 
-        assert self.pres.model.get_children.call_args.args == ('roots', )
+        assert self.pres.model.get_subtree.call_args.args == ('roots', )
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
-        assert self.pres.model.get_node.call_args.args == ('roots',)
         assert self.pres.view.select_field.call_args.args == (filtered_attrs, 'roots',)
         assert result is False
 
@@ -610,14 +731,15 @@ class TestPresenter:
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_folder  # 1 call
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict, get_children_folder[1])  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = "None", 'wrong selection'  # unexpected selection
 
         result = self.pres.modify_bookmark()  # test of the method
 
-        assert self.pres.model.get_children.call_args.args == ('roots',)
+        assert self.pres.model.get_subtree.call_args.args == ('roots',)
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
         assert self.pres.view.output_string.call_args.args == \
@@ -644,52 +766,22 @@ class TestPresenter:
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.side_effect = [get_children_folder, e.NodeNotExists('forced return')]  # 2 calls
+        # get_subtree params
+        self.pres.model.get_subtree.side_effect = [_subtree('roots', attr_dict, get_children_folder[1]),
+                                                   e.NodeNotExists('forced return')]  # 2 calls
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = True, 0  # folder selection
 
         result = self.pres.modify_bookmark()  # test of the method
 
-        assert self.pres.model.get_children.call_args.args == ('item1',)
+        assert self.pres.model.get_subtree.call_args.args == ('item1',)
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
         assert self.pres.view.output_string.call_args.args == \
                (f'Node <forced return> does not exist {chr(10)}',)
         assert result is False
 
-        # modify current folder case NodeNotExists exception at get_node
-        # ---- common params ----
-        node_name = 'roots'  # correct name of a new url
-        parent_node = None
-        get_children_none = False, ()
-        get_children_folder = True, ('item1', 'item2')
-        selected_field = True, 'name'  # 'name' field selected
-        attr_dict = {'name': node_name, 'parent_name': parent_node}  # args to add node
-        filtered_attrs = {'name': node_name}  # args to add node
-
-        # mock methods
-        self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
-        self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
-        self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.side_effect = [get_children_folder, e.NodeNotExists('forced return')]  # 2 calls
-        # selected_item params
-        self.pres.view.select_item.return_value = (False, 1)  # modify current folder
-        # get_node params
-        self.pres.model.get_node.side_effect = e.NodeNotExists('not exist')
-
-        # switch next traceback output to stderr
-        temp = sys.stdout
-        sys.stdout = sys.stderr
-        print()
-        try:
-            result = self.pres.modify_bookmark()  # test of the method
-        except SystemExit as exc:
-            assert type(exc) == SystemExit
-            assert exc.code == 1
-        sys.stdout = temp  # restore stdout
-
         # modify current folder, case return to parent folder, node_name = 'roots'
         # ---- common params ----
         node_name = 'roots'  # correct name of a new url
@@ -703,14 +795,15 @@ class TestPresenter:
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_folder  # 1 call
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict, get_children_folder[1])  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = False, 0  # return to the previous folder
 
         result = self.pres.modify_bookmark()  # test of the method
 
-        assert self.pres.model.get_children.call_args.args == (node_name,)
+        assert self.pres.model.get_subtree.call_args.args == (node_name,)
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
         assert result is True
@@ -731,14 +824,15 @@ class TestPresenter:
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER MODIFY BOOKMARK"  # set a mocking method header
-        # get_children params
-        self.pres.model.get_children.return_value = get_children_folder  # 1 call
+        # get_subtree params
+        self.pres.model.get_subtree.return_value = _subtree('roots', attr_dict, get_children_folder[1])  # 1 call
+        self.pres.model.get_node.side_effect = _get_node(attr_dict)  # the fields of the node
         # selected_item params
         self.pres.view.select_item.return_value = None, ''  # EOF break
 
         result = self.pres.modify_bookmark()  # test of the method
 
-        assert self.pres.model.get_children.call_args.args == (node_name,)
+        assert self.pres.model.get_subtree.call_args.args == (node_name,)
         assert self.pres.view.select_item.call_args.args == select_items_args
         assert self.pres.view.select_item.call_args.kwargs == select_item_kwargs
         assert result is False
@@ -865,30 +959,85 @@ class TestPresenter:
                (f'Folder <{node_name}> is not empty and can not be deleted {chr(10)}',)
         assert result is False
 
-    def test_print_tree(self):
-        # common params
-        init_node = 'roots'
-        init_tab = 0
+    def test_search_bookmarks(self):
+        # ---- found case ----
+        query = 'news paper'  # words to search
+        self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
+        self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
+        self.pres.view.main_header = "TEST HEADER SEARCH BOOKMARKS"  # set a mocking method header
+        self.pres.view.input_line.return_value = query  # mock a user input
+        self.pres.model.search.return_value = ('paper', 'daily news')  # ranked names
+
+        result = self.pres.search_bookmarks()  # test of the method
+
+        assert self.pres.view.output_header.call_args.args == (self.pres.view.main_header,)  # header output
+        assert self.pres.view.input_line.call_args.args == ("Input words to search",)  # any characters
+        assert self.pres.model.search.call_args.args == (query,)
+        assert self.pres.view.output_list.call_args.args == (('paper', 'daily news'),)
+        assert result is True
+
+        # ---- nothing found case ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.model.search.return_value = ()
+
+        result = self.pres.search_bookmarks()  # test of the method
+
+        assert self.pres.view.output_string.call_args.args == (f'Nothing has been found for <{query}> {chr(10)}',)
+        assert self.pres.view.output_list.call_count == 0
+        assert result is False
 
+        # ---- EOF break case ----
+        self.pres.view.reset_mock()
+        self.pres.model.reset_mock()
+        self.pres.view.input_line.return_value = None  # EOF break
+
+        result = self.pres.search_bookmarks()  # test of the method
+
+        assert self.pres.model.search.call_count == 0
+        assert result is False
+
+    def test_print_tree(self):
         # mock methods
         self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
         self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
         self.pres.view.main_header = "TEST HEADER PRINT TREE"  # set a mocking method header
-        get_children_folder = True, ('FOLDER', )
-        get_children_url = False, ('', )
-
-        out_h1 = (self.pres.view.main_header, )
-        out_h2 = ('Folder <roots> BEGIN', 0)
-        out_h3 = ('Folder <roots> END', 0)
-        # get_children params
-        self.pres.model.get_children.side_effect = [get_children_folder, get_children_url]  # 2 calls
-
+        items = [TreeItem(0, 'roots', True), TreeItem(1, 'FOLDER', True), TreeItem(2, 'URL', False),
+                 TreeItem(1, 'URL_2', False)]
+        self.pres.model.get_subtree.return_value = Subtree(['roots', 'FOLDER', 'URL', 'URL_2'], [-1, 0, 1, 0],
+                                                           [True, True, False, False], {})
+        self.pres.view.output_tree.side_effect = lambda tree, depth: list(tree) == items  # the items of the subtree
 
+        # the whole tree by default, no depth is requested
         result = self.pres.print_tree()  # call the method
+        assert self.pres.view.output_header.call_args.args == (self.pres.view.main_header, )
+        assert self.pres.model.get_subtree.call_args.kwargs == {'max_depth': None}
+        assert self.pres.view.output_tree.call_args.args[1] is None
+        assert self.pres.view.input_line.call_count == 0
+        assert result is True
 
-        assert self.pres.view.output_header.call_args_list == \
-               [(out_h1, ), (out_h2, ), (out_h3, )]
-        assert self.pres.model.get_children.call_args_list == \
-               [(('roots', ),), (('FOLDER', ), )]
-        assert self.pres.view.output_list.call_args.args == (('FOLDER', ), 8)
+        # the depth is given to the Model and the View
+        result = self.pres.print_tree(1)  # call the method
+        assert self.pres.model.get_subtree.call_args.kwargs == {'max_depth': 1}
+        assert self.pres.view.output_tree.call_args.args[1] == 1
         assert result is True
+
+    def test_save_failed_and_close(self):
+        # an error of the background save is output, the menus go on
+        self.pres.view = mock.MagicMock(name='view', spec=View)  # mock View interface
+        error = e.SaveFailed(OSError('disk full'))
+        self.pres.execute_request(MenuItem('Add', mock.MagicMock(side_effect=error)))
+        assert self.pres.view.output_string.call_args.args == (str(error), )
+        assert self.pres.view.main_header == 'Add'
+
+        # the final save, then the worker is stopped even if the save failed
+        self.pres.model = mock.MagicMock(name='model', spec=Model)  # mock Model interface
+        self.pres.executor_model = mock.MagicMock(name='executor_model')
+        self.pres.close()
+        assert self.pres.model.close.call_count == 1
+        assert self.pres.executor_model.shutdown.call_count == 1
+        for error in (OSError('disk full'), e.SaveFailed(OSError('disk full'))):  # the final or a previous save
+            self.pres.model.close.side_effect = error
+            self.pres.close()  # the error is output, not raised
+            assert self.pres.view.output_string.call_args.args == (str(e.SaveFailed(OSError('disk full'))), )
+        assert self.pres.executor_model.shutdown.call_count == 3
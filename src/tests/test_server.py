@@ -0,0 +1,167 @@
+"""Tests of the bookmark server and its client, modules server.py and client.py"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import threading
+
+import exceptions
+from client import BookmarkClient
+from server import BookmarkServer, METHOD_NOT_FOUND, INVALID_PARAMS, INVALID_REQUEST, PARSE_ERROR
+from model_interface import Model
+from model_json import ModelJSON
+from model_json import tree_to_image
+
+
+class TestServer:
+    """Testing class for the server and the client"""
+
+    filename = 'server_db.json'
+    socket_name = 'server_db.sock'
+
+    def _start_server(self, flush_ms: int = 50) -> tuple[BookmarkServer, threading.Thread]:
+        """Create a database with a folder and an url in it and serve it in a thread."""
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)  # remove the filename if it exists
+        if os.path.exists(self.socket_name):
+            os.remove(self.socket_name)  # a stale socket of a failed test, the wait below needs a new one
+        jm = ModelJSON()
+        jm.create_database(self.filename)
+        jm.add_nodes([{'name': 'folder', 'parent_name': 'roots'},
+                      {'name': 'URL', 'parent_name': 'folder', 'url': 'www.url.com', 'keywords': 'python docs'}])
+        server = BookmarkServer(jm, self.socket_name, flush_ms)
+        thread = threading.Thread(target=asyncio.run, args=(server.serve_forever(), ), daemon=True)
+        thread.start()
+        for _ in range(500):  # wait for the listening socket, the file exists before the server listens
+            with socket.socket(socket.AF_UNIX) as sock:
+                if sock.connect_ex(self.socket_name) == 0:
+                    break
+            time.sleep(0.01)
+        return server, thread
+
+    def test_calls(self):
+        server, thread = self._start_server()
+        client = BookmarkClient(self.socket_name, timeout=10)
+        assert client.cwd == os.getcwd()
+        assert Model(client).get_children('folder') == (True, ('URL', ))  # the client is a model
+        assert client.get_node('URL')['url'] == 'www.url.com'
+        assert client.search('pyth') == ('URL', )
+        client.add_node({'name': 'Docs', 'parent_name': 'roots'}, True)
+        client.add_nodes(({'name': f'url{i}', 'parent_name': 'Docs', 'url': f'u{i}.com'} for i in range(3)))
+        client.update_node('url0', {'name': 'url0', 'keywords': 'first'})
+        client.move_node('URL', 'Docs')
+        client.delete_node('url1')
+        assert list(client.iter_tree(max_depth=1)) == [(0, 'roots', True), (1, 'folder', True), (1, 'Docs', True)]
+        assert [x.name for x in client.iter_tree('Docs')] == ['Docs', 'url0', 'url2', 'URL']
+        subtree = client.get_subtree('Docs', fields=('url', ))  # one request
+        assert subtree == server.model.get_subtree('Docs', fields=('url', ))
+        assert subtree.node(3) == {'url': 'www.url.com'}
+
+        # the exceptions of the model keep their types and messages
+        for call, args, exc_type in ((client.get_node, ('nothing', ), exceptions.NodeNotExists),
+                                     (client.add_nodes, ([{'name': 'Docs', 'parent_name': 'roots'}], ),
+                                      exceptions.NodeExists),
+                                     (client.move_node, ('Docs', 'Docs'), exceptions.NodeNotMovable),
+                                     (client.iter_tree, ('roots', 'sideways'), ValueError),
+                                     (client.open_database, ('not_exist.json', ), FileNotFoundError)):
+            try:
+                call(*args)
+            except exc_type as e:
+                print(f'\nException {exc_type.__name__} raised successfully:', e, file=sys.stderr)
+            else:
+                assert False, f'{exc_type.__name__} is expected'
+        # the errors of the protocol
+        for method, params, code in (('frobnicate', [], METHOD_NOT_FOUND), ('_save_tree', [], METHOD_NOT_FOUND),
+                                     ('get_node', [], INVALID_PARAMS), ('get_node', ['a', 'b', 'c'], INVALID_PARAMS)):
+            try:
+                client.call(method, *params)
+            except exceptions.ServerError as e:
+                assert e.code == code
+            else:
+                assert False, 'ServerError is expected'
+        for request, code in ((b'{"id": 1, "method": "get_node", "params": {"nam": "URL"}}', INVALID_PARAMS),
+                              (b'{"id": ', PARSE_ERROR), (b'["get_node"]', INVALID_REQUEST)):
+            client.sock.sendall(request + b'\n')
+            assert json.loads(client._responses.readline())['error']['code'] == code
+        client.sock.sendall(b'{"id": 2, "method": "get_node", "params": {"name": "URL"}}\n')  # named params
+        assert json.loads(client._responses.readline())['result']['name'] == 'URL'
+        assert client.get_node('Docs')['name'] == 'Docs'  # the connection is alive
+
+        client.shutdown()
+        thread.join(10)
+        assert not thread.is_alive()
+        assert not os.path.exists(self.socket_name)
+        # the changes were flushed
+        jm_new = ModelJSON()
+        jm_new.open_database(self.filename)
+        assert tree_to_image(jm_new.root) == tree_to_image(server.model.root)
+        assert jm_new.get_node('url0')['keywords'] == 'first'
+        jm_new.delete_database(self.filename)
+
+    def test_coalesced_flush(self):
+        server, thread = self._start_server(flush_ms=200)
+        saves = []
+        save_tree = server.model._save_tree
+        server.model._save_tree = lambda: saves.append(save_tree())  # count the saves
+        clients = [BookmarkClient(self.socket_name, timeout=10) for _ in range(3)]
+        for i in range(30):
+            clients[i % 3].add_node({'name': f'url{i}', 'parent_name': 'folder', 'url': f'u{i}.com'}, False)
+        assert len(saves) == 0  # the changes wait for the flush delay
+        clients[0].close()  # explicit flush
+        assert len(saves) == 1
+        assert clients[1].get_children('folder')[1][-1] == 'url29'  # all the clients see the changes
+        clients[2].update_node('url0', {'name': 'url0', 'keywords': 'late'})
+        time.sleep(0.5)
+        assert len(saves) == 2  # the delayed flush
+        for client in clients[1:]:
+            client.disconnect()
+        clients[0].shutdown()
+        thread.join(10)
+        assert len(saves) == 2  # nothing to flush at the shutdown
+        del server.model._save_tree
+        server.model.delete_database(self.filename)
+
+    def test_long_calls(self):
+        """The imports and the exports run in a thread, the other clients are served meanwhile."""
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)  # remove the filename if it exists
+        jm = ModelJSON()
+        jm.create_database(self.filename)
+        jm.add_node({'name': 'folder', 'parent_name': 'roots'}, True)
+        server = BookmarkServer(jm, self.socket_name)
+        threads = []
+
+        def _slow(filename: str) -> tuple[bool, str]:
+            """A long import or export which notes its thread"""
+            threads.append(threading.get_ident())
+            time.sleep(0.2)
+            return True, ''
+
+        async def _requests(method: str) -> tuple[dict, bool]:
+            """Run the long method and the short requests of the other clients meanwhile"""
+            setattr(jm, method, _slow)
+            long_call = asyncio.ensure_future(server.handle(json.dumps({'id': 1, 'method': method,
+                                                                        'params': ['file']}).encode()))
+            await asyncio.sleep(0.05)  # the long call is running
+            cwd = await server.handle(b'{"id": 2, "method": "cwd"}')  # served at once
+            read = asyncio.ensure_future(server.handle(b'{"id": 3, "method": "get_children", "params": ["roots"]}'))
+            await asyncio.sleep(0.05)
+            read_done = read.done()  # the reading waits for the import only
+            assert not long_call.done()
+            assert (await long_call)['result'] == (True, '')
+            assert (await read)['result'] == (True, ('folder', ))
+            return cwd, read_done
+
+        async def _methods():
+            """The import and the export on one event loop"""
+            for method, read_done in (('convert_chrome', False), ('export_netscape', True)):
+                cwd, done = await _requests(method)
+                assert cwd['result'] == os.getcwd()
+                assert done is read_done
+
+        asyncio.run(_methods())
+        assert threading.get_ident() not in threads and len(threads) == 2  # not on the event loop
+        jm.delete_database(self.filename)
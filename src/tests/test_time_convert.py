@@ -53,6 +53,10 @@ class TestTimeToObject:
         self.date_string = stamp_to_string(self.timestamp, self.epoch_type)
         assert self.date_string == '2016-01-22T07:29:42'
 
+    def test_prtime(self):
+        """Return a datestamp of the Mozilla PRTime timestamp as a string"""
+        assert stamp_to_string(1453447782951728, 'PRTime') == '2016-01-22T07:29:42'
+
 
 
 class TestObjectToTime:
@@ -82,3 +86,8 @@ class TestObjectToTime:
         else:
             print('\nInput parameters are OK')
             assert self.ts == 13097932182951728
+
+    def test_object_to_prtime(self):
+        """Return the Mozilla PRTime timestamp of the datetime object"""
+        instance = datetime.datetime(2016, 1, 22, 7, 29, 42, 951728, tzinfo=datetime.timezone.utc)
+        assert object_to_stamp(instance, 'prtime') == 1453447782951728
@@ -1,7 +1,7 @@
 """Tests for a bookmark view for CLI UI, module view_cli.py"""
 
 from common import Field
-from common import FILL_HEADER, VALID_CHARS
+from common import FILL_HEADER, VALID_CHARS, PAGE_SIZE, SELECT_PAGE
 
 from view_cli import ViewCLI
 
@@ -16,6 +16,8 @@ class TestViewCLI:
         assert self.cli.main_header == ''
         assert self.cli.local_header == ''
         assert self.cli.node_name == ''
+        assert self.cli.page_size == PAGE_SIZE
+        assert self.cli.select_page == SELECT_PAGE
 
     def test_output_string(self, capsys):
         """Test of the string output"""
@@ -44,6 +46,43 @@ class TestViewCLI:
         captured = capsys.readouterr()  # get the captured stdout
         assert captured.out == expected
 
+    def test_output_tree(self, monkeypatch, capsys):
+        """Test of the tree output: folders, collapsed folders, chunks and pages."""
+        items = [(0, 'roots', True), (1, 'folder', True), (2, 'URL', False), (2, 'empty', True), (1, 'URL_2', False)]
+        fill = FILL_HEADER * 8
+        expected = [f"{fill} Folder <roots> BEGIN {fill}",
+                    f"{' ' * 8}{fill} Folder <folder> BEGIN {fill}",
+                    f"{' ' * 16}URL",
+                    f"{' ' * 16}{fill} Folder <empty> BEGIN {fill}",
+                    f"{' ' * 16}{fill} Folder <empty> END {fill}",
+                    f"{' ' * 8}{fill} Folder <folder> END {fill}",
+                    f"{' ' * 8}URL_2",
+                    f"{fill} Folder <roots> END {fill}"]
+        assert self.cli.output_tree(iter(items)) is True
+        assert capsys.readouterr().out == '\n'.join(expected) + '\n'
+
+        # the last level is collapsed
+        assert self.cli.output_tree(iter(items[:2] + items[4:]), max_depth=1) is True
+        assert capsys.readouterr().out.splitlines() == [expected[0], f"{' ' * 8}{fill} Folder <folder> COLLAPSED {fill}",
+                                                        expected[6], expected[7]]
+
+        # the lines are written by chunks
+        writes = []
+        monkeypatch.setattr('view_cli.OUTPUT_CHUNK', 3)
+        monkeypatch.setattr('sys.stdout.write', writes.append)
+        self.cli.output_tree(iter(items))
+        monkeypatch.undo()
+        assert [len(x.splitlines()) for x in writes] == [3, 3, 2]
+        assert ''.join(writes) == '\n'.join(expected) + '\n'
+
+        # pages on a terminal, the second page is stopped
+        cli = ViewCLI(page_size=3)
+        monkeypatch.setattr('sys.stdout.isatty', lambda: True)
+        answers = iter(['', '\x04'])
+        monkeypatch.setattr('builtins.input', lambda _: next(answers))
+        assert cli.output_tree(iter(items)) is False
+        assert capsys.readouterr().out == '\n'.join(expected[:6]) + '\n'
+
     def test_input_yes_or_no_input(self, monkeypatch):
         """Test of the input yes or no. Input"""
         monkeypatch.setattr('builtins.input', lambda _: "YES")
@@ -98,6 +137,33 @@ class TestViewCLI:
         captured = capsys.readouterr()  # get the captured stdout
         assert captured.out == expected
 
+    def test_select_page_line(self, monkeypatch, capsys):
+        """Test of the paged selection of a long list with the filters."""
+        cli = ViewCLI(select_page=10)
+        item_list = ('Return', ) + tuple(f'item {i}' for i in range(95)) + ('Python docs', )
+        answers = iter(['', 'x', 'g 10', 'p', '/DOCS', '^item 9', 'n', '/', 'p', '97', '/docs', '97'])
+        monkeypatch.setattr('builtins.input', lambda _: next(answers))
+        assert cli.select_line(item_list, commands=1) == 96  # the number in the whole list
+        pages = capsys.readouterr().out.split('Choose, please, an option')[1:]
+        shown = [[line.split('.')[0] for line in page.splitlines()[1:] if line[0].isdigit()] for page in pages]
+        assert shown[0] == [str(i) for i in range(1, 12)]  # the command and the first page
+        assert shown[1][:2] == ['1', '12']  # ENTER, the next page
+        assert shown[2] == shown[1]  # an invalid input, the same page again
+        assert 'Input, please, a number of the shown rows' in pages[2]
+        assert shown[3] == ['1', '92', '93', '94', '95', '96', '97']  # the last page
+        assert shown[4] == ['1'] + [str(i) for i in range(82, 92)]  # the previous one
+        assert shown[5] == ['1', '97'] and 'Page 1 of 1, 1 rows with </DOCS>' in pages[5]
+        assert shown[6] == ['1', '11', '92', '93', '94', '95', '96']  # item 9, item 90 - item 94
+        assert shown[7] == shown[6]  # no page after the last one
+        assert shown[8] == shown[0]  # all the rows
+        assert shown[9] == shown[0]  # no page before the first one
+        assert shown[10] == shown[0] and 'The row 97 is not on the page' in pages[10]  # a hidden row
+        assert shown[11] == ['1', '97']  # the row is selected when it is shown
+
+        monkeypatch.setattr('builtins.input', lambda _: '\x04')
+        assert cli.select_line(item_list, commands=1) is None  # break
+        assert len(capsys.readouterr().out.splitlines()) == 1 + 11 + 1  # the prompt, the page, the status
+
     def test_select_item(self, monkeypatch, capsys):
         """Test of the item selection."""
         item_list = ('first line', 'second line', 'third line')
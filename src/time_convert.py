@@ -4,11 +4,12 @@ to the object Datetime and visa versa.
 The Windows Time epoch_type is the number of 100ns-es since January 1, 1601.
 The Chrome epoch_type is the number of microseconds since the same date, and thus 1/10 as large.
 JavaScript - Unix in milliseconds, PubNub (17 digits) - Unix / 10,000,000
+The Mozilla PRTime epoch_type is the number of microseconds since January 1, 1970 (Firefox places.sqlite).
 To convert a Chrome timestamp to and from the Unix epoch,
 you must convert to second and compensate for the difference
 between the two base date-times (11644473600).
 Information from https://stackoverflow.com/questions/539900/google-bookmark-export-date-format.
-Supported formats (case-insensitive): Unix, JavaScript, Windows, Google, PubNub
+Supported formats (case-insensitive): Unix, JavaScript, Windows, Google, PubNub, PRTime
 """
 from datetime import datetime
 from datetime import timezone
@@ -25,7 +26,7 @@ def stamp_to_object(timestamp: int, epoch_type: str) -> datetime:
     :exceptions: raise BadEpochType if input format is wrong
 
     :param timestamp: timestamp of non-Unix formats
-    :param epoch_type: input format: 'windows', 'google', 'javascript', 'unix'
+    :param epoch_type: input format: 'windows', 'google', 'javascript', 'prtime', 'unix'
     :return: object of the class datetime
     """
     epoch_type = epoch_type.lower()  # to lower case
@@ -36,6 +37,8 @@ def stamp_to_object(timestamp: int, epoch_type: str) -> datetime:
         timestamp = timestamp // 1_000_000 - DELTA   # from Google format to Unix
     elif epoch_type == 'javascript':
         timestamp = timestamp // 1_000   # from Javascript format to Unix
+    elif epoch_type == 'prtime':
+        timestamp = timestamp // 1_000_000   # from Mozilla PRTime format to Unix
     elif epoch_type == 'unix':     # is already the Unix format
         pass
     else:
@@ -50,7 +53,7 @@ def stamp_to_string(timestamp: int, epoch_type: str) -> str:
     :exceptions: raise BadEpochType if input format is wrong
 
     :param timestamp: timestamp of non-Unix formats
-    :param epoch_type: input format: 'windows', 'google', 'javascript', 'unix'
+    :param epoch_type: input format: 'windows', 'google', 'javascript', 'prtime', 'unix'
     :return: a string representing the date and time in ISO 8601 format
     """
     full_datetime = stamp_to_object(timestamp, epoch_type)  # get the datetime object
@@ -64,7 +67,7 @@ def object_to_stamp(datetime_instance: datetime, epoch_type: str) -> int:
     :exceptions: raise BadEpochType if input format is wrong
 
     :param datetime_instance: object of the class datetime
-    :param epoch_type: output format: 'windows', 'google', 'javascript', 'unix'
+    :param epoch_type: output format: 'windows', 'google', 'javascript', 'prtime', 'unix'
     :return: converted timestamp as integer
     """
     epoch_type = epoch_type.lower()  # to lower case
@@ -78,6 +81,9 @@ def object_to_stamp(datetime_instance: datetime, epoch_type: str) -> int:
     elif epoch_type == 'javascript':
         timestamp = int(datetime_instance.timestamp()) * 1_000 + \
                     datetime_instance.microsecond // 1_000  # from Unix format to Javascript format
+    elif epoch_type == 'prtime':
+        timestamp = int(datetime_instance.timestamp()) * 1_000_000 + \
+                    datetime_instance.microsecond  # from Unix format to Mozilla PRTime format
     elif epoch_type == 'unix':  # is already the Unix format
         timestamp = int(datetime_instance.timestamp())
     else:
@@ -0,0 +1,158 @@
+"""Traversal of the bookmark tree without recursion.
+walk() yields a light record (depth, name, is_folder) for every node, in the depth-first order
+(the order of the printing and the exporting) or in the breadth-first order (level by level).
+The depth-first walk keeps a stack of the children iterators of the open folders, the breadth-first one
+keeps a queue of the children iterables of the next levels, so no recursion limits the depth of the tree.
+A Model gives its own children function: the objects of the tree, the rows of a database or the entries
+of an index are walked the same way.
+collect() fetches a subtree at once into a Subtree: flat lists of the names, the parent indexes and the types
+of the nodes in the depth-first order and a column of values for every requested field, so a remote Model
+sends the whole subtree in one reply instead of a call per node.
+
+"""
+import typing as t
+from collections import deque
+
+ORDERS = ('dfs', 'bfs')  #: orders of the traversal: depth-first, breadth-first
+
+
+class TreeItem(t.NamedTuple):
+    """A node met by the traversal."""
+    depth: int  #: depth of the node, 0 for the start node
+    name: str  #: node name
+    is_folder: bool  #: True for a folder or the root
+
+
+class Subtree(t.NamedTuple):
+    """A subtree fetched by one call, the nodes are in the depth-first order, the start node first."""
+    names: list[str]  #: node names
+    parents: list[int]  #: index of the parent of every node, -1 for the start node
+    folders: list[bool]  #: True for a folder or the root
+    fields: dict[str, list]  #: values of every requested field by the nodes, None if the node has not the field
+
+    def children(self, index: int = 0) -> list[int]:
+        """Get the indexes of the children of a node.
+
+        :param index: index of the node, the start node by default
+        :return: list of the indexes in the order of the children
+        """
+        return [i for i in range(index + 1, len(self.parents)) if self.parents[i] == index]
+
+    def node(self, index: int = 0) -> dict:
+        """Get the requested fields of a node, as get_node() of a Model returns them.
+
+        :param index: index of the node, the start node by default
+        :return: dictionary {field_name: field_value} of the node
+        """
+        return {field: values[index] for field, values in self.fields.items() if values[index] is not None}
+
+    def items(self) -> t.Iterator[TreeItem]:
+        """Iterate over the nodes as iter_tree() of a Model does in the depth-first order.
+
+        :return: iterator of the TreeItem records
+        """
+        depths = []
+        for name, parent, is_folder in zip(self.names, self.parents, self.folders):
+            depth = depths[parent] + 1 if parent >= 0 else 0
+            depths.append(depth)
+            yield TreeItem(depth, name, is_folder)
+
+
+def walk(start, get_children: t.Callable[[t.Any], t.Iterable | None], get_name: t.Callable[[t.Any], str],
+         order: str = 'dfs', max_depth: int | None = None) -> t.Iterator[TreeItem]:
+    """Walk the subtree of the start node, the start node is the first one.
+
+    :raises ValueError: if the order is unknown
+
+    :param start: the start node, an object of the Model
+    :param get_children: function to get an iterable of the children of a node, None for an url;
+                         the iterable is iterated only when its children are reached
+    :param get_name: function to get the name of a node
+    :param order: 'dfs' for the depth-first order, 'bfs' for the breadth-first one
+    :param max_depth: the deepest level to walk, None for the whole subtree
+    :return: iterator of the TreeItem records
+    """
+    if order not in ORDERS:
+        raise ValueError(f'Unknown order of the traversal "{order}", expected one of {ORDERS}')
+    walker = _walk_dfs if order == 'dfs' else _walk_bfs
+    return walker(start, get_children, get_name, max_depth)
+
+
+def _walk_dfs(start, get_children, get_name, max_depth: int | None) -> t.Iterator[TreeItem]:
+    """Depth-first walk, see walk()."""
+    children = get_children(start)
+    yield TreeItem(0, get_name(start), children is not None)
+    if children is None or max_depth == 0:
+        return
+    stack = [iter(children)]  # explicit stack of the children iterators of the open folders
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()  # end of the folder
+            continue
+        children = get_children(node)
+        yield TreeItem(len(stack), get_name(node), children is not None)
+        if children is not None and (max_depth is None or len(stack) < max_depth):
+            stack.append(iter(children))
+
+
+def _walk_bfs(start, get_children, get_name, max_depth: int | None) -> t.Iterator[TreeItem]:
+    """Breadth-first walk, see walk()."""
+    children = get_children(start)
+    yield TreeItem(0, get_name(start), children is not None)
+    if children is None or max_depth == 0:
+        return
+    queue = deque([(1, children)])  # children iterables of the folders of the next levels
+    while queue:
+        depth, children = queue.popleft()
+        for node in children:
+            node_children = get_children(node)
+            yield TreeItem(depth, get_name(node), node_children is not None)
+            if node_children is not None and (max_depth is None or depth < max_depth):
+                queue.append((depth + 1, node_children))
+
+
+def collect(start, get_children: t.Callable[[t.Any], t.Iterable | None], get_name: t.Callable[[t.Any], str],
+            get_fields: t.Callable[[t.Any], dict] | None, fields: t.Iterable[str] = (),
+            max_depth: int | None = None) -> Subtree:
+    """Collect the subtree of the start node into flat lists by the depth-first walk, see walk().
+
+    :param start: the start node, an object of the Model
+    :param get_children: function to get an iterable of the children of a node, None for an url
+    :param get_name: function to get the name of a node
+    :param get_fields: function to get the dictionary of the requested fields of a node, None if no fields
+    :param fields: names of the requested fields
+    :param max_depth: the deepest level to collect, None for the whole subtree
+    :return: the Subtree of the start node
+    """
+    fields = tuple(fields) if get_fields is not None else ()
+    subtree = Subtree([], [], [], {field: [] for field in fields})
+    names, parents, folders = subtree.names, subtree.parents, subtree.folders
+    columns = tuple(subtree.fields.items())
+
+    def _add(node, parent: int) -> t.Iterable | None:
+        # append the node to the lists, return its children
+        children = get_children(node)
+        names.append(get_name(node))
+        parents.append(parent)
+        folders.append(children is not None)
+        if columns:
+            values = get_fields(node)
+            for field, column in columns:
+                column.append(values.get(field))
+        return children
+
+    children = _add(start, -1)
+    if children is None or max_depth == 0:
+        return subtree
+    stack = [(iter(children), 0)]  # explicit stack of the children iterators and the indexes of their folders
+    while stack:
+        node = next(stack[-1][0], None)
+        if node is None:
+            stack.pop()  # end of the folder
+            continue
+        index = len(names)
+        children = _add(node, stack[-1][1])
+        if children is not None and (max_depth is None or len(stack) < max_depth):
+            stack.append((iter(children), index))
+    return subtree
@@ -1,6 +1,7 @@
 """Implementation of View  for simple CLI console."""
 
-from common import FILL_HEADER, VALID_CHARS  # import constants
+import sys
+from common import FILL_HEADER, VALID_CHARS, OUTPUT_CHUNK, PAGE_SIZE, SELECT_PAGE  # import constants
 from common import Field  # import a namedtuple Field
 import typing as t
 
@@ -14,12 +15,18 @@ class ViewCLI:
     view_name = 'cli'  #: the name for all cli views
 
 
-    def __init__(self):
+    def __init__(self, page_size: int = PAGE_SIZE, select_page: int = SELECT_PAGE):
         """Constructor method.
+
+        :param page_size: lines per screen of the tree printing on a terminal, 0 for the terminal height,
+                          -1 for no paging, defaults to PAGE_SIZE
+        :param select_page: data lines per page of a selection list, defaults to SELECT_PAGE
         """
         self.main_header: str = ''  #: main header of view
         self.local_header: str = ''  #: local header of view
         self.node_name: str = ''  #: node name of the view instance
+        self.page_size: int = page_size  #: lines per screen of the tree printing
+        self.select_page: int = select_page  #: data lines per page of a selection list
 
     # ---- output section ----
     @staticmethod
@@ -40,8 +47,7 @@ class ViewCLI:
         :param tab: optional number of tabs for a left indent, defaults to 0
         :return: nothing
         """
-        print(' ' * tab, end='')
-        print(FILL_HEADER * 8, header, FILL_HEADER * 8)  # print the header of the action
+        print(f'{" " * tab}{FILL_HEADER * 8} {header} {FILL_HEADER * 8}')  # print the header of the action
 
     @staticmethod
     def output_list(item_list: tuple[str, ...], tab: int = 0):
@@ -51,7 +57,67 @@ class ViewCLI:
         :param tab: optional number of tabs for a left indent, defaults to 0
         :return: nothing
         """
-        [print(' ' * tab + item) for item in item_list]
+        if item_list:
+            sys.stdout.write(''.join([' ' * tab + item + '\n' for item in item_list]))  # one write for the list
+
+    @staticmethod
+    def tree_lines(items: t.Iterable[tuple[int, str, bool]], max_depth: int | None = None) -> t.Iterator[str]:
+        """Render the records of a tree traversal in the depth-first order to the printed lines.
+        A folder is a pair of BEGIN and END headers around its children, a folder at the max_depth level is
+        one collapsed header.
+
+        :param items: records (depth, name, is_folder) of Model.iter_tree()
+        :param max_depth: the deepest level of the traversal, None for the whole tree
+        :return: iterator of the lines without the line ends
+        """
+        fill = FILL_HEADER * 8
+        folders = []  # names of the open folders, the last one is the deepest
+        for depth, name, is_folder in items:
+            while len(folders) > depth:  # the folders deeper than the node are over
+                yield f'{" " * 8 * (len(folders) - 1)}{fill} Folder <{folders.pop()}> END {fill}'
+            if not is_folder:
+                yield ' ' * 8 * depth + name  # url name with current tabulation
+            elif depth == max_depth:
+                yield f'{" " * 8 * depth}{fill} Folder <{name}> COLLAPSED {fill}'  # children are not walked
+            else:
+                yield f'{" " * 8 * depth}{fill} Folder <{name}> BEGIN {fill}'
+                folders.append(name)
+        while folders:  # close the last folders
+            yield f'{" " * 8 * (len(folders) - 1)}{fill} Folder <{folders.pop()}> END {fill}'
+
+    def output_tree(self, items: t.Iterable[tuple[int, str, bool]], max_depth: int | None = None) -> bool:
+        """Print a tree from the records of a traversal. The lines are buffered and written by chunks,
+        a terminal gets them by pages, the user continues with ENTER or stops with EOF.
+
+        :param items: records (depth, name, is_folder) of Model.iter_tree() in the depth-first order
+        :param max_depth: the deepest level of the traversal, None for the whole tree
+        :return: True if the whole tree was printed, False if the user stopped the paging
+        """
+        out = sys.stdout
+        chunk = OUTPUT_CHUNK  # lines of a write
+        paging = self.page_size >= 0 and out.isatty()
+        if paging:
+            import shutil  # imported on demand, the terminal size is needed for the paging only
+            chunk = self.page_size or max(shutil.get_terminal_size().lines - 1, 1)  # lines of a page
+        lines = []  # buffer of the lines
+        for line in self.tree_lines(items, max_depth):
+            lines.append(line)
+            if len(lines) == chunk:
+                lines.append('')  # the line end of the last line
+                out.write('\n'.join(lines))
+                lines.clear()
+                if paging:
+                    try:
+                        answer = input('Press ENTER for the next page or EOF and ENTER to stop --> ')
+                    except EOFError:  # intercept Ctr-D exception for Linux
+                        answer = '\04'
+                    if '\x04' in answer:  # EOF was entered
+                        return False  # break
+        if lines:
+            lines.append('')
+            out.write('\n'.join(lines))
+        out.flush()
+        return True
 
     # ---- input section ----
     @staticmethod
@@ -97,14 +163,17 @@ class ViewCLI:
                 return ''  # text contains invalid chars, return empty string
         return text
 
-    @staticmethod
-    def select_line(item_list: tuple[str, ...]) -> t.Optional[int]:
+    def select_line(self, item_list: tuple[str, ...], commands: int = 0) -> t.Optional[int]:
         """Get a custom row selection from a list of rows. Submit a list
         in the form of a menu with numbered lines from 1 to the length of the list.
+        A list longer than the select_page data lines is paged, see select_page().
 
         :param item_list: list of rows to selection
+        :param commands: number of the first rows which are commands, they are on every page, default to 0
         :return: number of the selected row or None for EOF break
         """
+        if len(item_list) - commands > self.select_page:
+            return self.select_page_line(item_list, commands)
         while True:
             print("Choose, please, an option or enter EOF and RETURN for input break:")  # user prompt
             items = [print(str(i+1) + '. ' + item) for i, item in enumerate(item_list)]  # get numbered list
@@ -120,6 +189,63 @@ class ViewCLI:
                     return None  # break
                 print(f"Input, please, a number from 1 to {len(items)}{chr(10)}")  # error message
 
+    def select_page_line(self, item_list: tuple[str, ...], commands: int = 0) -> t.Optional[int]:
+        """Get a row selection from a long list by pages, only the rows of the current page are formatted.
+        The commands are on every page, the numbers of the rows are their numbers in the whole list,
+        only the numbers of the shown rows are accepted, a hidden row is listed by a page change or a filter first.
+        Besides a number the user inputs ENTER or <n> for the next page, <p> for the previous one,
+        <g N> to go to the page N, </text> to list the rows containing the text, <^text> for the rows
+        beginning with it, a single </> to list all the rows. An invalid input prints the current page again.
+
+        :param item_list: list of rows to selection
+        :param commands: number of the first rows which are commands, default to 0
+        :return: number of the selected row or None for EOF break
+        """
+        size = max(self.select_page, 1)  # data lines of a page
+        listed: t.Sequence[int] = range(commands, len(item_list))  # indexes of the listed data rows
+        found = ''  # description of the filter
+        page = 0
+        message = ''  # result of the previous input
+        while True:
+            pages = max((len(listed) + size - 1) // size, 1)
+            page = min(max(page, 0), pages - 1)
+            indexes = list(range(commands)) + list(listed[page * size:(page + 1) * size])  # rows of the page
+            lines = ["Choose, please, an option or enter EOF and RETURN for input break:"]
+            lines += [f'{i + 1}. {item_list[i]}' for i in indexes]  # the current page only
+            lines.append(f'Page {page + 1} of {pages}, {len(listed)} rows{found}. '
+                         f'ENTER/n - next page, p - previous, g N - page N, /text or ^text - filter, / - all')
+            if message:
+                lines.append(message)
+            sys.stdout.write('\n'.join(lines) + '\n')  # one write for the page
+            message = ''
+            try:
+                answer = input("--> ").strip()  # get the input
+            except EOFError:  # intercept Ctr-D exception for Linux
+                answer = '\04'
+            if '\x04' in answer:
+                return None  # break
+            if answer.isdigit() and int(answer) - 1 in indexes:
+                return int(answer) - 1  # return row index in the list
+            if answer.isdigit():
+                message = f"The row {answer} is not on the page, input, please, a number of the shown rows"
+            elif answer in ('', 'n'):
+                page += 1
+            elif answer == 'p':
+                page -= 1
+            elif answer.startswith('g') and answer[1:].strip().isdigit():
+                page = int(answer[1:]) - 1
+            elif answer in ('/', '^'):
+                listed, found, page = range(commands, len(item_list)), '', 0  # all the rows
+            elif answer[0] in '/^':
+                text = answer[1:].casefold()
+                if answer[0] == '/':
+                    listed = [i for i in range(commands, len(item_list)) if text in item_list[i].casefold()]
+                else:
+                    listed = [i for i in range(commands, len(item_list)) if item_list[i].casefold().startswith(text)]
+                found, page = f' with <{answer}>', 0
+            else:
+                message = "Input, please, a number of the shown rows or a command of the paging"
+
     def select_item(self, item_list: tuple[str, ...], comm_list: tuple[str, ...] = (),
                     header1: str = '', header2: str = '') -> tuple[t.Optional[bool], int]:
         """Get a custom item selection from a list of item. Submit a list
@@ -149,7 +275,7 @@ class ViewCLI:
         print(self.main_header)  # print main header
         print(self.local_header)  # print local header
 
-        selected_no = self.select_line(lines)  # make a selection
+        selected_no = self.select_line(lines, len(comm_list))  # make a selection, the commands are on every page
 
         if selected_no is None:
             return None, 0  # break
@@ -40,6 +40,14 @@ class ViewProto(t.Protocol):
         :return: nothing
         """
 
+    def output_tree(self, items: t.Iterable[tuple[int, str, bool]], max_depth: int | None = None) -> bool:
+        """Print a tree from the records of a traversal, a folder at the max_depth level is collapsed.
+
+        :param items: records (depth, name, is_folder) of Model.iter_tree() in the depth-first order
+        :param max_depth: the deepest level of the traversal, None for the whole tree
+        :return: True if the whole tree was printed, False if the user stopped the output
+        """
+
     # ---- input section ----
     @staticmethod
     def input_yes_or_no(prompt: str) -> bool:
@@ -59,12 +67,13 @@ class ViewProto(t.Protocol):
         :return: entered string, empty string if non-allowed characters were occurred, None for EOF break
         """
 
-    @staticmethod
-    def select_line(item_list: tuple[str, ...]) -> t.Optional[int]:
+    def select_line(self, item_list: tuple[str, ...], commands: int = 0) -> t.Optional[int]:
         """Get a custom row selection from a list of rows. Submit a list
         in the form of a menu with numbered lines from 1 to the length of the list.
+        A long list is shown by pages and can be filtered by a prefix or a substring.
 
         :param item_list: list of rows to selection
+        :param commands: number of the first rows which are commands, they are on every page, default to 0
         :return: number of the selected row or None for EOF break
         """
 
@@ -142,6 +151,15 @@ class View:
         """
         self.proto.output_list(item_list, tab)
 
+    def output_tree(self, items: t.Iterable[tuple[int, str, bool]], max_depth: int | None = None) -> bool:
+        """Print a tree from the records of a traversal, a folder at the max_depth level is collapsed.
+
+        :param items: records (depth, name, is_folder) of Model.iter_tree() in the depth-first order
+        :param max_depth: the deepest level of the traversal, None for the whole tree
+        :return: True if the whole tree was printed, False if the user stopped the output
+        """
+        return self.proto.output_tree(items, max_depth)
+
     # ---- input section ----
     def input_yes_or_no(self, prompt: str) -> bool:
         """Get user input yes or no.
@@ -161,14 +179,16 @@ class View:
         """
         return self.proto.input_line(prompt, valid_chars)
 
-    def select_line(self, item_list: tuple[str, ...]) -> t.Optional[int]:
+    def select_line(self, item_list: tuple[str, ...], commands: int = 0) -> t.Optional[int]:
         """Get a custom row selection from a list of rows. Submit a list
         in the form of a menu with numbered lines from 1 to the length of the list.
+        A long list is shown by pages and can be filtered by a prefix or a substring.
 
         :param item_list: list of rows to selection
+        :param commands: number of the first rows which are commands, they are on every page, default to 0
         :return: number of the selected row or None for EOF break
         """
-        return self.proto.select_line(item_list)
+        return self.proto.select_line(item_list, commands)
 
     def select_item(self, item_list: tuple[str, ...], comm_list: tuple[str, ...] = (),
                     header1: str = '', header2: str = '') -> tuple[t.Optional[bool], int]: